@@ -0,0 +1,3 @@
+"""
+Benchmarks of the GitLab injector, run against the fake GitLab of fake_gitlab.py.
+"""
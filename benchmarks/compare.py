@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Compare benchmark results with a baseline, and fail if the throughput has dropped or if the API calls per issue,
+epic, project or iteration have risen beyond a tolerance, or if a configuration of the baseline has not been benchmarked.
+
+Usage (from the root of the repository):
+    python -m benchmarks.run --sizes 100 1000 10000 --repeat 3
+    python -m benchmarks.compare --results benchmark_results.json --baseline benchmarks/baseline.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from typing import Any, Dict, List
+
+logger = logging.getLogger("Benchmarks")
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Entity types whose API calls are checked: they are deterministic against the fake GitLab
+CHECKED_ENTITY_TYPES = ['issue', 'epic', 'project', 'iteration']
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], throughput_tolerance: float, calls_tolerance: float) -> List[str]:
+    """
+    Compare benchmark results with a baseline.
+
+    Args:
+        results: The benchmark results, as written by benchmarks.run
+        baseline: The baseline, as written by benchmarks.run
+        throughput_tolerance: Maximal relative drop of the entities per second (e.g., 0.25 for 25%)
+        calls_tolerance: Maximal relative rise of the API calls per issue, epic, project or iteration (e.g., 0 for none)
+
+    Returns:
+        The regressions (empty if there is none)
+    """
+    if results.get('options') != baseline.get('options'):
+        # The results are not comparable
+        return [f"The benchmark options {results.get('options')} differ from the ones of the baseline {baseline.get('options')}"]
+
+    regressions = []
+    current = {result['name']: result for result in results['results']}
+    for reference in baseline['results']:
+        name = reference['name']
+        result = current.get(name)
+        if result is None:
+            regressions.append(f"{name}: not benchmarked")
+            continue
+        if result.get('errors'):
+            regressions.append(f"{name}: {result['errors']} errors logged by the injector")
+
+        minimum = reference['entities_per_second'] * (1 - throughput_tolerance)
+        if result['entities_per_second'] < minimum:
+            regressions.append(f"{name}: throughput dropped to {result['entities_per_second']} entities/s "
+                               f"(baseline: {reference['entities_per_second']}, minimum: {minimum:.1f})")
+        else:
+            logger.info(f"{name}: throughput {result['entities_per_second']} entities/s (baseline: {reference['entities_per_second']})")
+
+        for kind in CHECKED_ENTITY_TYPES:
+            if kind not in reference['calls_per_entity']:
+                continue
+            if kind not in result['calls_per_entity']:
+                regressions.append(f"{name}: no {kind} injected")
+                continue
+            calls, reference_calls = result['calls_per_entity'][kind], reference['calls_per_entity'][kind]
+            maximum = reference_calls * (1 + calls_tolerance)
+            if calls > maximum:
+                regressions.append(f"{name}: API calls per {kind} rose to {calls} (baseline: {reference_calls}, maximum: {maximum:.3f})")
+            else:
+                logger.info(f"{name}: API calls per {kind} {calls} (baseline: {reference_calls})")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare benchmark results with a baseline')
+    parser.add_argument('--results', default='benchmark_results.json', help='Path of the benchmark results (default: benchmark_results.json)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Path of the baseline (default: benchmarks/baseline.json)')
+    parser.add_argument('--throughput-tolerance', type=float, default=0.25,
+                        help='Maximal relative drop of the entities injected per second (default: 0.25)')
+    parser.add_argument('--calls-tolerance', type=float, default=0.0,
+                        help='Maximal relative rise of the API calls per issue, epic, project or iteration (default: 0)')
+    parser.add_argument('--update', action='store_true', help='Replace the baseline with the results instead of comparing them')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    with open(args.results, 'r') as f:
+        results = json.load(f)
+    if args.update:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        logger.info(f"Baseline {args.baseline} updated with {args.results}")
+        return
+
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.throughput_tolerance, args.calls_tolerance)
+    for regression in regressions:
+        logger.error(regression)
+    if regressions:
+        sys.exit(1)
+    logger.info(f"No regression against the baseline of revision {baseline.get('revision')}")
+
+if __name__ == '__main__':
+    main()
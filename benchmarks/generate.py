@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Generate large configurations, valid against schema.yaml, for a requested shape: number of top-level groups,
+depth and fan-out of their subgroups, projects per leaf group, issues per project, and the distributions
+(uniform or Zipf) of the labels, epics, milestones and assignees of the issues.
+
+The configuration is written as it is generated, one project at a time, so its size does not matter.
+
+Usage (from the root of the repository):
+    python -m benchmarks.generate --depth 2 --fan-out 10 --projects-per-group 10 --issues-per-project 1000 --output fixture.yaml
+"""
+
+import argparse
+import datetime
+import itertools
+import json
+import logging
+import random
+import sys
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, TextIO
+
+logger = logging.getLogger("Benchmarks")
+
+DISTRIBUTIONS = ['uniform', 'zipf']
+ROLES = ['guest', 'reporter', 'developer', 'maintainer']
+ENTITY_KINDS = ['group', 'project', 'label', 'milestone', 'iteration', 'epic', 'issue', 'member']
+
+class Shape(NamedTuple):
+    """
+    Shape of a generated configuration.
+    The labels, milestones, iterations and epics are defined in the top-level groups, and the projects
+    in the leaf groups (the groups of the deepest level).
+    """
+    groups: int = 1                          # Number of top-level groups
+    depth: int = 1                           # Number of levels of subgroups below the top-level groups
+    fan_out: int = 2                         # Number of subgroups of each group which is not a leaf group
+    projects_per_group: int = 2              # Number of projects of each leaf group
+    issues_per_project: int = 10             # Number of issues of each project
+    users: int = 20                          # Number of users, the first one being the owner of the token
+    labels: int = 20                         # Number of labels of each top-level group
+    milestones: int = 5                      # Number of milestones of each top-level group
+    iterations: int = 4                      # Number of iterations of each top-level group
+    epics: int = 10                          # Number of epics of each top-level group
+    group_members: int = 19                  # Number of members of each top-level group
+    project_members: int = 3                 # Number of members of each project
+    labels_per_issue: int = 3                # Maximal number of labels of an issue
+    assignees_per_issue: int = 2             # Maximal number of assignees of an issue
+    closed_ratio: float = 0.2                # Ratio of closed issues
+    label_distribution: str = 'zipf'         # Distribution of the labels of the issues and epics
+    epic_distribution: str = 'zipf'          # Distribution of the epics of the issues
+    milestone_distribution: str = 'uniform'  # Distribution of the milestones of the issues
+    assignee_distribution: str = 'zipf'      # Distribution of the assignees of the issues
+    zipf_exponent: float = 1.1               # Exponent of the Zipf distributions
+    username_prefix: str = 'user'            # Prefix of the usernames of the users (except the owner of the token)
+
+def usernames(shape: Shape) -> List[str]:
+    """
+    Args:
+        shape: Shape of the configuration
+
+    Returns:
+        The usernames of the users of the configuration, except the owner of the token
+    """
+    return [f"{shape.username_prefix}_{i}" for i in range(1, shape.users)]
+
+def sampler(rng: random.Random, population: List[str], distribution: str, exponent: float) -> Callable[[int], List[str]]:
+    """
+    Get a function drawing, with replacement, k elements of a population.
+    With a Zipf distribution, the probability of the n-th element is proportional to 1 / n ** exponent.
+
+    Args:
+        rng: Random generator
+        population: The population
+        distribution: 'uniform' or 'zipf'
+        exponent: Exponent of the Zipf distribution
+
+    Returns:
+        Function drawing k elements
+    """
+    if not population:
+        return lambda k: [None] * k
+    if distribution == 'uniform':
+        return lambda k: rng.choices(population, k=k)
+    cum_weights = list(itertools.accumulate(1 / n ** exponent for n in range(1, len(population) + 1)))
+    return lambda k: rng.choices(population, cum_weights=cum_weights, k=k)
+
+def draw_sets(rng: random.Random, draw: Callable[[int], List[str]], maximum: int, k: int) -> List[List[str]]:
+    """
+    Draw k sets of 0 to `maximum` (uniformly) distinct elements.
+
+    Args:
+        rng: Random generator
+        draw: Function drawing elements with replacement
+        maximum: Maximal size of a set
+        k: Number of sets
+
+    Returns:
+        The sets, as lists
+    """
+    sizes = rng.choices(range(maximum + 1), k=k)
+    elements = iter(draw(sum(sizes)))
+    return [list(dict.fromkeys(e for e in itertools.islice(elements, size) if e is not None)) for size in sizes]
+
+def is_scalar(value: Any) -> bool:
+    """
+    Check if a value is written on a single line: a scalar or a list of scalars.
+    """
+    if isinstance(value, list):
+        return all(isinstance(element, (str, int, float)) for element in value)
+    return value is None or isinstance(value, (str, int, float))
+
+def yaml_scalar(value: Any) -> str:
+    """
+    Format a scalar or a list of scalars as YAML: the strings are formatted as JSON strings, which are valid YAML
+    double-quoted scalars, and the lists as JSON arrays, which are valid YAML flow sequences.
+    """
+    if isinstance(value, str):
+        return json.encoder.encode_basestring_ascii(value)
+    if isinstance(value, list):
+        return f"[{', '.join(map(yaml_scalar, value))}]"
+    return json.dumps(value)
+
+class Writer:
+    """
+    Write a configuration, as YAML or as JSON, value by value.
+    The lists of mappings may be iterables, they are consumed as they are written.
+    """
+
+    def __init__(self, out: TextIO, format: str):
+        """
+        Args:
+            out: Output stream
+            format: 'yaml' or 'json'
+        """
+        self.out = out
+        self.format = format
+
+    def write(self, config: Dict[str, Any]) -> None:
+        """
+        Write a configuration.
+
+        Args:
+            config: The configuration
+        """
+        if self.format == 'json':
+            self.write_json(config)
+            self.out.write('\n')
+        else:
+            self.write_yaml(config, 0)
+
+    def write_json(self, value: Any) -> None:
+        """
+        Write a JSON value.
+
+        Args:
+            value: A mapping, a scalar, a list of scalars or an iterable of mappings
+        """
+        if is_scalar(value) or isinstance(value, dict) and all(is_scalar(item) for item in value.values()):
+            self.out.write(json.dumps(value))
+        elif isinstance(value, dict):
+            self.out.write('{')
+            for i, (key, item) in enumerate(value.items()):
+                self.out.write(f"{',' if i else ''}{json.dumps(key)}:")
+                self.write_json(item)
+            self.out.write('}')
+        else:
+            self.out.write('[')
+            for i, item in enumerate(value):
+                if i:
+                    self.out.write(',')
+                self.write_json(item)
+            self.out.write(']')
+
+    def write_yaml(self, mapping: Dict[str, Any], indent: int, first_prefix: Optional[str] = None) -> None:
+        """
+        Write a YAML block mapping.
+
+        Args:
+            mapping: The mapping
+            indent: Indentation of the mapping
+            first_prefix: Prefix of its first key, instead of the indentation (for an element of a sequence)
+        """
+        pad = ' ' * indent
+        lines = []
+        for i, (key, value) in enumerate(mapping.items()):
+            prefix = first_prefix if i == 0 and first_prefix is not None else pad
+            if is_scalar(value):
+                lines.append(f"{prefix}{key}: {yaml_scalar(value)}\n")
+                continue
+            self.out.write(''.join(lines))
+            lines = []
+            items = iter(value)
+            first = next(items, None)
+            if first is None:
+                self.out.write(f"{prefix}{key}: []\n")
+                continue
+            self.out.write(f"{prefix}{key}:\n")
+            for item in itertools.chain([first], items):
+                self.write_yaml(item, indent + 4, first_prefix=f"{pad}  - ")
+        self.out.write(''.join(lines))
+
+class Generator:
+    """
+    Generate a configuration of a given shape.
+    """
+
+    def __init__(self, shape: Shape, seed: int = 0):
+        """
+        Args:
+            shape: Shape of the configuration
+            seed: Seed of the random generator
+        """
+        for distribution in (shape.label_distribution, shape.epic_distribution, shape.milestone_distribution,
+                             shape.assignee_distribution):
+            assert distribution in DISTRIBUTIONS, f"Unknown distribution '{distribution}' (expected one of {DISTRIBUTIONS})"
+        assert shape.users >= 1, "There must be at least one user (the owner of the token)"
+        self.shape = shape
+        self.rng = random.Random(seed)
+        self.counts = dict.fromkeys(ENTITY_KINDS, 0)
+        self.issue_number = itertools.count()
+        self.user_ids = [f"user{i}" for i in range(shape.users)]
+        self.draw_assignees = sampler(self.rng, self.user_ids, shape.assignee_distribution, shape.zipf_exponent)
+
+    def config(self) -> Dict[str, Any]:
+        """
+        Returns:
+            The configuration, its groups and issues being generated as they are iterated over
+        """
+        return {
+            'users': [{'id': self.user_ids[0], 'username': '@me'}] +
+                     [{'id': user_id, 'username': f"@{username}"} for user_id, username in zip(self.user_ids[1:], usernames(self.shape))],
+            'groups': (self.top_level_group(g) for g in range(self.shape.groups))
+        }
+
+    def members(self, count: int) -> List[Dict[str, Any]]:
+        """
+        Draw the members of a group or a project, among the users except the owner of the token.
+        """
+        members = self.rng.sample(self.user_ids[1:], min(count, len(self.user_ids) - 1))
+        self.counts['member'] += len(members)
+        return [{'user_id': user_id, 'role': self.rng.choice(ROLES)} for user_id in members]
+
+    def top_level_group(self, g: int) -> Dict[str, Any]:
+        """
+        Generate a top-level group, its labels, milestones, iterations and epics.
+        """
+        shape, rng = self.shape, self.rng
+        start = datetime.date(2025, 1, 1)
+        label_ids = [f"g{g}-label{i}" for i in range(shape.labels)]
+        milestone_ids = [f"g{g}-milestone{i}" for i in range(shape.milestones)]
+        iteration_ids = [f"g{g}-iteration{i}" for i in range(shape.iterations)]
+        epic_ids = [f"g{g}-epic{i}" for i in range(shape.epics)]
+        draw_labels = sampler(rng, label_ids, shape.label_distribution, shape.zipf_exponent)
+        references = {
+            'labels': draw_labels,
+            'epics': sampler(rng, epic_ids, shape.epic_distribution, shape.zipf_exponent),
+            'milestones': sampler(rng, milestone_ids, shape.milestone_distribution, shape.zipf_exponent),
+            'iterations': sampler(rng, iteration_ids, 'uniform', shape.zipf_exponent)
+        }
+
+        epics = []
+        for i, (epic_id, epic_labels) in enumerate(zip(epic_ids, draw_sets(rng, draw_labels, 2, len(epic_ids)))):
+            epic = {'id': epic_id, 'title': f"Epic {g}.{i}", 'description': f"Description of epic {g}.{i}", 'label_ids': epic_labels}
+            if i % 5 == 4:
+                epic['parent_epic_id'] = epic_ids[rng.randrange(i)]
+            epics.append(epic)
+        self.counts['group'] += 1
+        for kind, ids in (('label', label_ids), ('milestone', milestone_ids), ('iteration', iteration_ids), ('epic', epic_ids)):
+            self.counts[kind] += len(ids)
+
+        group = {
+            'name': f"Group {g}",
+            'description': f"Description of group {g}",
+            'members': self.members(shape.group_members),
+            'labels': [{'id': label_id, 'name': f"Label {i}", 'description': f"Description of label {i}",
+                        'color': f"#{rng.randrange(0x1000000):06X}"} for i, label_id in enumerate(label_ids)],
+            'milestones': [{'id': milestone_id, 'title': f"Milestone {i}", 'description': f"Description of milestone {i}",
+                            'start_date': (start + datetime.timedelta(days=30 * i)).isoformat(),
+                            'due_date': (start + datetime.timedelta(days=30 * i + 29)).isoformat()}
+                           for i, milestone_id in enumerate(milestone_ids)],
+            'iterations': [{'id': iteration_id, 'title': f"Sprint {i}",
+                            'start_date': (start + datetime.timedelta(days=14 * i)).isoformat(),
+                            'due_date': (start + datetime.timedelta(days=14 * i + 13)).isoformat()}
+                           for i, iteration_id in enumerate(iteration_ids)],
+            'epics': epics
+        }
+        group.update(self.group_content(f"{g}", 0, references))
+        return group
+
+    def group_content(self, path: str, level: int, references: Dict[str, Callable[[int], List[str]]]) -> Dict[str, Any]:
+        """
+        Get the projects (of a leaf group) or the subgroups (of another group) of a group.
+
+        Args:
+            path: Path of the group (e.g., '0.1.3')
+            level: Level of the group (0 for a top-level group)
+            references: Functions drawing the labels, epics, milestones and iterations of the issues
+        """
+        if level == self.shape.depth:
+            return {'projects': (self.project(f"{path}.{p}", references) for p in range(self.shape.projects_per_group))}
+        return {'subgroups': (self.subgroup(f"{path}.{s}", level + 1, references) for s in range(self.shape.fan_out))}
+
+    def subgroup(self, path: str, level: int, references: Dict[str, Callable[[int], List[str]]]) -> Dict[str, Any]:
+        self.counts['group'] += 1
+        group = {'name': f"Subgroup {path}", 'description': f"Description of subgroup {path}"}
+        group.update(self.group_content(path, level, references))
+        return group
+
+    def project(self, path: str, references: Dict[str, Callable[[int], List[str]]]) -> Dict[str, Any]:
+        """
+        Generate a project and its issues, their attributes being drawn at once.
+        """
+        shape, rng, n = self.shape, self.rng, self.shape.issues_per_project
+        self.counts['project'] += 1
+        self.counts['issue'] += n
+        labels = draw_sets(rng, references['labels'], shape.labels_per_issue if shape.labels else 0, n)
+        assignees = draw_sets(rng, self.draw_assignees, shape.assignees_per_issue, n)
+        epics, milestones, iterations = (references[kind](n) for kind in ('epics', 'milestones', 'iterations'))
+        weights = rng.choices(range(9), k=n)
+        closed = [r < shape.closed_ratio for r in (rng.random() for _ in range(n))]
+
+        issues = []
+        for i in range(n):
+            number = next(self.issue_number)
+            issue = {'id': f"issue{number}", 'title': f"Issue {number}", 'description': f"Description of issue {number}",
+                     'state': 'closed' if closed[i] else 'opened'}
+            if epics[i]:
+                issue['parent_epic_id'] = epics[i]
+            if milestones[i]:
+                issue['milestone_id'] = milestones[i]
+            if iterations[i]:
+                issue['iteration_id'] = iterations[i]
+            issue['label_ids'] = labels[i]
+            issue['assignee_ids'] = assignees[i]
+            issue['weight'] = weights[i]
+            issues.append(issue)
+        return {
+            'name': f"Project {path}",
+            'description': f"Description of project {path}",
+            'members': self.members(shape.project_members),
+            'issues': issues
+        }
+
+def generate(shape: Shape, out: TextIO, format: str = 'yaml', seed: int = 0) -> Dict[str, int]:
+    """
+    Generate a configuration and write it as it is generated.
+
+    Args:
+        shape: Shape of the configuration
+        out: Output stream
+        format: 'yaml' or 'json'
+        seed: Seed of the random generator
+
+    Returns:
+        Dictionary mapping the kinds of entities (e.g., 'issue') to their numbers in the configuration
+    """
+    generator = Generator(shape, seed)
+    Writer(out, format).write(generator.config())
+    return generator.counts
+
+def main():
+    defaults = Shape()
+    parser = argparse.ArgumentParser(description='Generate a configuration of a given shape for the GitLab injector')
+    parser.add_argument('--groups', type=int, default=defaults.groups, help=f'Number of top-level groups (default: {defaults.groups})')
+    parser.add_argument('--depth', type=int, default=defaults.depth,
+                        help=f'Number of levels of subgroups below the top-level groups (default: {defaults.depth})')
+    parser.add_argument('--fan-out', type=int, default=defaults.fan_out,
+                        help=f'Number of subgroups of each group which is not a leaf group (default: {defaults.fan_out})')
+    parser.add_argument('--projects-per-group', type=int, default=defaults.projects_per_group,
+                        help=f'Number of projects of each leaf group (default: {defaults.projects_per_group})')
+    parser.add_argument('--issues-per-project', type=int, default=defaults.issues_per_project,
+                        help=f'Number of issues of each project (default: {defaults.issues_per_project})')
+    parser.add_argument('--users', type=int, default=defaults.users,
+                        help=f'Number of users, the first one being the owner of the token (default: {defaults.users})')
+    parser.add_argument('--labels', type=int, default=defaults.labels, help=f'Number of labels of each top-level group (default: {defaults.labels})')
+    parser.add_argument('--milestones', type=int, default=defaults.milestones,
+                        help=f'Number of milestones of each top-level group (default: {defaults.milestones})')
+    parser.add_argument('--iterations', type=int, default=defaults.iterations,
+                        help=f'Number of iterations of each top-level group (default: {defaults.iterations})')
+    parser.add_argument('--epics', type=int, default=defaults.epics, help=f'Number of epics of each top-level group (default: {defaults.epics})')
+    parser.add_argument('--group-members', type=int, default=defaults.group_members,
+                        help=f'Number of members of each top-level group (default: {defaults.group_members})')
+    parser.add_argument('--project-members', type=int, default=defaults.project_members,
+                        help=f'Number of members of each project (default: {defaults.project_members})')
+    parser.add_argument('--labels-per-issue', type=int, default=defaults.labels_per_issue,
+                        help=f'Maximal number of labels of an issue (default: {defaults.labels_per_issue})')
+    parser.add_argument('--assignees-per-issue', type=int, default=defaults.assignees_per_issue,
+                        help=f'Maximal number of assignees of an issue (default: {defaults.assignees_per_issue})')
+    parser.add_argument('--closed-ratio', type=float, default=defaults.closed_ratio,
+                        help=f'Ratio of closed issues (default: {defaults.closed_ratio})')
+    for kind in ('label', 'epic', 'milestone', 'assignee'):
+        default = getattr(defaults, f"{kind}_distribution")
+        parser.add_argument(f'--{kind}-distribution', choices=DISTRIBUTIONS, default=default,
+                            help=f'Distribution of the {kind}s of the issues (default: {default})')
+    parser.add_argument('--zipf-exponent', type=float, default=defaults.zipf_exponent,
+                        help=f'Exponent of the Zipf distributions (default: {defaults.zipf_exponent})')
+    parser.add_argument('--username-prefix', default=defaults.username_prefix,
+                        help=f'Prefix of the usernames of the users, except the owner of the token (default: {defaults.username_prefix})')
+    parser.add_argument('--format', choices=['yaml', 'json'], default='yaml', help='Format of the configuration (default: yaml)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the random generator (default: 0)')
+    parser.add_argument('--output', help='Path of the configuration (default: standard output)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    shape = Shape(**{field: getattr(args, field) for field in Shape._fields})
+    if args.output:
+        with open(args.output, 'w') as out:
+            counts = generate(shape, out, args.format, args.seed)
+    else:
+        counts = generate(shape, sys.stdout, args.format, args.seed)
+    logger.info(f"Generated {', '.join(f'{count} {kind}s' for kind, count in counts.items())}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Run the injector against the fake GitLab over generated configurations of increasing size, and report for each
+run the wall time, the entities injected per second, the API calls per entity type, the latency percentiles of
+the requests and the peak RSS of the injector.
+
+Usage (from the root of the repository):
+    python -m benchmarks.run --sizes 100 1000 --output benchmark_results.json
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from benchmarks.generate import Shape, generate, usernames
+from fake_gitlab import FakeGitLab
+
+logger = logging.getLogger("Benchmarks")
+
+DEFAULT_SIZES = [100, 1000, 10000, 100000]
+ISSUES_PER_PROJECT = 100
+PROJECTS_PER_SUBGROUP = 10
+ISSUES_PER_EPIC = 50
+
+# Maps the last static segment of the routes of the fake GitLab to the entity types
+ENTITY_TYPES = {
+    'groups': 'group',
+    'subgroups': 'group',
+    'descendant_groups': 'group',
+    'projects': 'project',
+    'labels': 'label',
+    'milestones': 'milestone',
+    'iterations': 'iteration',
+    'epics': 'epic',
+    'issues': 'issue',
+    'members': 'member',
+    'user': 'user',
+    'users': 'user',
+    'metadata': 'instance',
+    'license': 'instance'
+}
+
+# Maps the names of the GraphQL operations sent by the injector to the entity types
+GRAPHQL_ENTITY_TYPES = {
+    'users': 'user',
+    'createIterations': 'iteration',
+    'updateIterations': 'iteration'
+}
+
+class ErrorCounter(logging.Handler):
+    """
+    Logging handler counting the errors logged by the injector.
+    """
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.count = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.count += 1
+
+def entity_type(request: str) -> str:
+    """
+    Get the entity type of a route of the fake GitLab.
+
+    Args:
+        request: Method and route (e.g., "POST /projects/:id/issues")
+
+    Returns:
+        The entity type (e.g., 'issue')
+    """
+    segments = [segment for segment in request.split(' ', 1)[1].split('/') if segment and not segment.startswith(':')]
+    return ENTITY_TYPES.get(segments[-1], segments[-1])
+
+def percentile(sorted_values: List[float], rank: float) -> Optional[float]:
+    """
+    Get a percentile of values (nearest-rank method).
+
+    Args:
+        sorted_values: The values, sorted
+        rank: The rank of the percentile (e.g., 95)
+
+    Returns:
+        The percentile, None if there is no value
+    """
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, -(-len(sorted_values) * rank // 100) - 1)]
+
+def inject(url: str, config_path: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Inject a configuration, in a dedicated process so that its peak RSS is the one of the injection.
+
+    Args:
+        url: URL of the fake GitLab
+        config_path: Path of the YAML configuration
+        options: Keyword arguments of the injector (e.g., concurrency)
+
+    Returns:
+        The wall time, the latencies of the requests, the peak RSS and the number of errors of the injection
+    """
+    from gitlab_injector import GitLabInjector
+
+    # The progress of the injection is not logged, only its warnings and errors
+    logging.getLogger().setLevel(logging.WARNING)
+    errors = ErrorCounter()
+    logging.getLogger().addHandler(errors)
+    latencies = []
+
+    start = time.perf_counter()
+    injector = GitLabInjector(url, 'benchmark', **options)
+    # The session measures the elapsed time of each REST request, each GraphQL request is timed by the wrapper
+    injector.gl.session.hooks['response'].append(lambda response, *args, **kwargs: latencies.append(response.elapsed.total_seconds()))
+    execute_graphql = injector.gq.execute
+
+    def timed_execute_graphql(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return execute_graphql(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    injector.gq.execute = timed_execute_graphql
+    try:
+        injector.process_yaml(config_path)
+    except SystemExit:
+        errors.count += 1
+    wall_time = time.perf_counter() - start
+
+    try:
+        import resource
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+    except ImportError:
+        peak_rss = None
+    return {'wall_time': wall_time, 'latencies': latencies, 'peak_rss': peak_rss, 'errors': errors.count}
+
+def benchmark_shape(issues: int) -> Shape:
+    """
+    Get the shape of the configuration of a benchmark: a top-level group holding the labels, milestones,
+    iterations, epics (one for 50 issues) and members, and subgroups of 10 projects of 100 issues.
+
+    Args:
+        issues: Number of issues (rounded up to a multiple of 100 above 100)
+
+    Returns:
+        The shape of the configuration
+    """
+    issues_per_project = min(issues, ISSUES_PER_PROJECT)
+    projects = -(-issues // issues_per_project)
+    projects_per_group = min(projects, PROJECTS_PER_SUBGROUP)
+    return Shape(depth=1, fan_out=-(-projects // projects_per_group), projects_per_group=projects_per_group,
+                 issues_per_project=issues_per_project, epics=max(1, issues // ISSUES_PER_EPIC))
+
+def run_benchmark(issues: int, options: Dict[str, Any], latency: float, seed: int, directory: str,
+                  repeat: int = 1) -> Dict[str, Any]:
+    """
+    Run the benchmark of a configuration size against a new fake GitLab.
+
+    Args:
+        issues: Number of issues of the configuration
+        options: Keyword arguments of the injector
+        latency: Latency of the fake GitLab (in seconds)
+        seed: Seed of the configuration
+        directory: Directory where the configuration is written
+        repeat: Number of injections, the fastest one is kept
+
+    Returns:
+        The results of the benchmark
+    """
+    shape = benchmark_shape(issues)
+    config_path = os.path.join(directory, f"benchmark_{issues}.yaml")
+    with open(config_path, 'w') as f:
+        entities = generate(shape, f, seed=seed)
+
+    injection, requests, graphql_requests = None, {}, {}
+    for _ in range(repeat):
+        with FakeGitLab(latency=latency, usernames=tuple(usernames(shape))) as fake:
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+                run = executor.submit(inject, fake.url, config_path, options).result()
+            if injection is None or run['wall_time'] < injection['wall_time']:
+                injection, requests, graphql_requests = run, dict(fake.requests), dict(fake.graphql_requests)
+    os.remove(config_path)
+
+    # The GraphQL requests are counted against the entity type of their operation (e.g., iteration)
+    calls: Dict[str, int] = {}
+    for request, count in sorted(requests.items()):
+        if request != 'POST /graphql':
+            calls[entity_type(request)] = calls.get(entity_type(request), 0) + count
+    for operation, count in sorted(graphql_requests.items()):
+        kind = GRAPHQL_ENTITY_TYPES.get(operation, 'graphql')
+        calls[kind] = calls.get(kind, 0) + count
+    latencies = sorted(injection['latencies'])
+    total_entities = sum(entities.values())
+    return {
+        'name': f"issues-{issues}",
+        'issues': issues,
+        'entities': entities,
+        'wall_time': round(injection['wall_time'], 3),
+        'entities_per_second': round(total_entities / injection['wall_time'], 1),
+        'calls': calls,
+        'total_calls': sum(calls.values()),
+        'calls_per_entity': {kind: round(calls.get(kind, 0) / count, 3) for kind, count in entities.items() if count},
+        'requests': requests,
+        'graphql_requests': graphql_requests,
+        'latency': {
+            'mean': round(statistics.fmean(latencies), 6) if latencies else None,
+            **{f"p{rank}": percentile(latencies, rank) for rank in (50, 95, 99)}
+        },
+        'peak_rss_mb': round(injection['peak_rss'] / 2 ** 20, 1) if injection['peak_rss'] else None,
+        'errors': injection['errors']
+    }
+
+def git_revision() -> Optional[str]:
+    """
+    Returns:
+        The Git revision of the injector, suffixed with "-dirty" if the working tree has uncommitted changes,
+        None if unknown
+    """
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty', '--abbrev=7'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the GitLab injector against a fake GitLab')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help=f"Numbers of issues of the benchmarked configurations (default: {' '.join(map(str, DEFAULT_SIZES))})")
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrency of the injector (default: 8)')
+    parser.add_argument('--stream', action='store_true', help='Stream the configurations instead of loading them at once')
+    parser.add_argument('--latency', type=float, default=0.0, help='Latency of the fake GitLab, in seconds (default: 0)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the generated configurations (default: 0)')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='Number of injections of each configuration, the fastest one is reported (default: 1)')
+    parser.add_argument('--output', default='benchmark_results.json', help='Path of the JSON results (default: benchmark_results.json)')
+    args = parser.parse_args()
+    assert args.repeat >= 1, "--repeat must be at least 1"
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    options = {'concurrency': args.concurrency}
+    if args.stream:
+        options['stream'] = True
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for issues in args.sizes:
+            logger.info(f"Benchmarking {issues} issues…")
+            result = run_benchmark(issues, options, args.latency, args.seed, directory, args.repeat)
+            latency = result['latency']
+            logger.info(f"{result['name']}: {result['wall_time']:.1f} s, {result['entities_per_second']:.0f} entities/s, "
+                        f"{result['total_calls']} API calls ({result['calls_per_entity'].get('issue', 0):.2f} per issue), "
+                        f"latency p50/p95/p99 {latency['p50']}/{latency['p95']}/{latency['p99']} s, "
+                        f"peak RSS {result['peak_rss_mb']} MB, {result['errors']} errors")
+            results.append(result)
+
+    report = {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'options': {**options, 'latency': args.latency, 'seed': args.seed, 'repeat': args.repeat},
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Results written to {args.output}")
+
+if __name__ == '__main__':
+    main()
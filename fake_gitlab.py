@@ -0,0 +1,877 @@
+#!/usr/bin/env python3
+"""
+Fake GitLab server, running in-process, to exercise the injector without a GitLab instance.
+
+It implements the subset of the GitLab REST API used by the injector (user, metadata, users, groups, projects,
+labels, milestones, epics, issues, members and iterations) and the GraphQL queries and mutations it sends
+(users, createIteration and updateIteration). The entities are kept in memory.
+The latency of each request and the maximal page size of the listings are configurable, a rate limit can be
+enforced (with the RateLimit-* headers of GitLab), and failures can be injected in given routes.
+"""
+
+import argparse
+import functools
+import itertools
+import json
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs, quote, unquote, urlencode, urlsplit
+
+logger = logging.getLogger("FakeGitLab")
+
+# Default and maximal number of entities per page of a listing (these are GitLab's values)
+DEFAULT_PER_PAGE = 20
+MAX_PER_PAGE = 100
+
+class FakeGitLabError(Exception):
+    """
+    Error returned to the client as an HTTP error response.
+    """
+
+    def __init__(self, status: int, message: Any, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+class Fault(NamedTuple):
+    """
+    Failure injected in a route of the fake GitLab.
+    """
+    status: int      # HTTP status of the response
+    processed: bool  # True if the request is processed before failing (e.g., a creation lost by a proxy)
+
+class FakeGitLab:
+    """
+    In-memory GitLab, served over HTTP by a background thread.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0, max_per_page: int = MAX_PER_PAGE,
+                 enterprise: bool = True, usernames: Tuple[str, ...] = (), current_username: str = 'root',
+                 rate_limit: Optional[int] = None, rate_limit_window: float = 60.0):
+        """
+        Initialize the fake GitLab, without starting it.
+
+        Args:
+            host: Host to listen on
+            port: Port to listen on (0 for any free port)
+            latency: Delay added to each request (in seconds)
+            max_per_page: Maximal number of entities per page of a listing
+            enterprise: True to emulate an Enterprise Edition with an Ultimate license (epics, iterations and
+                        weights are available), False to emulate a Community Edition
+            usernames: Usernames of the users existing in GitLab, in addition to the current user
+            current_username: Username of the user authenticated by any token
+            rate_limit: Maximal number of requests per window (None for no limit), the responses then have the
+                        RateLimit-* headers of GitLab and the requests beyond the limit are rejected with HTTP 429
+            rate_limit_window: Duration of the rate limit window (in seconds)
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.max_per_page = max_per_page
+        self.enterprise = enterprise
+        self.lock = threading.Lock()
+        self.server: Optional[ThreadingHTTPServer] = None
+        self.thread: Optional[threading.Thread] = None
+        self.requests: Counter = Counter()  # Maps "<method> <route>" (e.g., "POST /projects/:id/issues") to the number of requests
+        self.graphql_requests: Counter = Counter()  # Maps the names of the GraphQL operations (e.g., "createIterations") to the number of requests
+        self.faults: Dict[str, List[Fault]] = {}  # Maps "<method> <route>" to the failures of its next requests
+        self.rate_limit = rate_limit
+        self.rate_limit_window = rate_limit_window
+        self.rate_limit_reset = 0.0     # End of the current rate limit window (epoch time)
+        self.rate_limit_observed = 0    # Number of requests received in the current rate limit window
+
+        self.ids = itertools.count(1)
+        self.users: Dict[int, Dict[str, Any]] = {}
+        for username in (current_username,) + tuple(usernames):
+            self.add_user(username)
+        self.current_user = next(iter(self.users.values()))
+        self.groups: Dict[int, Dict[str, Any]] = {}
+        self.projects: Dict[int, Dict[str, Any]] = {}
+        # The content of the groups and projects is keyed by ('groups' or 'projects', GitLab ID)
+        self.labels: Dict[Tuple[str, int], List[Dict[str, Any]]] = {}
+        self.milestones: Dict[Tuple[str, int], List[Dict[str, Any]]] = {}
+        self.members: Dict[Tuple[str, int], Dict[int, int]] = {}
+        self.epics: Dict[int, List[Dict[str, Any]]] = {}
+        self.iterations: Dict[int, List[Dict[str, Any]]] = {}
+        self.issues: Dict[int, List[Dict[str, Any]]] = {}
+
+        # Routes of the REST API (relative to /api/v4), the parameters of the routes are passed to the handlers
+        self.routes: List[Tuple[str, str, Any, Callable[..., Any]]] = [
+            (method, route, self.compile_route(route), handler) for method, route, handler in [
+                ('GET', '/user', self.get_user),
+                ('GET', '/metadata', self.get_metadata),
+                ('GET', '/license', self.get_license),
+                ('GET', '/users', self.list_users),
+                ('GET', '/groups', self.list_groups),
+                ('POST', '/groups', self.create_group),
+                ('GET', '/groups/:id', self.get_group),
+                ('PUT', '/groups/:id', self.update_group),
+                ('GET', '/groups/:id/descendant_groups', self.list_descendant_groups),
+                ('GET', '/groups/:id/subgroups', self.list_subgroups),
+                ('GET', '/groups/:id/projects', self.list_group_projects),
+                ('POST', '/projects', self.create_project),
+                ('GET', '/projects/:id', self.get_project),
+                ('PUT', '/projects/:id', self.update_project),
+                ('GET', '/:kind/:id/labels', self.list_labels),
+                ('POST', '/:kind/:id/labels', self.create_label),
+                ('PUT', '/:kind/:id/labels/:label_id', self.update_label),
+                ('GET', '/:kind/:id/milestones', self.list_milestones),
+                ('POST', '/:kind/:id/milestones', self.create_milestone),
+                ('PUT', '/:kind/:id/milestones/:milestone_id', self.update_milestone),
+                ('GET', '/:kind/:id/members', self.list_members),
+                ('POST', '/:kind/:id/members', self.add_members),
+                ('PUT', '/:kind/:id/members/:user_id', self.update_member),
+                ('GET', '/groups/:id/epics', self.list_epics),
+                ('POST', '/groups/:id/epics', self.create_epic),
+                ('PUT', '/groups/:id/epics/:iid', self.update_epic),
+                ('GET', '/groups/:id/iterations', self.list_iterations),
+                ('GET', '/projects/:id/issues', self.list_issues),
+                ('POST', '/projects/:id/issues', self.create_issue),
+                ('PUT', '/projects/:id/issues/:iid', self.update_issue),
+            ]]
+
+    @property
+    def url(self) -> str:
+        """
+        Returns:
+            The URL of the fake GitLab (once started)
+        """
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> str:
+        """
+        Start serving the fake GitLab in a background thread.
+
+        Returns:
+            The URL of the fake GitLab
+        """
+        fake = self
+
+        class Handler(FakeGitLabRequestHandler):
+            gitlab = fake
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, name="fake-gitlab", daemon=True)
+        self.thread.start()
+        logger.info(f"Fake GitLab listening on {self.url}")
+        return self.url
+
+    def stop(self) -> None:
+        """
+        Stop the fake GitLab.
+        """
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def __enter__(self) -> 'FakeGitLab':
+        self.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+    def fail(self, request: str, status: int, count: int = 1, processed: bool = False) -> None:
+        """
+        Make the next requests of a route fail.
+
+        Args:
+            request: Method and route (e.g., "POST /projects/:id/issues", or "POST /graphql" for GraphQL)
+            status: HTTP status of the failed responses (e.g., 503)
+            count: Number of requests failing
+            processed: True to process the requests before failing, as when the response of a completed request is lost
+        """
+        with self.lock:
+            self.faults.setdefault(request, []).extend([Fault(status, processed)] * count)
+
+    def handle(self, method: str, path: str, query: Dict[str, List[str]], body: Any) -> Tuple[int, Any, Optional[Dict[str, Any]], Dict[str, str]]:
+        """
+        Handle a request.
+
+        Args:
+            method: HTTP method
+            path: Path of the request, its segments being still URL-encoded
+            query: Query parameters
+            body: Decoded JSON body (or form parameters)
+
+        Returns:
+            The HTTP status, the JSON body, the pagination parameters (None if the result is not a listing)
+            and the rate limit headers
+        """
+        operation = None
+        if path == '/api/graphql' and method == 'POST':
+            request, handler = 'POST /graphql', lambda: self.graphql(body.get('query', ''), body.get('variables') or {})
+            match = re.match(r'\s*(?:query|mutation)\s+(\w+)', body.get('query', ''))
+            operation = match.group(1) if match else 'anonymous'
+        elif path.startswith('/api/v4/'):
+            request, handler = self.route(method, path[len('/api/v4'):], query, body)
+        else:
+            raise FakeGitLabError(404, '404 Not Found')
+
+        with self.lock:
+            self.requests[request] += 1
+            if operation:
+                self.graphql_requests[operation] += 1
+            headers = self.throttle()
+            fault = self.faults[request].pop(0) if self.faults.get(request) else None
+            if fault and not fault.processed:
+                raise FakeGitLabError(fault.status, f"{fault.status} Injected failure", headers)
+            result = handler()
+            if fault:
+                raise FakeGitLabError(fault.status, f"{fault.status} Injected failure", headers)
+        if request == 'POST /graphql':
+            return 200, result, None, headers
+        if method == 'POST':
+            return 201, result, None, headers
+        if isinstance(result, list):
+            return 200, result, query, headers
+        return 200, result, None, headers
+
+    def route(self, method: str, path: str, query: Dict[str, List[str]], body: Any) -> Tuple[str, Callable[[], Any]]:
+        """
+        Find the route of a REST request.
+
+        Args:
+            method: HTTP method
+            path: Path of the request relative to /api/v4, its segments being still URL-encoded
+            query: Query parameters
+            body: Decoded JSON body (or form parameters)
+
+        Returns:
+            The method and route of the request (e.g., "POST /projects/:id/issues") and the function handling it
+        """
+        params = {name: values[-1] for name, values in query.items()}
+        params.update(body if isinstance(body, dict) else {})
+        for route_method, route, pattern, handler in self.routes:
+            match = pattern.match(path)
+            if match and route_method == method:
+                arguments = {name: unquote(value) for name, value in match.groupdict().items()}
+                return f"{method} {route}", functools.partial(handler, params, **arguments)
+        raise FakeGitLabError(404, '404 Not Found')
+
+    def throttle(self) -> Dict[str, str]:
+        """
+        Count a request against the rate limit, as GitLab does.
+        Must be called with the lock held.
+
+        Returns:
+            The rate limit headers of the response (none if there is no rate limit)
+
+        Raises:
+            FakeGitLabError: HTTP 429 if the rate limit is exceeded
+        """
+        if self.rate_limit is None:
+            return {}
+        now = time.time()
+        if now >= self.rate_limit_reset:
+            self.rate_limit_reset = now + self.rate_limit_window
+            self.rate_limit_observed = 0
+        self.rate_limit_observed += 1
+        headers = {
+            'RateLimit-Limit': str(self.rate_limit),
+            'RateLimit-Observed': str(self.rate_limit_observed),
+            'RateLimit-Remaining': str(max(self.rate_limit - self.rate_limit_observed, 0)),
+            'RateLimit-Reset': str(math.ceil(self.rate_limit_reset))
+        }
+        if self.rate_limit_observed > self.rate_limit:
+            headers['Retry-After'] = str(math.ceil(self.rate_limit_reset - now))
+            raise FakeGitLabError(429, 'Retry later', headers)
+        return headers
+
+    # Helpers
+
+    @staticmethod
+    def compile_route(route: str) -> Any:
+        """
+        Compile a route into a regular expression, ':kind' matching 'groups' or 'projects' and the other
+        parameters matching a path segment.
+        """
+        pattern = re.sub(r':(\w+)', lambda m: '(?P<kind>groups|projects)' if m.group(1) == 'kind' else f"(?P<{m.group(1)}>[^/]+)", route)
+        return re.compile(f"^{pattern}$")
+
+    def add_user(self, username: str) -> Dict[str, Any]:
+        """
+        Add a user to the fake GitLab.
+
+        Args:
+            username: Username of the user
+
+        Returns:
+            The user
+        """
+        user_id = next(self.ids)
+        user = {'id': user_id, 'username': username, 'name': username, 'state': 'active'}
+        self.users[user_id] = user
+        return user
+
+    def find_group(self, id: str) -> Dict[str, Any]:
+        """
+        Find a group by GitLab ID or full path.
+        """
+        group = self.groups.get(int(id)) if id.isdigit() else next(
+            (g for g in self.groups.values() if g['full_path'] == id), None)
+        if group is None:
+            raise FakeGitLabError(404, '404 Group Not Found')
+        return group
+
+    def find_project(self, id: str) -> Dict[str, Any]:
+        """
+        Find a project by GitLab ID or full path.
+        """
+        project = self.projects.get(int(id)) if id.isdigit() else next(
+            (p for p in self.projects.values() if p['path_with_namespace'] == id), None)
+        if project is None:
+            raise FakeGitLabError(404, '404 Project Not Found')
+        return project
+
+    def find_container(self, kind: str, id: str) -> Tuple[str, int]:
+        """
+        Find a group or a project.
+
+        Returns:
+            The key of its content: (kind, GitLab ID)
+        """
+        container = self.find_group(id) if kind == 'groups' else self.find_project(id)
+        return kind, container['id']
+
+    def check_licensed(self) -> None:
+        """
+        Fail as GitLab does for a feature not available with the license.
+        """
+        if not self.enterprise:
+            raise FakeGitLabError(404, '404 Not Found')
+
+    @staticmethod
+    def search(entities: List[Dict[str, Any]], params: Dict[str, Any], attribute: str = 'title') -> List[Dict[str, Any]]:
+        """
+        Filter entities by the 'search', 'state' and 'created_after' parameters of a listing.
+        """
+        if params.get('search'):
+            entities = [e for e in entities if params['search'].lower() in e[attribute].lower()]
+        if params.get('state') and params['state'] != 'all':
+            entities = [e for e in entities if e.get('state') == params['state']]
+        if params.get('created_after'):
+            created_after = datetime.fromisoformat(params['created_after'].replace('Z', '+00:00'))
+            entities = [e for e in entities if 'created_at' in e and
+                        datetime.fromisoformat(e['created_at'].replace('Z', '+00:00')) >= created_after]
+        return entities
+
+    @staticmethod
+    def split_labels(labels: Any) -> List[str]:
+        """
+        Get the label names of a 'labels' parameter, given as a list or as a comma-separated string.
+        """
+        if isinstance(labels, list):
+            return [str(label) for label in labels if label]
+        return [label for label in str(labels or '').split(',') if label]
+
+    @staticmethod
+    def state_after(state: str, state_event: Optional[str], opened: str = 'opened') -> str:
+        """
+        Get the state of an entity after a state event.
+        """
+        if state_event == 'close':
+            return 'closed'
+        if state_event in ('reopen', 'activate'):
+            return opened
+        return state
+
+    # Users and instance
+
+    def get_user(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return self.current_user
+
+    def get_metadata(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {'version': '17.0.0', 'revision': 'fake', 'enterprise': self.enterprise}
+
+    def get_license(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        self.check_licensed()
+        return {'plan': 'ultimate', 'expired': False}
+
+    def list_users(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        users = list(self.users.values())
+        if params.get('username'):
+            users = [u for u in users if u['username'].lower() == params['username'].lower()]
+        return users
+
+    # Groups
+
+    def list_groups(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return self.search(list(self.groups.values()), params, 'name')
+
+    def create_group(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        parent = self.find_group(str(params['parent_id'])) if params.get('parent_id') else None
+        full_path = f"{parent['full_path']}/{params['path']}" if parent else params['path']
+        if any(g['full_path'] == full_path for g in self.groups.values()):
+            raise FakeGitLabError(400, {'path': ['has already been taken']})
+        group_id = next(self.ids)
+        group = {
+            'id': group_id,
+            'name': params['name'],
+            'path': params['path'],
+            'full_path': full_path,
+            'full_name': f"{parent['full_name']} / {params['name']}" if parent else params['name'],
+            'parent_id': parent['id'] if parent else None,
+            'description': params.get('description', ''),
+            'visibility': params.get('visibility', 'private'),
+            'web_url': f"{self.url}/groups/{full_path}"
+        }
+        self.groups[group_id] = group
+        self.members[('groups', group_id)] = {self.current_user['id']: 50}
+        return group
+
+    def get_group(self, params: Dict[str, Any], id: str) -> Dict[str, Any]:
+        return self.find_group(id)
+
+    def update_group(self, params: Dict[str, Any], id: str) -> Dict[str, Any]:
+        group = self.find_group(id)
+        if 'description' in params:
+            group['description'] = params['description']
+        return group
+
+    def list_descendant_groups(self, params: Dict[str, Any], id: str) -> List[Dict[str, Any]]:
+        group = self.find_group(id)
+        return self.search([g for g in self.groups.values() if g['full_path'].startswith(f"{group['full_path']}/")],
+                           params, 'name')
+
+    def list_subgroups(self, params: Dict[str, Any], id: str) -> List[Dict[str, Any]]:
+        group = self.find_group(id)
+        return self.search([g for g in self.groups.values() if g['parent_id'] == group['id']], params, 'name')
+
+    # Projects
+
+    def list_group_projects(self, params: Dict[str, Any], id: str) -> List[Dict[str, Any]]:
+        group = self.find_group(id)
+        if str(params.get('include_subgroups', '')).lower() == 'true':
+            projects = [p for p in self.projects.values()
+                        if p['namespace']['id'] == group['id'] or p['namespace']['full_path'].startswith(f"{group['full_path']}/")]
+        else:
+            projects = [p for p in self.projects.values() if p['namespace']['id'] == group['id']]
+        return self.search(projects, params, 'name')
+
+    def create_project(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        namespace = self.find_group(str(params['namespace_id']))
+        path = params.get('path') or re.sub(r'[^a-z0-9_.-]+', '-', params['name'].lower())
+        if any(p['path_with_namespace'] == f"{namespace['full_path']}/{path}" for p in self.projects.values()):
+            raise FakeGitLabError(400, {'name': ['has already been taken']})
+        project_id = next(self.ids)
+        project = {
+            'id': project_id,
+            'name': params['name'],
+            'path': path,
+            'path_with_namespace': f"{namespace['full_path']}/{path}",
+            'namespace': {'id': namespace['id'], 'name': namespace['name'], 'path': namespace['path'],
+                          'full_path': namespace['full_path'], 'kind': 'group'},
+            'description': params.get('description', ''),
+            'visibility': params.get('visibility', 'private'),
+            'import_status': 'none',
+            'web_url': f"{self.url}/{namespace['full_path']}/{path}"
+        }
+        self.projects[project_id] = project
+        self.members[('projects', project_id)] = {}
+        return project
+
+    def get_project(self, params: Dict[str, Any], id: str) -> Dict[str, Any]:
+        return self.find_project(id)
+
+    def update_project(self, params: Dict[str, Any], id: str) -> Dict[str, Any]:
+        project = self.find_project(id)
+        if 'description' in params:
+            project['description'] = params['description']
+        return project
+
+    # Labels
+
+    def list_labels(self, params: Dict[str, Any], kind: str, id: str) -> List[Dict[str, Any]]:
+        return self.search(self.labels.get(self.find_container(kind, id), []), params, 'name')
+
+    def create_label(self, params: Dict[str, Any], kind: str, id: str) -> Dict[str, Any]:
+        labels = self.labels.setdefault(self.find_container(kind, id), [])
+        if any(label['name'] == params['name'] for label in labels):
+            raise FakeGitLabError(409, 'Label already exists')
+        label = {'id': next(self.ids), 'name': params['name'], 'color': params['color'],
+                 'description': params.get('description', '')}
+        labels.append(label)
+        return label
+
+    def update_label(self, params: Dict[str, Any], kind: str, id: str, label_id: str) -> Dict[str, Any]:
+        labels = self.labels.get(self.find_container(kind, id), [])
+        label = next((l for l in labels if str(l['id']) == label_id or l['name'] == label_id), None)
+        if label is None:
+            raise FakeGitLabError(404, '404 Label Not Found')
+        if params.get('new_name'):
+            label['name'] = params['new_name']
+        for attribute in ('color', 'description'):
+            if attribute in params:
+                label[attribute] = params[attribute]
+        return label
+
+    # Milestones
+
+    def list_milestones(self, params: Dict[str, Any], kind: str, id: str) -> List[Dict[str, Any]]:
+        return self.search(self.milestones.get(self.find_container(kind, id), []), params)
+
+    def create_milestone(self, params: Dict[str, Any], kind: str, id: str) -> Dict[str, Any]:
+        key = self.find_container(kind, id)
+        milestones = self.milestones.setdefault(key, [])
+        if any(m['title'] == params['title'] for m in milestones):
+            raise FakeGitLabError(400, {'title': ['already being used for another group or project milestone']})
+        milestone = {'id': next(self.ids), 'iid': len(milestones) + 1, 'title': params['title'],
+                     'description': params.get('description', ''), 'start_date': params.get('start_date'),
+                     'due_date': params.get('due_date'), 'state': 'active',
+                     'group_id' if kind == 'groups' else 'project_id': key[1]}
+        milestones.append(milestone)
+        return milestone
+
+    def update_milestone(self, params: Dict[str, Any], kind: str, id: str, milestone_id: str) -> Dict[str, Any]:
+        milestones = self.milestones.get(self.find_container(kind, id), [])
+        milestone = next((m for m in milestones if m['id'] == int(milestone_id)), None)
+        if milestone is None:
+            raise FakeGitLabError(404, '404 Milestone Not Found')
+        for attribute in ('title', 'description', 'start_date', 'due_date'):
+            if attribute in params:
+                milestone[attribute] = params[attribute] or None if attribute.endswith('date') else params[attribute]
+        milestone['state'] = self.state_after(milestone['state'], params.get('state_event'), 'active')
+        return milestone
+
+    # Members
+
+    def member(self, user_id: int, access_level: int) -> Dict[str, Any]:
+        """
+        Get the representation of a member.
+        """
+        user = self.users[user_id]
+        return {'id': user_id, 'username': user['username'], 'name': user['name'], 'access_level': access_level}
+
+    def list_members(self, params: Dict[str, Any], kind: str, id: str) -> List[Dict[str, Any]]:
+        members = self.members.setdefault(self.find_container(kind, id), {})
+        return [self.member(user_id, access_level) for user_id, access_level in members.items()]
+
+    def add_members(self, params: Dict[str, Any], kind: str, id: str) -> Dict[str, Any]:
+        members = self.members.setdefault(self.find_container(kind, id), {})
+        user_ids = [int(user_id) for user_id in str(params['user_id']).split(',')]
+        errors = {}
+        for user_id in user_ids:
+            if user_id not in self.users:
+                errors[str(user_id)] = 'User not found'
+            elif user_id in members:
+                errors[self.users[user_id]['username']] = 'Member already exists'
+            else:
+                members[user_id] = int(params['access_level'])
+        if len(user_ids) == 1:
+            if errors:
+                raise FakeGitLabError(409, next(iter(errors.values())))
+            return self.member(user_ids[0], members[user_ids[0]])
+        if errors:
+            return {'status': 'error', 'message': errors}
+        return {'status': 'success'}
+
+    def update_member(self, params: Dict[str, Any], kind: str, id: str, user_id: str) -> Dict[str, Any]:
+        members = self.members.setdefault(self.find_container(kind, id), {})
+        if int(user_id) not in members:
+            raise FakeGitLabError(404, '404 Member Not Found')
+        members[int(user_id)] = int(params['access_level'])
+        return self.member(int(user_id), members[int(user_id)])
+
+    # Epics
+
+    def list_epics(self, params: Dict[str, Any], id: str) -> List[Dict[str, Any]]:
+        self.check_licensed()
+        return self.search(self.epics.get(self.find_group(id)['id'], []), params)
+
+    def create_epic(self, params: Dict[str, Any], id: str) -> Dict[str, Any]:
+        self.check_licensed()
+        group = self.find_group(id)
+        epics = self.epics.setdefault(group['id'], [])
+        epic = {'id': next(self.ids), 'iid': len(epics) + 1, 'group_id': group['id'], 'title': params['title'],
+                'description': params.get('description', ''), 'state': 'opened',
+                'labels': self.split_labels(params.get('labels')), 'parent_id': params.get('parent_id')}
+        epics.append(epic)
+        return epic
+
+    def update_epic(self, params: Dict[str, Any], id: str, iid: str) -> Dict[str, Any]:
+        self.check_licensed()
+        epic = next((e for e in self.epics.get(self.find_group(id)['id'], []) if e['iid'] == int(iid)), None)
+        if epic is None:
+            raise FakeGitLabError(404, '404 Epic Not Found')
+        for attribute in ('title', 'description', 'parent_id'):
+            if attribute in params:
+                epic[attribute] = params[attribute]
+        if 'labels' in params:
+            epic['labels'] = self.split_labels(params['labels'])
+        epic['state'] = self.state_after(epic['state'], params.get('state_event'))
+        return epic
+
+    # Iterations
+
+    def list_iterations(self, params: Dict[str, Any], id: str) -> List[Dict[str, Any]]:
+        self.check_licensed()
+        return self.search(self.iterations.get(self.find_group(id)['id'], []), params)
+
+    # Issues
+
+    def set_issue_attributes(self, issue: Dict[str, Any], params: Dict[str, Any]) -> None:
+        """
+        Set the attributes of an issue from the parameters of its creation or update.
+        """
+        if 'title' in params:
+            issue['title'] = params['title']
+        if 'description' in params:
+            # The "/iteration *iteration:<ID>" quick action sets the iteration and is removed from the description
+            lines = []
+            for line in str(params['description'] or '').split('\n'):
+                match = re.fullmatch(r'/iteration \*iteration:(\d+)', line.strip())
+                if match and self.enterprise:
+                    issue['iteration'] = {'id': int(match.group(1))}
+                elif not match:
+                    lines.append(line)
+            issue['description'] = '\n'.join(lines)
+        if 'labels' in params:
+            issue['labels'] = self.split_labels(params['labels'])
+        if 'milestone_id' in params:
+            milestone_id = int(params['milestone_id'] or 0)
+            issue['milestone'] = {'id': milestone_id} if milestone_id else None
+        if 'assignee_ids' in params:
+            # As GitLab, the assignees who cannot read the project are silently dropped
+            assignee_ids = params['assignee_ids'] if isinstance(params['assignee_ids'], list) else \
+                str(params['assignee_ids']).split(',')
+            project = self.projects[issue['project_id']]
+            issue['assignees'] = [{'id': int(user_id), 'username': self.users[int(user_id)]['username']}
+                                  for user_id in assignee_ids
+                                  if int(user_id or 0) in self.users and self.can_read(project, int(user_id))]
+        if self.enterprise and 'weight' in params:
+            issue['weight'] = params['weight']
+        if self.enterprise and 'epic_id' in params:
+            epic_id = int(params['epic_id'] or 0)
+            issue['epic'] = {'id': epic_id} if epic_id else None
+
+    def list_issues(self, params: Dict[str, Any], id: str) -> List[Dict[str, Any]]:
+        return self.search(self.issues.get(self.find_project(id)['id'], []), params)
+
+    def create_issue(self, params: Dict[str, Any], id: str) -> Dict[str, Any]:
+        project = self.find_project(id)
+        issues = self.issues.setdefault(project['id'], [])
+        created_at = datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+        issue = {'id': next(self.ids), 'iid': len(issues) + 1, 'project_id': project['id'], 'state': 'opened',
+                 'labels': [], 'milestone': None, 'assignees': [], 'created_at': created_at}
+        self.set_issue_attributes(issue, params)
+        issues.append(issue)
+        return issue
+
+    def can_read(self, project: Dict[str, Any], user_id: int) -> bool:
+        """
+        Check if a user can read a project: it is public, or the user is a member of it or of one of its ancestor groups.
+        """
+        if project['visibility'] == 'public' or user_id in self.members.get(('projects', project['id']), {}):
+            return True
+        group_id = project['namespace']['id']
+        while group_id:
+            if user_id in self.members.get(('groups', group_id), {}):
+                return True
+            group_id = self.groups[group_id]['parent_id']
+        return False
+
+    def update_issue(self, params: Dict[str, Any], id: str, iid: str) -> Dict[str, Any]:
+        issue = next((i for i in self.issues.get(self.find_project(id)['id'], []) if i['iid'] == int(iid)), None)
+        if issue is None:
+            raise FakeGitLabError(404, '404 Issue Not Found')
+        self.set_issue_attributes(issue, params)
+        issue['state'] = self.state_after(issue['state'], params.get('state_event'))
+        return issue
+
+    # GraphQL
+
+    def graphql(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Execute the GraphQL queries and mutations sent by the injector.
+
+        Args:
+            query: The GraphQL query
+            variables: The variables of the query
+
+        Returns:
+            The GraphQL response
+        """
+        mutations = re.findall(r'(\w+)\s*:\s*(createIteration|updateIteration)\s*\(\s*input\s*:\s*\$(\w+)\s*\)', query)
+        if mutations:
+            if not self.enterprise:
+                return {'data': None, 'errors': [{'message': "Field 'createIteration' doesn't exist on type 'Mutation'"}]}
+            return {'data': {alias: self.mutate_iteration(mutation, variables[variable])
+                             for alias, mutation, variable in mutations}}
+        if re.search(r'\busers\s*\(', query):
+            usernames = {username.lower() for username in variables.get('usernames') or []}
+            nodes = [{'id': f"gid://gitlab/User/{u['id']}", 'username': u['username']}
+                     for u in self.users.values() if u['username'].lower() in usernames]
+            return {'data': {'users': {'nodes': nodes}}}
+        return {'data': None, 'errors': [{'message': 'Query not supported by the fake GitLab'}]}
+
+    def mutate_iteration(self, mutation: str, iteration_input: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Create or update an iteration.
+
+        Args:
+            mutation: 'createIteration' or 'updateIteration'
+            iteration_input: Input of the mutation
+
+        Returns:
+            The payload of the mutation
+        """
+        try:
+            group = self.find_group(iteration_input['groupPath'])
+        except FakeGitLabError:
+            return {'iteration': None, 'errors': ['Group not found']}
+        iterations = self.iterations.setdefault(group['id'], [])
+        if mutation == 'createIteration':
+            if any(i['title'] == iteration_input.get('title') for i in iterations):
+                return {'iteration': None, 'errors': ['Title already being used for another iteration']}
+            iteration = {'id': next(self.ids), 'iid': len(iterations) + 1, 'group_id': group['id'], 'state': 'upcoming'}
+            iterations.append(iteration)
+        else:
+            iteration = next((i for i in iterations if f"gid://gitlab/Iteration/{i['id']}" == iteration_input.get('id')), None)
+            if iteration is None:
+                return {'iteration': None, 'errors': ['Iteration not found']}
+        for attribute, name in (('title', 'title'), ('description', 'description'),
+                                ('startDate', 'start_date'), ('dueDate', 'due_date')):
+            if attribute in iteration_input:
+                iteration[name] = iteration_input[attribute]
+        iteration['state'] = self.state_after(iteration['state'], iteration_input.get('stateEvent'))
+        return {'iteration': {'id': f"gid://gitlab/Iteration/{iteration['id']}"}, 'errors': []}
+
+class FakeGitLabRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP request handler of the fake GitLab, the `gitlab` class attribute is set to the served FakeGitLab.
+    """
+    gitlab: FakeGitLab
+    protocol_version = 'HTTP/1.1'  # Keep the connections alive, as GitLab does
+    # Send the headers and the body of a response in a single segment, without waiting for the ACK of the client
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        self.dispatch()
+
+    def do_POST(self) -> None:
+        self.dispatch()
+
+    def do_PUT(self) -> None:
+        self.dispatch()
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(format % args)
+
+    def dispatch(self) -> None:
+        """
+        Handle a request and send the response.
+        """
+        if self.gitlab.latency:
+            time.sleep(self.gitlab.latency)
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        length = int(self.headers.get('Content-Length') or 0)
+        raw_body = self.rfile.read(length) if length else b''
+        try:
+            if not (self.headers.get('PRIVATE-TOKEN') or self.headers.get('Authorization')):
+                raise FakeGitLabError(401, '401 Unauthorized')
+            if 'json' in (self.headers.get('Content-Type') or '') and raw_body:
+                body = json.loads(raw_body)
+            else:
+                body = {name: values[-1] for name, values in parse_qs(raw_body.decode('utf-8')).items()}
+            status, result, pagination, headers = self.gitlab.handle(self.command, url.path, query, body)
+        except FakeGitLabError as e:
+            self.send_json(e.status, {'message': e.message}, e.headers)
+            return
+        except (KeyError, ValueError, TypeError) as e:
+            self.send_json(400, {'message': f"400 Bad request - {e}"})
+            return
+        if pagination is not None:
+            result, pagination_headers = self.paginate(url.path, query, result)
+            headers.update(pagination_headers)
+        self.send_json(status, result, headers)
+
+    def paginate(self, path: str, query: Dict[str, List[str]], entities: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+        """
+        Get a page of a listing, with the pagination headers of GitLab.
+
+        Args:
+            path: Path of the listing
+            query: Query parameters of the listing
+            entities: All the listed entities
+
+        Returns:
+            The entities of the requested page and the pagination headers
+        """
+        per_page = min(int(query.get('per_page', [DEFAULT_PER_PAGE])[-1]), self.gitlab.max_per_page)
+        page = max(int(query.get('page', ['1'])[-1]), 1)
+        total_pages = max((len(entities) + per_page - 1) // per_page, 1)
+        headers = {
+            'X-Page': str(page),
+            'X-Per-Page': str(per_page),
+            'X-Total': str(len(entities)),
+            'X-Total-Pages': str(total_pages),
+            'X-Next-Page': str(page + 1) if page < total_pages else '',
+            'X-Prev-Page': str(page - 1) if page > 1 else ''
+        }
+
+        def page_url(number: int) -> str:
+            parameters = {name: values[-1] for name, values in query.items()}
+            parameters.update({'page': number, 'per_page': per_page})
+            return f"http://{self.headers.get('Host')}{quote(path, safe='/%')}?{urlencode(parameters)}"
+
+        links = [f'<{page_url(1)}>; rel="first"', f'<{page_url(total_pages)}>; rel="last"']
+        if page < total_pages:
+            links.insert(0, f'<{page_url(page + 1)}>; rel="next"')
+        headers['Link'] = ', '.join(links)
+        return entities[(page - 1) * per_page:page * per_page], headers
+
+    def send_json(self, status: int, result: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        """
+        Send a JSON response.
+        """
+        content = json.dumps(result).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+def main():
+    """
+    Run a fake GitLab until interrupted.
+    """
+    parser = argparse.ArgumentParser(description='Run an in-memory fake GitLab for tests and benchmarks')
+    parser.add_argument('--host', default='127.0.0.1', help='Host to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on (default: 8080)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Delay added to each request, in seconds (default: 0)')
+    parser.add_argument('--max-per-page', type=int, default=MAX_PER_PAGE,
+                        help=f'Maximal number of entities per page of a listing (default: {MAX_PER_PAGE})')
+    parser.add_argument('--community', action='store_true',
+                        help='Emulate a Community Edition, without epics, iterations and weights')
+    parser.add_argument('--user', action='append', default=[], help='Username of an existing user (can be repeated)')
+    parser.add_argument('--rate-limit', type=int, help='Maximal number of requests per minute (default: no limit)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    fake = FakeGitLab(host=args.host, port=args.port, latency=args.latency, max_per_page=args.max_per_page,
+                      enterprise=not args.community, usernames=tuple(args.user), rate_limit=args.rate_limit)
+    fake.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake.stop()
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,24 @@
 import argparse
+import contextlib
+import functools
+import hashlib
+import heapq
+import json
 import logging
+import random
+import sqlite3
 import sys
+import threading
 import time
 import os
 import traceback
-from typing import Dict, Optional, Any
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Any, Tuple
 
 import gitlab
+import gitlab.v4.objects
+import requests
 import yaml
 import jsonschema
 
@@ -18,84 +30,1628 @@ logging.basicConfig(
 )
 logger = logging.getLogger("GitLabInjector")
 
+# Delay before the first and maximal delay between two readiness checks of a new project, and maximal total wait (in seconds)
+PROJECT_READINESS_INITIAL_DELAY = 0.1
+PROJECT_READINESS_MAX_DELAY = 2.0
+PROJECT_READINESS_TIMEOUT = 60.0
+
+# HTTP status codes of the transient errors, and base and maximal delays between two attempts (in seconds)
+TRANSIENT_HTTP_STATUSES = (429, 500, 502, 503, 504)
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 60.0
+
+# Maximum number of usernames resolved by a single GraphQL query (this is GitLab's maximum page size)
+USERS_PER_GRAPHQL_QUERY = 100
+
+# Minimum number of operations run together when streaming the YAML file (the projects read are planned until then)
+STREAM_BATCH_OPERATIONS = 1000
+
+class Capabilities(NamedTuple):
+    """
+    Features of GitLab only available with a Premium or Ultimate license.
+    """
+    epics: bool
+    iterations: bool
+    weights: bool
+
+# Maps the GitLab URLs and the paths of the parent groups ('' for the root level) to their capabilities, so that
+# each namespace is probed only once (on GitLab.com, the license is per top-level group)
+CAPABILITIES_CACHE: Dict[Tuple[str, str], Capabilities] = {}
+CAPABILITIES_CACHE_LOCK = threading.Lock()
+
+class GitLabUser(NamedTuple):
+    """
+    GitLab user referenced by a YAML user ID.
+    """
+    username: str
+    id: int
+
+class Journal:
+    """
+    Append-only journal of an injection, used to resume it if it is interrupted.
+
+    Each line is a JSON record, written as soon as
+    - an operation of the plan is completed:
+      {"type": "operation", "kind": ..., "id": ..., "gitlab_id": ..., "fingerprint": <fingerprint of its YAML definition>}
+    - a YAML ID is mapped to a GitLab identifier: {"type": "mapping", "kind": ..., "id": ..., "value": ...}
+    The records written by an operation within transaction() are appended together, with a single write.
+    """
+
+    def __init__(self, path: str, resume: bool = False):
+        """
+        Open the journal.
+
+        Args:
+            path: Path of the journal file
+            resume: True to load the existing journal and append to it, False to start a new journal
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        self.local = threading.local()  # Lines buffered by the transaction of the current thread
+        self.operations: Dict[Tuple[str, str], Any] = {}  # Maps (kind, ID) of the completed operations to their GitLab IDs
+        self.fingerprints: Dict[Tuple[str, str], str] = {}  # Maps (kind, ID) of the completed operations to their fingerprints
+        self.mappings: Dict[str, Dict[str, Any]] = {}     # Maps the entity kinds to their YAML-to-GitLab mappings
+        if resume:
+            self.load()
+        self.file = open(path, 'a' if resume else 'w', encoding='utf-8')
+
+    def load(self) -> None:
+        """
+        Load the records of the journal.
+        """
+        if not os.path.exists(self.path):
+            logger.warning(f"Journal {self.path} does not exist, starting from scratch")
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                try:
+                    self.apply(json.loads(line))
+                except json.JSONDecodeError:
+                    # The last record may be truncated if the run has been killed while writing it
+                    logger.warning(f"Ignoring invalid record at line {line_number} of journal {self.path}")
+        logger.info(f"Loaded {len(self.operations)} completed operations from journal {self.path}")
+
+    def apply(self, record: Dict[str, Any]) -> None:
+        """
+        Apply a record to the in-memory state of the journal.
+
+        Args:
+            record: The record
+        """
+        if record['type'] == 'operation':
+            self.operations[(record['kind'], record['id'])] = record['gitlab_id']
+            self.fingerprints[(record['kind'], record['id'])] = record.get('fingerprint')
+        elif record['type'] == 'mapping':
+            self.mappings.setdefault(record['kind'], {})[record['id']] = record['value']
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """
+        Append a record to the journal.
+
+        Args:
+            record: The record
+        """
+        line = json.dumps(record) + "\n"
+        pending = getattr(self.local, 'pending', None)
+        if pending is not None:
+            pending.append(line)
+        with self.lock:
+            self.apply(record)
+            if pending is None:
+                self.file.write(line)
+                self.file.flush()
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """
+        Buffer the records written by the current thread, and append them together when the block exits
+        (even if it raises an exception, so that the mappings of the created entities are not lost).
+        """
+        self.local.pending = []
+        try:
+            yield
+        finally:
+            pending, self.local.pending = self.local.pending, None
+            if pending:
+                with self.lock:
+                    self.file.write(''.join(pending))
+                    self.file.flush()
+
+    def record_operation(self, kind: str, id: str, gitlab_id: Any, fingerprint: Optional[str] = None) -> None:
+        """
+        Record a completed operation.
+
+        Args:
+            kind: Kind of the operation (e.g., 'group')
+            id: Identifier of the operation within its kind
+            gitlab_id: GitLab ID of the created entity (None if there is none)
+            fingerprint: Fingerprint of the YAML definition of the entity
+        """
+        self.write({'type': 'operation', 'kind': kind, 'id': id, 'gitlab_id': gitlab_id, 'fingerprint': fingerprint})
+
+    def record_mapping(self, kind: str, id: str, value: Any) -> None:
+        """
+        Record the mapping of a YAML ID.
+
+        Args:
+            kind: Kind of the entity (e.g., 'label')
+            id: YAML ID of the entity
+            value: GitLab identifier of the entity
+        """
+        self.write({'type': 'mapping', 'kind': kind, 'id': id, 'value': value})
+
+    def close(self) -> None:
+        """
+        Close the journal file.
+        """
+        with self.lock:
+            self.file.close()
+
+class SqliteStore:
+    """
+    Persistent store of the completed operations and of the YAML-to-GitLab mappings, kept in an SQLite database
+    (in WAL mode) which can hold the runs of several GitLab instances and parent groups.
+    It offers the same interface as Journal.
+
+    The records are kept in memory, so that lookups do not query the database. The records written by an operation
+    within transaction() (its mappings and its completion) are committed together, as soon as the operation ends,
+    so that a crash loses no completed operation; the records written outside a transaction are committed one by one.
+    In WAL mode with synchronous=NORMAL, a commit appends to the write-ahead log without waiting for the disk.
+    """
+
+    def __init__(self, path: str, gitlab_url: str, parent_group_path: Optional[str], resume: bool = False):
+        """
+        Open the store.
+
+        Args:
+            path: Path of the SQLite database
+            gitlab_url: URL of the GitLab instance
+            parent_group_path: Path of the parent group of the top-level groups (None for the root level)
+            resume: True to load the records of the previous run for this GitLab instance and parent group,
+                    False to delete them
+        """
+        self.path = path
+        self.scope = (gitlab_url.rstrip('/'), parent_group_path or '')
+        self.lock = threading.Lock()
+        self.local = threading.local()  # Statements buffered by the transaction of the current thread
+        self.operations: Dict[Tuple[str, str], Any] = {}  # Maps (kind, ID) of the completed operations to their GitLab IDs
+        self.fingerprints: Dict[Tuple[str, str], str] = {}  # Maps (kind, ID) of the completed operations to their fingerprints
+        self.mappings: Dict[str, Dict[str, Any]] = {}     # Maps the entity kinds to their YAML-to-GitLab mappings
+
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS operations (
+                    url TEXT NOT NULL,
+                    parent_group TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    gitlab_id TEXT,
+                    fingerprint TEXT,
+                    PRIMARY KEY (url, parent_group, kind, id)
+                )""")
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS mappings (
+                    url TEXT NOT NULL,
+                    parent_group TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    value TEXT,
+                    PRIMARY KEY (url, parent_group, kind, id)
+                )""")
+            if not resume:
+                self.connection.execute("DELETE FROM operations WHERE url = ? AND parent_group = ?", self.scope)
+                self.connection.execute("DELETE FROM mappings WHERE url = ? AND parent_group = ?", self.scope)
+
+        if resume:
+            for kind, id, gitlab_id, fingerprint in self.connection.execute(
+                    "SELECT kind, id, gitlab_id, fingerprint FROM operations WHERE url = ? AND parent_group = ?", self.scope):
+                self.operations[(kind, id)] = json.loads(gitlab_id)
+                self.fingerprints[(kind, id)] = fingerprint
+            for kind, id, value in self.connection.execute(
+                    "SELECT kind, id, value FROM mappings WHERE url = ? AND parent_group = ?", self.scope):
+                self.mappings.setdefault(kind, {})[id] = json.loads(value)
+            logger.info(f"Loaded {len(self.operations)} completed operations from store {self.path}")
+
+    def record_operation(self, kind: str, id: str, gitlab_id: Any, fingerprint: Optional[str] = None) -> None:
+        """
+        Record a completed operation.
+
+        Args:
+            kind: Kind of the operation (e.g., 'group')
+            id: Identifier of the operation within its kind
+            gitlab_id: GitLab ID of the created entity (None if there is none)
+            fingerprint: Fingerprint of the YAML definition of the entity
+        """
+        with self.lock:
+            self.operations[(kind, id)] = gitlab_id
+            self.fingerprints[(kind, id)] = fingerprint
+        self.execute("INSERT OR REPLACE INTO operations VALUES (?, ?, ?, ?, ?, ?)",
+                     (*self.scope, kind, id, json.dumps(gitlab_id), fingerprint))
+
+    def record_mapping(self, kind: str, id: str, value: Any) -> None:
+        """
+        Record the mapping of a YAML ID.
+
+        Args:
+            kind: Kind of the entity (e.g., 'label')
+            id: YAML ID of the entity
+            value: GitLab identifier of the entity
+        """
+        with self.lock:
+            self.mappings.setdefault(kind, {})[id] = value
+        self.execute("INSERT OR REPLACE INTO mappings VALUES (?, ?, ?, ?, ?)", (*self.scope, kind, id, json.dumps(value)))
+
+    def execute(self, statement: str, parameters: Tuple[Any, ...]) -> None:
+        """
+        Execute a statement in the transaction of the current thread, or commit it at once if there is none.
+
+        Args:
+            statement: The SQL statement
+            parameters: The parameters of the statement
+        """
+        pending = getattr(self.local, 'pending', None)
+        if pending is not None:
+            pending.append((statement, parameters))
+            return
+        with self.lock:
+            with self.connection:
+                self.connection.execute(statement, parameters)
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """
+        Buffer the records written by the current thread, and commit them in a single transaction when the block
+        exits (even if it raises an exception, so that the mappings of the created entities are not lost).
+        """
+        self.local.pending = []
+        try:
+            yield
+        finally:
+            pending, self.local.pending = self.local.pending, None
+            if pending:
+                with self.lock:
+                    with self.connection:
+                        for statement, parameters in pending:
+                            self.connection.execute(statement, parameters)
+
+    def close(self) -> None:
+        """
+        Close the database.
+        """
+        with self.lock:
+            self.connection.close()
+
+class IdMap(dict):
+    """
+    Map from YAML IDs to GitLab identifiers which can be shared between worker threads.
+
+    A YAML ID is reserved while its entity is being created, so that two workers processing
+    the same YAML ID do not both create the entity.
+    The mappings are recorded in the journal, if there is one.
+    """
+
+    def __init__(self, kind: str):
+        """
+        Args:
+            kind: Kind of the mapped entities (e.g., 'label')
+        """
+        super().__init__()
+        self.kind = kind
+        self.lock = threading.Lock()
+        self.reserved = set()
+        self.journal: Optional[Journal] = None
+
+    def reserve(self, yaml_id: str) -> bool:
+        """
+        Reserve a YAML ID before creating the corresponding entity.
+
+        Args:
+            yaml_id: The YAML ID to reserve
+
+        Returns:
+            True if the ID has been reserved, False if it is already mapped or reserved
+        """
+        with self.lock:
+            if yaml_id in self or yaml_id in self.reserved:
+                return False
+            self.reserved.add(yaml_id)
+            return True
+
+    def commit(self, yaml_id: str, value: Any) -> None:
+        """
+        Map a reserved YAML ID to its GitLab identifier.
+
+        Args:
+            yaml_id: The YAML ID
+            value: The GitLab identifier
+        """
+        with self.lock:
+            self.reserved.discard(yaml_id)
+            self[yaml_id] = value
+        if self.journal:
+            self.journal.record_mapping(self.kind, yaml_id, value)
+
+    def release(self, yaml_id: str) -> None:
+        """
+        Release a reservation, typically because the entity could not be created.
+
+        Args:
+            yaml_id: The YAML ID
+        """
+        with self.lock:
+            self.reserved.discard(yaml_id)
+
+    def forget(self, yaml_ids: Iterable[str]) -> None:
+        """
+        Forget the mappings of YAML IDs which are not referenced any more (they stay in the journal).
+
+        Args:
+            yaml_ids: The YAML IDs
+        """
+        with self.lock:
+            for yaml_id in yaml_ids:
+                self.pop(yaml_id, None)
+
+class LiveState:
+    """
+    Snapshot of the entities existing in GitLab, used to check if an entity already exists before creating it,
+    and by the reconcile mode to compare the existing entities with their YAML definitions.
+    The entities of a kind in a group or project are listed the first time they are needed, by a paginated
+    bulk listing, and are then kept up to date with the entities created by the run.
+    """
+
+    def __init__(self):
+        self.groups: Dict[str, Any] = {}                   # Maps the full paths of the groups to the GitLab group objects
+        self.group_ids: Dict[int, Any] = {}                # Maps the GitLab IDs of the groups to the GitLab group objects
+        self.indexes: Dict[str, Dict[str, Any]] = {}       # Maps the API paths of the entity listings to the entities indexed by name
+        self.listing_locks: Dict[str, threading.Lock] = {}  # Maps the API paths of the listings in progress to their locks
+        self.created: set = set()                          # (API path, GitLab ID) of the groups and projects created by the run
+        self.lock = threading.Lock()
+
+    def index(self, container: Any, kind: str, key: str, list_entities: Callable[[], Iterable[Any]]) -> Dict[str, Any]:
+        """
+        Get the entities of a kind in a group or project, they are listed only once: the workers needing them
+        while they are being listed wait for the listing instead of listing them again.
+
+        Args:
+            container: GitLab group or project object
+            kind: Name of the manager of the entities in the container (e.g., 'labels')
+            key: Attribute indexing the entities (e.g., 'name')
+            list_entities: Function listing the entities
+
+        Returns:
+            Dictionary mapping the keys of the entities to the GitLab objects
+        """
+        path = getattr(container, kind).path
+        with self.lock:
+            if path in self.indexes:
+                return self.indexes[path]
+            if (container.manager.path, container.id) in self.created:
+                # A container created by the run is empty
+                return self.indexes.setdefault(path, {})
+            listing_lock = self.listing_locks.setdefault(path, threading.Lock())
+        with listing_lock:
+            with self.lock:
+                if path in self.indexes:
+                    return self.indexes[path]
+            entities = list_entities()
+            with self.lock:
+                self.listing_locks.pop(path, None)
+                return self.indexes.setdefault(path, {getattr(e, key): e for e in entities})
+
+    def is_indexed(self, container: Any, kind: str) -> bool:
+        """
+        Check if the entities of a kind in a group or project are known without listing them.
+
+        Args:
+            container: GitLab group or project object
+            kind: Name of the manager of the entities in the container (e.g., 'labels')
+
+        Returns:
+            True if the entities have already been listed or if the container has been created by the run
+        """
+        with self.lock:
+            return (getattr(container, kind).path in self.indexes
+                    or (container.manager.path, container.id) in self.created)
+
+    def add_group(self, group: Any) -> None:
+        """
+        Add a group to the group cache.
+
+        Args:
+            group: GitLab group object
+        """
+        with self.lock:
+            self.groups[group.full_path] = group
+            self.group_ids[group.id] = group
+
+    def add(self, container: Any, kind: str, key: str, entity: Any) -> None:
+        """
+        Add an entity created by the run to the index of its group or project, if it has been listed.
+
+        Args:
+            container: GitLab group or project object
+            kind: Name of the manager of the entity in the container (e.g., 'labels')
+            key: Name (for a label or a project), path (for a subgroup) or title of the entity
+            entity: GitLab object
+        """
+        with self.lock:
+            index = self.indexes.get(getattr(container, kind).path)
+            if index is not None:
+                index.setdefault(key, entity)
+
+    def add_created(self, container: Any) -> None:
+        """
+        Record a group or project created by the run.
+
+        Args:
+            container: GitLab group or project object
+        """
+        with self.lock:
+            self.created.add((container.manager.path, container.id))
+
+    def release(self, container: Any) -> None:
+        """
+        Forget the entities of a group or project, once it has been injected.
+
+        Args:
+            container: GitLab group or project object
+        """
+        prefix = f"{container.manager.path}/{container.id}/"
+        with self.lock:
+            for path in [path for path in self.indexes if path.startswith(prefix)]:
+                del self.indexes[path]
+            self.created.discard((container.manager.path, container.id))
+
+class ApiCallCounter:
+    """
+    Count the API calls sent to GitLab, in total, per thread and per kind of created entity,
+    and the GET requests avoided by using the objects already known instead of fetching them.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.total = 0
+        self.avoided_gets = 0
+        self.calls_per_kind = {}     # Maps entity kinds to the number of API calls used to create them
+        self.entities_per_kind = {}  # Maps entity kinds to the number of created entities
+
+    def increment(self) -> None:
+        """
+        Count one API call.
+        """
+        with self.lock:
+            self.total += 1
+        self.local.count = getattr(self.local, 'count', 0) + 1
+
+    def response_hook(self, response: Any, *args: Any, **kwargs: Any) -> Any:
+        """
+        HTTP session hook counting each received response as an API call.
+        """
+        self.increment()
+        return response
+
+    def avoid_get(self) -> None:
+        """
+        Count one avoided GET request.
+        """
+        with self.lock:
+            self.avoided_gets += 1
+
+    def thread_count(self) -> int:
+        """
+        Returns:
+            The number of API calls sent by the current thread
+        """
+        return getattr(self.local, 'count', 0)
+
+    def record(self, kind: str, api_calls: int) -> None:
+        """
+        Record the number of API calls used to create an entity.
+
+        Args:
+            kind: Kind of the entity (e.g., 'issue')
+            api_calls: Number of API calls
+        """
+        with self.lock:
+            self.calls_per_kind[kind] = self.calls_per_kind.get(kind, 0) + api_calls
+            self.entities_per_kind[kind] = self.entities_per_kind.get(kind, 0) + 1
+
+    def log_summary(self) -> None:
+        """
+        Log the number of API calls, in total and per created entity.
+        """
+        logger.info(f"API calls: {self.total} ({self.avoided_gets} GET requests avoided)")
+        for kind, entities in self.entities_per_kind.items():
+            api_calls = self.calls_per_kind[kind]
+            logger.info(f"API calls per {kind}: {api_calls / entities:.2f} ({api_calls} calls for {entities} {kind}s)")
+
+def is_transient_error(error: Exception) -> bool:
+    """
+    Check if an error is transient, i.e. if the failed call may succeed when retried.
+
+    Args:
+        error: The error
+
+    Returns:
+        True if the error is transient
+    """
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    try:
+        # The GraphQL client of python-gitlab is based on httpx
+        import httpx
+        if isinstance(error, httpx.TransportError):
+            return True
+    except ImportError:
+        pass
+    return isinstance(error, gitlab.GitlabError) and error.response_code in TRANSIENT_HTTP_STATUSES
+
+def retry_delay(attempt: int) -> float:
+    """
+    Compute the delay before retrying a failed call: exponential backoff with full jitter.
+
+    Args:
+        attempt: Number of the failed attempt (starting at 1)
+
+    Returns:
+        The delay in seconds
+    """
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempt - 1)))
+
+class RetryAdapter(requests.adapters.BaseAdapter):
+    """
+    HTTP transport adapter retrying the idempotent requests (GET, HEAD, PUT and DELETE) sent by another adapter
+    when they fail because of a transient error.
+    The other requests are not retried, since retrying a creation could create the entity twice: the creations
+    are retried by GitLabInjector.call_with_retries(), which first checks whether the entity has been created.
+    """
+
+    IDEMPOTENT_METHODS = ('GET', 'HEAD', 'PUT', 'DELETE')
+
+    def __init__(self, adapter: requests.adapters.BaseAdapter, max_retries: int):
+        """
+        Args:
+            adapter: The adapter sending the requests
+            max_retries: Maximum number of retries of a request
+        """
+        super().__init__()
+        self.adapter = adapter
+        self.max_retries = max_retries
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+        """
+        Send a request, retrying it with an exponential backoff if it is idempotent and fails transiently.
+        """
+        attempt = 1
+        while True:
+            retryable = request.method in self.IDEMPOTENT_METHODS and attempt <= self.max_retries
+            try:
+                response = self.adapter.send(request, **kwargs)
+                if not retryable or response.status_code not in TRANSIENT_HTTP_STATUSES:
+                    return response
+                error = f"HTTP status {response.status_code}"
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if not retryable:
+                    raise
+                error = str(e)
+            delay = retry_delay(attempt)
+            logger.warning(f"Transient error on {request.method} {request.url} (attempt {attempt}): {error}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+            attempt += 1
+
+    def close(self) -> None:
+        """
+        Close the wrapped adapter.
+        """
+        self.adapter.close()
+
+class NonRetryingGitlab(gitlab.Gitlab):
+    """
+    GitLab client which never retries a request itself: python-gitlab retries the requests rejected with
+    HTTP 429 by default, on top of the retries of RetryAdapter and GitLabInjector.call_with_retries().
+    """
+
+    def http_request(self, *args: Any, **kwargs: Any) -> requests.Response:
+        """
+        Send a request without the retries of python-gitlab.
+        """
+        kwargs['obey_rate_limit'] = False
+        kwargs['retry_transient_errors'] = False
+        return super().http_request(*args, **kwargs)
+
+class RateLimiter:
+    """
+    Token bucket limiting the rate of the API calls sent to GitLab, shared by all the worker threads.
+
+    The rate is the configured one, lowered to what the server allows according to the RateLimit-Remaining
+    and RateLimit-Reset headers of its responses, so that the calls are spread over the rate limit window
+    instead of being throttled by GitLab. When a call is rejected anyway, no call is sent for the delay given
+    by the Retry-After header of the response.
+    """
+
+    def __init__(self, requests_per_second: Optional[float] = None):
+        """
+        Args:
+            requests_per_second: Maximum rate of API calls, None for no limit other than the server one
+        """
+        assert requests_per_second is None or requests_per_second > 0, f"Invalid rate limit {requests_per_second}"
+        self.lock = threading.Lock()
+        self.configured_rate = requests_per_second
+        self.rate = requests_per_second  # None when there is no limit
+        self.tokens = 1.0
+        self.updated = time.monotonic()
+        self.paused_until = 0.0  # Time (monotonic) before which no call is sent, after a Retry-After header
+
+    def refill(self) -> None:
+        """
+        Add the tokens accumulated since the last refill, the bucket holds at most one second of calls.
+        Must be called with the lock held.
+        """
+        now = time.monotonic()
+        if self.rate:
+            self.tokens = min(self.tokens + (now - self.updated) * self.rate, max(1.0, self.rate))
+        self.updated = now
+
+    def acquire(self) -> None:
+        """
+        Wait until an API call can be sent.
+        """
+        while True:
+            with self.lock:
+                delay = self.paused_until - time.monotonic()
+                if delay <= 0:
+                    if self.rate is None:
+                        return
+                    self.refill()
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+
+    def update(self, headers: Any) -> None:
+        """
+        Adjust the rate to the rate limit reported by GitLab, and pause the calls if it asks to retry later.
+
+        Args:
+            headers: HTTP headers of a GitLab response
+        """
+        retry_after = headers.get('Retry-After')
+        if retry_after is not None:
+            try:
+                paused_until = time.monotonic() + float(retry_after)
+            except ValueError:
+                # An HTTP date, which GitLab does not send
+                paused_until = 0.0
+            with self.lock:
+                self.paused_until = max(self.paused_until, paused_until)
+        remaining = headers.get('RateLimit-Remaining')
+        reset = headers.get('RateLimit-Reset')
+        if remaining is None or reset is None:
+            return
+        try:
+            remaining = int(remaining)
+            window = max(float(reset) - time.time(), 1.0)
+        except ValueError:
+            return
+        server_rate = max(remaining, 1) / window
+        with self.lock:
+            self.refill()
+            self.rate = server_rate if self.configured_rate is None else min(self.configured_rate, server_rate)
+            self.tokens = min(self.tokens, max(1.0, self.rate), float(remaining))
+        logger.debug(f"Rate limit: {remaining} remaining calls for {window:.0f}s, using {self.rate:.2f} calls/s")
+
+class RateLimitedAdapter(requests.adapters.BaseAdapter):
+    """
+    HTTP transport adapter applying a rate limiter to the requests sent by another adapter.
+    """
+
+    def __init__(self, adapter: requests.adapters.BaseAdapter, rate_limiter: RateLimiter):
+        """
+        Args:
+            adapter: The adapter sending the requests
+            rate_limiter: The rate limiter
+        """
+        super().__init__()
+        self.adapter = adapter
+        self.rate_limiter = rate_limiter
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+        """
+        Send a request once the rate limiter allows it, and update the rate limiter from the response.
+        """
+        self.rate_limiter.acquire()
+        response = self.adapter.send(request, **kwargs)
+        self.rate_limiter.update(response.headers)
+        return response
+
+    def close(self) -> None:
+        """
+        Close the wrapped adapter.
+        """
+        self.adapter.close()
+
+def fingerprint(definition: Any) -> str:
+    """
+    Compute the fingerprint of a YAML definition.
+
+    Args:
+        definition: The YAML definition
+
+    Returns:
+        The fingerprint
+    """
+    return hashlib.sha256(json.dumps(definition, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+def differs(entity: Any, attributes: Dict[str, Any]) -> bool:
+    """
+    Check if attributes of a GitLab entity differ from their expected values.
+    The values are compared as strings, a missing value and an empty one being equal.
+
+    Args:
+        entity: GitLab object
+        attributes: Dictionary mapping the attribute names to their expected values
+
+    Returns:
+        True if at least one attribute differs
+    """
+    def normalize(value: Any) -> Optional[str]:
+        return None if value is None or value == '' else str(value)
+
+    return any(normalize(entity.attributes.get(name)) != normalize(value) for name, value in attributes.items())
+
+class Operation:
+    """
+    Operation of an injection plan, typically the creation of an entity.
+    """
+
+    def __init__(self, index: int, key: Tuple[str, str], description: str, action: Callable[..., Any],
+                 parent: Optional['Operation'], references: Iterable['Operation'],
+                 update: Optional[Callable[..., Any]] = None, definition: Any = None):
+        """
+        Args:
+            index: Position of the operation in the plan, operations which are ready are run by increasing index
+            key: Kind and identifier of the operation (e.g., ('label', <YAML ID>), ('group', <YAML path>)),
+                 used to record it in the journal
+            description: Description of the operation (used for logging)
+            action: Function performing the operation, it is called with the result of the parent operation if
+                    there is one, and without argument otherwise
+            parent: Operation creating the group or project containing the entity, the operation is skipped if
+                    the parent operation returns None
+            references: Operations creating entities referenced by this one
+                        (the parent and referenced operations already done, by a previous plan, are not waited for)
+            update: Function updating the entity created by a previous run, it is called like the action with the
+                    recorded GitLab ID as additional argument, and returns the same result as the action
+            definition: YAML definition of the entity (without its content for a group or a project), used to
+                        detect the changes since the previous run
+        """
+        self.index = index
+        self.key = key
+        self.description = description
+        self.action = action
+        self.parent = parent
+        self.dependencies = {operation for operation in references if not operation.done}
+        if parent and not parent.done:
+            self.dependencies.add(parent)
+        self.dependents: List['Operation'] = []
+        self.update = update
+        self.definition = definition
+        self.fingerprint = fingerprint(definition)
+        self.updated = False
+        self.result = None
+        self.skipped = False
+        self.done = False
+
+    def __lt__(self, other: 'Operation') -> bool:
+        return self.index < other.index
+
+class InjectionPlan:
+    """
+    Dependency graph of the operations injecting a YAML definition.
+
+    An operation depends on the creation of its container (group or project) and on the creation of the entities
+    it references (e.g., an issue depends on its labels, milestone, epic and iteration), but not on its siblings.
+    A referenced entity must be defined before the referring one, as when the YAML is processed sequentially.
+    """
+
+    def __init__(self):
+        self.operations: List[Operation] = []
+        self.definitions: Dict[Tuple[str, str], Operation] = {}  # Maps (entity kind, YAML ID) to the defining operation
+        self.undefined: List[Tuple[Tuple[str, str], str]] = []   # (Entity kind, YAML ID) referenced before being defined,
+                                                                 # with the description of the referring operation
+
+    def add(self, key: Tuple[str, str], description: str, action: Callable[..., Any], parent: Optional[Operation] = None,
+            references: Iterable[Tuple[str, Optional[str]]] = (), update: Optional[Callable[..., Any]] = None,
+            definition: Any = None) -> Operation:
+        """
+        Add an operation to the plan.
+
+        Args:
+            key: Kind and identifier of the operation
+            description: Description of the operation
+            action: Function performing the operation
+            parent: Operation creating the container of the entity
+            references: (entity kind, YAML ID) of the entities referenced by the operation, the IDs which are None
+                        or not defined yet are ignored
+            update: Function updating the entity if it has been changed since the previous run
+            definition: YAML definition of the entity
+
+        Returns:
+            The operation
+        """
+        referenced_operations = []
+        for reference in references:
+            if reference in self.definitions:
+                referenced_operations.append(self.definitions[reference])
+            elif reference[1] is not None:
+                self.undefined.append((reference, description))
+        operation = Operation(len(self.operations), key, description, action, parent, referenced_operations,
+                              update, definition)
+        for dependency in operation.dependencies:
+            dependency.dependents.append(operation)
+        self.operations.append(operation)
+        return operation
+
+    def define(self, kind: str, yaml_id: Optional[str], operation: Operation) -> None:
+        """
+        Record that an operation creates the entity having a given YAML ID.
+
+        Args:
+            kind: Entity kind (e.g., 'label')
+            yaml_id: YAML ID of the entity
+            operation: The operation creating the entity
+        """
+        self.definitions.setdefault((kind, yaml_id), operation)
+
 class GitLabInjector:
     """
     Class to handle the creation of GitLab structures from YAML definitions.
     """
 
-    def __init__(self, gitlab_url: str, private_token: str, parent_group_path: Optional[str] = None):
+    def __init__(self, gitlab_url: str, private_token: str, parent_group_path: Optional[str] = None, concurrency: int = 1,
+                 iterations_per_request: int = 20, rate_limit: Optional[float] = None,
+                 max_retries: int = 5, journal_path: Optional[str] = None, store_path: Optional[str] = None,
+                 resume: bool = False, incremental: bool = False, reconcile: bool = False, stream: bool = False):
+        """
+        Initialize with GitLab connection parameters.
+
+        Args:
+            gitlab_url: URL of the GitLab instance
+            private_token: Personal Access Token with API access
+            parent_group_path: Optional path to parent group where top-level groups should be created
+            concurrency: Maximum number of entities created in parallel
+            iterations_per_request: Maximum number of iterations created by a single GraphQL request
+            rate_limit: Maximum number of API calls per second (None for no limit other than the GitLab one)
+            max_retries: Maximum number of retries of an API call failing because of a transient error
+            journal_path: Optional path of the journal recording the completed operations
+            store_path: Optional path of an SQLite database recording the completed operations (instead of a journal)
+            resume: True to resume the run recorded in the journal or store, skipping its completed operations
+            incremental: True to only inject the changes since the run recorded in the journal or store: the new
+                         entities are created, the changed ones are updated, and the unchanged ones are skipped
+            reconcile: True to converge the existing GitLab entities to the YAML definitions: the entities already
+                       existing in GitLab are updated when they differ, instead of being reported as errors
+            stream: True to read the YAML file incrementally, each group being injected as soon as it has been read
+        """
+        assert concurrency >= 1, f"Invalid concurrency {concurrency}"
+        assert iterations_per_request >= 1, f"Invalid number of iterations per request {iterations_per_request}"
+        self.concurrency = concurrency
+        self.iterations_per_request = iterations_per_request
+        assert max_retries >= 0, f"Invalid maximum number of retries {max_retries}"
+        self.max_retries = max_retries
+        self.incremental = incremental
+        self.reconcile = reconcile
+        self.stream = stream
+        self.streamed_definitions: set = set()  # (Entity kind, YAML ID) of the referenceable entities already streamed
+        self.live_state = LiveState()
+
+        self.api_call_counter = ApiCallCounter()
+        self.gl = NonRetryingGitlab(url=gitlab_url, private_token=private_token)
+        self.rate_limiter = RateLimiter(rate_limit)
+        for prefix in ('http://', 'https://'):
+            adapter = RateLimitedAdapter(self.gl.session.adapters[prefix], self.rate_limiter)
+            self.gl.session.mount(prefix, RetryAdapter(adapter, max_retries))
+        self.gl.session.hooks['response'].append(self.api_call_counter.response_hook)
+        self.gl.auth()
+        if not self.gl.user:
+            logger.error("No GitLab user associated to the provided token")
+            sys.exit(1)
+        self.current_user = self.gl.user.username
+        logger.info(f"Connected to GitLab as {self.current_user}")
+
+        # Maps lowercased GitLab usernames to the corresponding users (None for unknown users),
+        # so that each username is looked up only once during the run
+        self.user_cache: Dict[str, Optional[GitLabUser]] = {
+            self.current_user.lower(): GitLabUser(self.current_user, self.gl.user.id)
+        }
+        self.user_cache_lock = threading.Lock()
+        self.user_lookup_locks: Dict[str, threading.Lock] = {}  # Held while a username is looked up with the REST API
+
+        # Maps the member API paths of groups and projects to their direct members (GitLab user ID -> access level)
+        self.member_index: Dict[str, Dict[int, int]] = {}
+        self.member_index_lock = threading.Lock()
+
+        # The GraphQL client of python-gitlab is based on httpx, its responses update the rate limiter as the
+        # REST ones do. The GraphQL queries are retried by call_with_retries(), so not by python-gitlab
+        import httpx
+        graphql_client = httpx.Client(headers={'Authorization': f"Bearer {private_token}"}, verify=self.gl.ssl_verify,
+                                      event_hooks={'response': [lambda response: self.rate_limiter.update(response.headers)]})
+        self.gq = gitlab.GraphQL(gitlab_url, client=graphql_client, max_retries=0, obey_rate_limit=False)
+
+        # Store parent group if provided
+        self.parent_group = None
+        self.parent_group_id = None
+        if parent_group_path:
+            try:
+                parent_group = self.gl.groups.get(parent_group_path)
+                self.parent_group = parent_group
+                self.parent_group_id = parent_group.id
+                self.live_state.add_group(parent_group)
+                logger.info(f"Using parent group: {parent_group_path}")
+            except gitlab.GitlabGetError:
+                logger.error(f"Parent group not found: {parent_group_path}")
+                sys.exit(1)
+
+        # The entities not supported by the license are skipped, they are counted per kind to be reported once
+        self.capabilities = self.probe_capabilities()
+        self.unsupported: Dict[str, int] = {}
+
+        self.label_name_map = IdMap('label')          # Maps YAML label IDs to GitLab label names
+        self.epic_id_map = IdMap('epic')              # Maps YAML epic IDs to GitLab epic IDs
+        self.epic_iid_map = IdMap('epic_iid')         # Maps YAML epic IDs to GitLab epic IIDs
+        self.issue_id_map = IdMap('issue')            # Maps YAML issue IDs to GitLab issue IDs
+        self.issue_iid_map = IdMap('issue_iid')       # Maps YAML issue IDs to GitLab issue IIDs
+        self.iteration_id_map = IdMap('iteration')    # Maps YAML iteration IDs to GitLab iteration IDs
+        self.milestone_id_map = IdMap('milestone')    # Maps YAML milestone IDs to GitLab milestone IDs
+        self.user_id_map = IdMap('user')              # Maps YAML user IDs to GitLab users (username and ID)
+
+        # Journal of the run, the users are not journaled since they are resolved again by each run
+        self.journal = None
+        if store_path:
+            self.journal = SqliteStore(store_path, gitlab_url, parent_group_path, resume or incremental)
+        elif journal_path:
+            self.journal = Journal(journal_path, resume or incremental)
+        if self.journal:
+            for id_map in (self.label_name_map, self.epic_id_map, self.epic_iid_map, self.issue_id_map,
+                           self.issue_iid_map, self.iteration_id_map, self.milestone_id_map):
+                id_map.update(self.journal.mappings.get(id_map.kind, {}))
+                id_map.journal = self.journal
+
+    def probe_capabilities(self) -> Capabilities:
+        """
+        Detect if epics, iterations and weights are available, the result is cached per GitLab URL and parent group.
+        They are not available with the Community Edition. With the Enterprise Edition, they are available if
+        the epics and iterations of the parent group can be listed, or if the license is Premium or Ultimate when
+        there is no parent group (weights require the same license as epics). If the license cannot be read
+        (e.g., without administrator access), they are assumed to be available.
+
+        Returns:
+            The capabilities of the GitLab instance in the parent group
+        """
+        key = (self.gl.url, self.parent_group.full_path if self.parent_group else '')
+        with CAPABILITIES_CACHE_LOCK:
+            if key in CAPABILITIES_CACHE:
+                return CAPABILITIES_CACHE[key]
+
+            try:
+                enterprise = self.gl.http_get('/metadata').get('enterprise', True)
+            except gitlab.GitlabError:
+                # The metadata API is only available since GitLab 15.2
+                enterprise = True
+            if not enterprise:
+                capabilities = Capabilities(epics=False, iterations=False, weights=False)
+            elif self.parent_group:
+                epics = self.is_available(lambda: self.parent_group.epics.list(per_page=1, get_all=False))
+                iterations = self.is_available(lambda: self.parent_group.iterations.list(per_page=1, get_all=False))
+                capabilities = Capabilities(epics=epics, iterations=iterations, weights=epics)
+            else:
+                try:
+                    premium = self.gl.get_license().get('plan') in ('premium', 'ultimate', 'silver', 'gold')
+                except gitlab.GitlabError:
+                    premium = True
+                capabilities = Capabilities(epics=premium, iterations=premium, weights=premium)
+
+            logger.info(f"GitLab capabilities: epics={capabilities.epics}, iterations={capabilities.iterations}, "
+                        f"weights={capabilities.weights}")
+            CAPABILITIES_CACHE[key] = capabilities
+            return capabilities
+
+    @staticmethod
+    def is_available(list_entities: Callable[[], Any]) -> bool:
+        """
+        Check if a kind of entity is available, by listing entities of this kind.
+
+        Args:
+            list_entities: Function listing entities
+
+        Returns:
+            False if the listing is forbidden or not found, True otherwise
+        """
+        try:
+            list_entities()
+            return True
+        except gitlab.GitlabListError as e:
+            if e.response_code in (403, 404):
+                return False
+            raise
+
+    def count_unsupported(self, kind: str, count: int = 1) -> None:
+        """
+        Count entities or attributes skipped because they are not supported by the license.
+
+        Args:
+            kind: Kind of the entities or attributes (e.g., 'epics')
+            count: Number of skipped entities or attributes
+        """
+        if count:
+            self.unsupported[kind] = self.unsupported.get(kind, 0) + count
+
+    def log_unsupported(self) -> None:
+        """
+        Log a single warning for all the entities and attributes skipped because they are not supported by the license.
+        """
+        if self.unsupported:
+            skipped = ', '.join(f"{count} {kind}" for kind, count in self.unsupported.items())
+            logger.warning(f"Not available with the license of the GitLab instance, skipped: {skipped}")
+            self.unsupported = {}
+
+    def execute_graphql(self, query: str, variables: Optional[Dict[str, Any]] = None, idempotent: bool = True) -> Dict[str, Any]:
         """
-        Initialize with GitLab connection parameters.
+        Execute a GraphQL query or mutation.
 
         Args:
-            gitlab_url: URL of the GitLab instance
-            private_token: Personal Access Token with API access
-            parent_group_path: Optional path to parent group where top-level groups should be created
+            query: The GraphQL query or mutation
+            variables: The variables of the query
+            idempotent: Whether the query can be retried if it fails because of a transient error (False for
+                        mutations creating entities)
+
+        Returns:
+            The data returned by GitLab
         """
-        self.gl = gitlab.Gitlab(url=gitlab_url, private_token=private_token)
-        self.gl.auth()
-        if not self.gl.user:
-            logger.error("No GitLab user associated to the provided token")
-            sys.exit(1)
-        self.current_user = self.gl.user.username
-        logger.info(f"Connected to GitLab as {self.current_user}")
+        def execute():
+            self.api_call_counter.increment()
+            self.rate_limiter.acquire()
+            return self.gq.execute(query, variable_values=variables)
 
-        self.gq = gitlab.GraphQL(gitlab_url, token=private_token)
+        if not idempotent:
+            return execute()
+        return self.call_with_retries(execute, "executing GraphQL query")
 
-        # Store parent group ID if provided
-        self.parent_group_id = None
-        if parent_group_path:
-            try:
-                parent_group = self.gl.groups.get(parent_group_path)
-                self.parent_group_id = parent_group.id
-                logger.info(f"Using parent group: {parent_group_path}")
-            except gitlab.GitlabGetError:
-                logger.error(f"Parent group not found: {parent_group_path}")
-                sys.exit(1)
+    def call_with_retries(self, call: Callable[[], Any], description: str,
+                          find_created: Optional[Callable[[], Any]] = None) -> Any:
+        """
+        Perform an API call, retrying it with an exponential backoff when it fails because of a transient error.
+        For a creation, the entity may have been created although the call failed (e.g., on a timeout), so
+        `find_created` is used to look for it before retrying, in order to never create an entity twice.
+        It is used for the creations and the GraphQL queries only: the idempotent REST requests are already
+        retried by RetryAdapter.
 
-        self.label_name_map = {}    # Maps YAML label IDs to GitLab label names
-        self.epic_id_map = {}       # Maps YAML epic IDs to GitLab epic IDs
-        self.issue_id_map = {}      # Maps YAML issue IDs to GitLab issue IDs
-        self.iteration_id_map = {}  # Maps YAML iteration IDs to GitLab iteration IDs
-        self.milestone_id_map = {}  # Maps YAML milestone IDs to GitLab milestone IDs
-        self.user_id_map = {}       # Maps YAML user IDs to GitLab user IDs
+        Args:
+            call: The API call
+            description: Description of the call (used for logging)
+            find_created: For a creation, function returning the entity if it has been created, None otherwise
 
-    def process_yaml(self, yaml_file: str):
+        Returns:
+            The result of the call (or the entity found by `find_created`)
         """
-        Process the YAML file and create the GitLab structure.
+        attempt = 1
+        while True:
+            try:
+                return call()
+            except Exception as e:
+                if attempt > self.max_retries or not is_transient_error(e):
+                    raise
+                delay = retry_delay(attempt)
+                logger.warning(f"Transient error {description} (attempt {attempt}): {e}, retrying in {delay:.1f}s")
+                time.sleep(delay)
+                attempt += 1
+                # A request rejected by the rate limit has not been processed
+                if find_created and getattr(e, 'response_code', None) != 429:
+                    created = find_created()
+                    if created is not None:
+                        logger.info(f"The entity has been created despite the error {description}")
+                        return created
+
+    def resolve_user(self, gitlab_username: str) -> Optional[GitLabUser]:
+        """
+        Find a GitLab user, GitLab is queried only the first time a given username is resolved: the workers
+        resolving it while it is being looked up wait for the lookup, those resolving other usernames do not.
 
         Args:
-            yaml_file: Path to the YAML file
+            gitlab_username: GitLab username (without the leading @)
+
+        Returns:
+            The user or None if not found
         """
-        try:
-            with open(yaml_file, 'r') as f:
-                data = yaml.safe_load(f)
+        key = gitlab_username.lower()
+        with self.user_cache_lock:
+            if key in self.user_cache:
+                return self.user_cache[key]
+            lookup_lock = self.user_lookup_locks.setdefault(key, threading.Lock())
+        with lookup_lock:
+            with self.user_cache_lock:
+                if key in self.user_cache:
+                    return self.user_cache[key]
+            users = list(self.gl.users.list(username=gitlab_username))
+            assert len(users) <= 1, f"Multiple users found for username '@{gitlab_username}'"
+            user = GitLabUser(users[0].username, users[0].id) if users else None
+            with self.user_cache_lock:
+                self.user_lookup_locks.pop(key, None)
+                self.user_cache[key] = user
+            return user
+
+    def resolve_users(self, gitlab_usernames: Iterable[str]) -> None:
+        """
+        Resolve several GitLab users at once with GraphQL and store them in the user cache.
+        If the GraphQL API fails, the users will be resolved one by one by resolve_user().
 
-            logger.info(f"Successfully loaded YAML file: {yaml_file}")
+        Args:
+            gitlab_usernames: GitLab usernames (without the leading @)
+        """
+        users_query = """
+        query users($usernames: [String!], $first: Int) {
+            users(usernames: $usernames, first: $first) {
+                nodes {
+                    id
+                    username
+                }
+            }
+        }
+        """
 
-            # Load and validate against schema
-            schema_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schema.yaml')
-            with open(schema_path, 'r') as f:
-                schema = yaml.safe_load(f)
+        with self.user_cache_lock:
+            to_resolve = list(dict.fromkeys(u for u in gitlab_usernames if u.lower() not in self.user_cache))
 
-            logger.info("Validating YAML against schema…")
+        for i in range(0, len(to_resolve), USERS_PER_GRAPHQL_QUERY):
+            chunk = to_resolve[i:i + USERS_PER_GRAPHQL_QUERY]
             try:
-                jsonschema.validate(instance=data, schema=schema)
-                logger.info("YAML validation successful!")
-            except jsonschema.ValidationError as e:
-                logger.error(f"YAML validation failed: {e}")
-                sys.exit(1)
+                result = self.execute_graphql(users_query, {"usernames": chunk, "first": len(chunk)})
+            except Exception as e:
+                logger.warning(f"Error resolving users via GraphQL API, they will be resolved one by one: {e}")
+                return
+            found = {}
+            for node in result['users']['nodes']:
+                user = GitLabUser(node['username'], int(node['id'].split('/')[-1]))
+                found[user.username.lower()] = user
+            with self.user_cache_lock:
+                for username in chunk:
+                    self.user_cache[username.lower()] = found.get(username.lower())
+            logger.info(f"Resolved {len(found)} of {len(chunk)} users via GraphQL API")
+
+    def run_plan(self, plan: InjectionPlan) -> None:
+        """
+        Run the operations of a plan, each one as soon as the operations it depends on are done,
+        using up to `concurrency` worker threads.
+        When several operations are ready, the first ones in the plan are run first, so that with
+        a concurrency of 1 the operations are run in the YAML order.
+
+        Args:
+            plan: The plan
+
+        Raises:
+            The first exception raised by an operation, once the operations already running are done and
+            journaled (so that a resumed run does not create their entities again); the operations not started
+            yet are not run
+        """
+        ready = [operation for operation in plan.operations if not operation.dependencies]
+        heapq.heapify(ready)
+        remaining_dependencies = {operation: len(operation.dependencies) for operation in plan.operations}
+
+        def complete(operation: Operation) -> None:
+            operation.done = True
+            for dependent in operation.dependents:
+                remaining_dependencies[dependent] -= 1
+                if remaining_dependencies[dependent] == 0:
+                    heapq.heappush(ready, dependent)
+
+        error = None
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="injector") as executor:
+            running = {}
+            while running or (ready and error is None):
+                while ready and error is None and len(running) < self.concurrency:
+                    operation = heapq.heappop(ready)
+                    if operation.parent and (operation.parent.skipped or operation.parent.result is None):
+                        # The container has not been created, so neither is its content
+                        operation.skipped = True
+                        complete(operation)
+                    elif self.journal and operation.key in self.journal.operations:
+                        if self.incremental and operation.update and self.is_changed(operation):
+                            running[executor.submit(self.run_operation, operation, self.update_operation, operation)] = operation
+                        else:
+                            running[executor.submit(self.restore_operation, operation)] = operation
+                    elif operation.parent:
+                        running[executor.submit(self.run_operation, operation, operation.action, operation.parent.result)] = operation
+                    else:
+                        running[executor.submit(self.run_operation, operation, operation.action)] = operation
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    operation = running.pop(future)
+                    try:
+                        operation.result = future.result()
+                    except Exception as e:
+                        logger.error(f"Error processing {operation.description}")
+                        error = error or e
+                        continue
+                    complete(operation)
+        if error:
+            raise error
+
+    def run_operation(self, operation: Operation, function: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run an operation on a worker thread and journal it, the mappings it records and its completion being
+        written to the journal together.
+
+        Args:
+            operation: The operation
+            function: The function performing the operation
+            *args: The arguments of the function
+
+        Returns:
+            The result of the function
+        """
+        if not self.journal:
+            return function(*args)
+        with self.journal.transaction():
+            operation.result = function(*args)
+            self.journal_operation(operation)
+        return operation.result
+
+    def journal_operation(self, operation: Operation) -> None:
+        """
+        Record a completed operation in the journal, if there is one.
+        Operations which did not create their entity (e.g., because it already exists) are not recorded,
+        except the member additions which do not return anything.
+        An operation already recorded is recorded again if its entity has been updated.
+
+        Args:
+            operation: The completed operation
+        """
+        if not self.journal or (operation.key in self.journal.operations and not operation.updated):
+            return
+        if operation.result is None and operation.key[0] not in ('group_members', 'project_members'):
+            return
+        self.journal.record_operation(operation.key[0], operation.key[1], getattr(operation.result, 'id', operation.result),
+                                      operation.fingerprint)
+
+    def is_changed(self, operation: Operation) -> bool:
+        """
+        Check if the definition of an entity has changed since the run recorded in the journal.
+
+        Args:
+            operation: The operation creating the entity
 
-            # Process users first
-            if 'users' in data:
-                for user_data in data.get('users', []):
-                    self.process_user(user_data)
+        Returns:
+            True if the fingerprint of the definition differs from the recorded one
+        """
+        return self.journal.fingerprints.get(operation.key) != operation.fingerprint
+
+    def update_operation(self, operation: Operation) -> Any:
+        """
+        Update the entity created by a previous run, its definition having changed since then.
+
+        Args:
+            operation: The operation
+
+        Returns:
+            The result of the operation, as if it had created the entity
+        """
+        logger.info(f"Updating {operation.description}, changed since the previous run")
+        gitlab_id = self.journal.operations[operation.key]
+        operation.updated = True
+        if operation.parent:
+            return operation.update(operation.parent.result, gitlab_id)
+        return operation.update(gitlab_id)
+
+    def restore_operation(self, operation: Operation) -> Any:
+        """
+        Get the result of an operation completed by a previous run, from the journal.
+
+        Args:
+            operation: The operation
+
+        Returns:
+            The result of the operation: the GitLab object for a group or a project, the recorded GitLab ID otherwise
+        """
+        logger.info(f"Skipping {operation.description}, already done by a previous run")
+        gitlab_id = self.journal.operations[operation.key]
+        if operation.key[0] == 'group' and operation.parent:
+            # The subgroup is built from its definition and its parent group, without fetching it
+            if gitlab_id in self.live_state.group_ids:
+                return self.get_group(gitlab_id)
+            group_path = operation.definition['name'].lower().replace(' ', '-')
+            group = gitlab.v4.objects.Group(self.gl.groups, {
+                'id': gitlab_id,
+                'name': operation.definition['name'],
+                'path': group_path,
+                'full_path': f"{operation.parent.result.full_path}/{group_path}",
+                'description': operation.definition['description']
+            })
+            self.live_state.add_group(group)
+            self.api_call_counter.avoid_get()
+            return group
+        if operation.key[0] == 'group':
+            # The path of the parent of a top-level group is not known, so the group is fetched
+            return self.get_group(gitlab_id)
+        if operation.key[0] == 'project':
+            # Only the ID and the name of the project are used, so it is not fetched
+            self.api_call_counter.avoid_get()
+            return gitlab.v4.objects.Project(self.gl.projects, {
+                'id': gitlab_id,
+                'name': operation.definition['name'],
+                'description': operation.definition['description']
+            })
+        return gitlab_id
+
+    def load_live_state(self, groups_data: List[Dict[str, Any]]) -> None:
+        """
+        List the groups and projects existing in the target tree, for the reconcile mode.
+        The tree is listed from the parent group if there is one, from the top-level groups of the YAML otherwise.
+
+        Args:
+            groups_data: List of dictionaries containing the top-level group definitions
+        """
+        if self.parent_group:
+            roots = [self.parent_group]
+        else:
+            roots = []
+            for group_data in groups_data:
+                group = self.find_group(group_data.get('name', '').lower().replace(' ', '-'))
+                if group:
+                    roots.append(group)
+                    self.live_state.add_group(group)
+        groups = list(roots)
+        projects = []
+        for root in roots:
+            for group in root.descendant_groups.list(get_all=True, per_page=100):
+                group = gitlab.v4.objects.Group(self.gl.groups, group.attributes)
+                self.live_state.add_group(group)
+                groups.append(group)
+            projects.extend(root.projects.list(get_all=True, per_page=100, include_subgroups=True))
+
+        # The subgroups and the projects of all the groups are indexed from these listings
+        for group in groups:
+            self.live_state.indexes.setdefault(group.subgroups.path, {})
+            self.live_state.indexes.setdefault(group.projects.path, {})
+        for group in groups:
+            parent_group = self.live_state.group_ids.get(group.parent_id)
+            if parent_group:
+                self.live_state.indexes[parent_group.subgroups.path][group.path] = group
+        for project in projects:
+            group = self.live_state.groups.get(project.namespace['full_path'])
+            if group:
+                self.live_state.indexes[group.projects.path][project.name] = \
+                    gitlab.v4.objects.Project(self.gl.projects, project.attributes)
+        logger.info(f"Found {len(self.live_state.groups)} existing groups and {len(projects)} existing projects")
+
+    def live_entity(self, container: Any, kind: str, name: str) -> Any:
+        """
+        Find an existing entity of a group or project in the live state, the entities of the same kind in the
+        group or project are listed the first time one of them is looked for.
+
+        Args:
+            container: GitLab group or project object
+            kind: Kind of the entity: 'subgroups', 'labels', 'milestones', 'iterations', 'epics', 'projects' or 'issues'
+            name: Name (for a label or a project), path (for a subgroup) or title of the entity
+
+        Returns:
+            The GitLab object or None if not found
+        """
+        manager = getattr(container, kind)
+        if kind == 'labels':
+            index = self.live_state.index(container, kind, 'name', lambda: manager.list(
+                get_all=True, per_page=100, include_ancestor_groups=False))
+        elif kind == 'subgroups':
+            index = self.live_state.index(container, kind, 'path', lambda: [
+                gitlab.v4.objects.Group(self.gl.groups, g.attributes) for g in manager.list(get_all=True, per_page=100)])
+        elif kind == 'projects':
+            index = self.live_state.index(container, kind, 'name', lambda: [
+                gitlab.v4.objects.Project(self.gl.projects, p.attributes) for p in manager.list(get_all=True, per_page=100)])
+        elif kind == 'iterations':
+            index = self.live_state.index(container, kind, 'title', lambda: [
+                i for i in manager.list(get_all=True, per_page=100) if i.group_id == container.id])
+        elif kind == 'epics':
+            index = self.live_state.index(container, kind, 'title', lambda: manager.list(
+                get_all=True, per_page=100, include_descendant_groups=False))
+        else:
+            index = self.live_state.index(container, kind, 'title', lambda: manager.list(get_all=True, per_page=100))
+        return index.get(name)
+
+    def plan_group(self, plan: InjectionPlan, group_data: Dict[str, Any], parent: Optional[Operation] = None,
+                   parent_id: Optional[int] = None) -> Operation:
+        """
+        Add the operations creating a group and its content to a plan.
 
-            # Process top-level groups
-            for group_data in data.get('groups', []):
-                self.process_group(group_data, self.parent_group_id)
+        Args:
+            plan: The plan
+            group_data: Dictionary containing group definition
+            parent: Operation creating the parent group (None for top-level groups)
+            parent_id: ID of parent group, used when there is no parent operation
+
+        Returns:
+            The operation creating the group
+        """
+        # Groups are identified by the path of their names in the YAML
+        group_key = f"{parent.key[1]}/{group_data.get('name')}" if parent else group_data.get('name')
+        # The content of the group is not part of its definition, it is handled by the other operations
+        group_definition = {'name': group_data.get('name'), 'description': group_data.get('description', '')}
+        if parent:
+            group = plan.add(('group', group_key), f"group '{group_data.get('name')}'",
+                             lambda parent_group: self.create_group(group_data, parent_group.id), parent,
+                             update=lambda parent_group, gitlab_id: self.update_group(group_data, gitlab_id),
+                             definition=group_definition)
+        else:
+            group = plan.add(('group', group_key), f"group '{group_data.get('name')}'",
+                             functools.partial(self.create_group, group_data, parent_id),
+                             update=functools.partial(self.update_group, group_data), definition=group_definition)
+        self.plan_group_content(plan, group_data, group)
+        return group
+
+    def plan_group_content(self, plan: InjectionPlan, group_data: Dict[str, Any], group: Operation) -> None:
+        """
+        Add the operations creating the content of a group to a plan.
+
+        Args:
+            plan: The plan
+            group_data: Dictionary containing group definition (or part of it)
+            group: Operation creating the group
+        """
+        group_key = group.key[1]
+
+        # Members at group level
+        if group_data.get('members'):
+            operation = plan.add(('group_members', group_key), f"members of group '{group_data.get('name')}'",
+                                 functools.partial(self.process_members, group_data['members'], update_roles=self.reconcile),
+                                 group, update=lambda group_object, _: self.process_members(group_data['members'], group_object, True),
+                                 definition=group_data['members'])
+            plan.define('members', group_key, operation)
+
+        # Labels at group level
+        for label_data in group_data.get('labels', []):
+            operation = plan.add(('label', label_data.get('id')), f"label '{label_data.get('name')}'",
+                                 functools.partial(self.process_label, label_data), group,
+                                 update=functools.partial(self.update_label, label_data), definition=label_data)
+            plan.define('label', label_data.get('id'), operation)
+
+        # Iterations at group level (only available with GitLab Premium/Ultimate), they are created together
+        if group_data.get('iterations') and not self.capabilities.iterations:
+            self.count_unsupported('iterations', len(group_data['iterations']))
+        elif group_data.get('iterations'):
+            operation = plan.add(('iterations', group_key), f"iterations of group '{group_data.get('name')}'",
+                                 functools.partial(self.process_iterations, group_data['iterations']), group,
+                                 update=functools.partial(self.update_iterations, group_data['iterations']),
+                                 definition=group_data['iterations'])
+            for iteration_data in group_data['iterations']:
+                plan.define('iteration', iteration_data.get('id'), operation)
+
+        # Milestones at group level
+        for milestone_data in group_data.get('milestones', []):
+            operation = plan.add(('milestone', milestone_data.get('id')), f"milestone '{milestone_data.get('title')}'",
+                                 functools.partial(self.process_milestone, milestone_data), group,
+                                 update=functools.partial(self.update_milestone, milestone_data),
+                                 definition=milestone_data)
+            plan.define('milestone', milestone_data.get('id'), operation)
+
+        # Epics at group level (only available with GitLab Premium/Ultimate)
+        if group_data.get('epics') and not self.capabilities.epics:
+            self.count_unsupported('epics', len(group_data['epics']))
+        elif group_data.get('epics'):
+            for epic_data in group_data['epics']:
+                references = [('label', label_id) for label_id in epic_data.get('label_ids', [])]
+                references.append(('epic', epic_data.get('parent_epic_id')))
+                operation = plan.add(('epic', epic_data.get('id')), f"epic '{epic_data.get('title')}'",
+                                     functools.partial(self.process_epic, epic_data), group, references,
+                                     update=functools.partial(self.update_epic, epic_data), definition=epic_data)
+                plan.define('epic', epic_data.get('id'), operation)
+
+        # Projects
+        for project_data in group_data.get('projects', []):
+            self.plan_project(plan, project_data, group)
+
+        # Subgroups
+        for subgroup_data in group_data.get('subgroups', []):
+            self.plan_group(plan, subgroup_data, group)
+
+    def plan_project(self, plan: InjectionPlan, project_data: Dict[str, Any], group: Optional[Operation] = None,
+                     group_object: Any = None) -> Operation:
+        """
+        Add the operations creating a project and its content to a plan.
+
+        Args:
+            plan: The plan
+            project_data: Dictionary containing project definition
+            group: Operation creating the group containing the project
+            group_object: GitLab group object, used when there is no group operation
+
+        Returns:
+            The operation creating the project
+        """
+        # Projects are identified by the path of their names in the YAML
+        # The content of the project is not part of its definition, it is handled by the other operations
+        project_definition = {'name': project_data.get('name'), 'description': project_data.get('description', '')}
+        if group:
+            project_key = f"{group.key[1]}/{project_data.get('name')}"
+            project = plan.add(('project', project_key), f"project '{project_data.get('name')}'",
+                               functools.partial(self.create_project, project_data), group,
+                               update=lambda group_object, gitlab_id: self.update_project(project_data, gitlab_id),
+                               definition=project_definition)
+        else:
+            project_key = f"{group_object.full_path}/{project_data.get('name')}"
+            project = plan.add(('project', project_key), f"project '{project_data.get('name')}'",
+                               functools.partial(self.create_project, project_data, group_object),
+                               update=functools.partial(self.update_project, project_data),
+                               definition=project_definition)
+
+        # Members in project
+        if project_data.get('members'):
+            operation = plan.add(('project_members', project_key), f"members of project '{project_data.get('name')}'",
+                                 functools.partial(self.process_members, project_data['members'], update_roles=self.reconcile),
+                                 project, update=lambda project_object, _: self.process_members(project_data['members'], project_object, True),
+                                 definition=project_data['members'])
+            plan.define('members', project_key, operation)
+
+        # GitLab silently drops the assignees who cannot read the project, so the issues having assignees wait for
+        # the members of the project and of its ancestor groups (those added by a previous plan are already done)
+        member_keys = [project_key]
+        ancestor = group
+        while ancestor:
+            member_keys.append(ancestor.key[1])
+            ancestor = ancestor.parent
+        member_references = [('members', key) for key in member_keys if ('members', key) in plan.definitions]
+
+        # Milestones in project
+        for milestone_data in project_data.get('milestones', []):
+            operation = plan.add(('milestone', milestone_data.get('id')), f"milestone '{milestone_data.get('title')}'",
+                                 functools.partial(self.process_milestone, milestone_data), project,
+                                 update=functools.partial(self.update_milestone, milestone_data),
+                                 definition=milestone_data)
+            plan.define('milestone', milestone_data.get('id'), operation)
+
+        # Issues in project, their attributes not supported by the license are ignored
+        issues_data = project_data.get('issues', [])
+        if not self.capabilities.weights:
+            self.count_unsupported('issue weights', sum(1 for issue_data in issues_data if issue_data.get('weight') is not None))
+        if not self.capabilities.epics:
+            self.count_unsupported('issue parent epics', sum(1 for issue_data in issues_data if issue_data.get('parent_epic_id')))
+        if not self.capabilities.iterations:
+            self.count_unsupported('issue iterations', sum(1 for issue_data in issues_data if issue_data.get('iteration_id')))
+        for issue_data in issues_data:
+            references = [('label', label_id) for label_id in issue_data.get('label_ids', [])]
+            references.append(('milestone', issue_data.get('milestone_id')))
+            # The epics and iterations not supported by the license are not defined
+            if self.capabilities.epics:
+                references.append(('epic', issue_data.get('parent_epic_id')))
+            if self.capabilities.iterations:
+                references.append(('iteration', issue_data.get('iteration_id')))
+            if issue_data.get('assignee_ids'):
+                references.extend(member_references)
+            operation = plan.add(('issue', issue_data.get('id')), f"issue '{issue_data.get('title')}'",
+                                 functools.partial(self.process_issue, issue_data), project, references,
+                                 update=functools.partial(self.update_issue, issue_data), definition=issue_data)
+            plan.define('issue', issue_data.get('id'), operation)
+
+        return project
+
+    def process_yaml(self, yaml_file: str):
+        """
+        Process the YAML file and create the GitLab structure.
+
+        Args:
+            yaml_file: Path to the YAML file
+        """
+        try:
+            if self.stream:
+                self.stream_yaml(yaml_file)
+            else:
+                self.load_yaml(yaml_file)
 
             logger.info("YAML processing completed successfully!")
+            self.api_call_counter.log_summary()
 
         except yaml.YAMLError as e:
             logger.error(f"Error parsing YAML file: {e}")
@@ -103,6 +1659,283 @@ class GitLabInjector:
         except Exception as e:
             logger.error(f"An error occurred: {e}\n{traceback.format_exc()}")
             sys.exit(1)
+        finally:
+            if self.journal:
+                self.journal.close()
+
+    def load_yaml(self, yaml_file: str) -> None:
+        """
+        Load the whole YAML file, then inject it.
+
+        Args:
+            yaml_file: Path to the YAML file
+        """
+        with open(yaml_file, 'r') as f:
+            data = yaml.safe_load(f)
+
+        logger.info(f"Successfully loaded YAML file: {yaml_file}")
+
+        logger.info("Validating YAML against schema…")
+        self.validate(data, self.load_schema())
+        logger.info("YAML validation successful!")
+
+        # Process users first
+        if 'users' in data:
+            self.process_users(data['users'])
+
+        # Process top-level groups
+        if self.reconcile:
+            self.load_live_state(data.get('groups', []))
+        plan = InjectionPlan()
+        for group_data in data.get('groups', []):
+            self.plan_group(plan, group_data, parent_id=self.parent_group_id)
+        self.log_unsupported()
+        self.run_plan(plan)
+
+    def stream_yaml(self, yaml_file: str) -> None:
+        """
+        Read the YAML file incrementally and inject each part as soon as it has been read: the users, then for each
+        group its own content (labels, milestones, epics…), its projects (by batches) and its subgroups.
+        A part is validated against the schema when it is read, and released once it has been injected.
+        The content of a group is injected in the order of the file, so its name and description, and its labels,
+        iterations, milestones and epics, must precede its projects and subgroups, and the users must precede the
+        groups: the injection stops on a reference to an entity not read yet. The subgroups of a group are streamed
+        one after the other, each one after the previous one has been injected.
+
+        Args:
+            yaml_file: Path to the YAML file
+        """
+        schema = self.load_schema()
+        with open(yaml_file, 'r') as f:
+            loader = yaml.SafeLoader(f)
+            try:
+                loader.get_event()  # Start of the stream
+                if not loader.check_event(yaml.DocumentStartEvent):
+                    self.validate(None, schema)
+                loader.get_event()
+                if not loader.check_event(yaml.MappingStartEvent):
+                    self.validate(self.read_node(loader), schema)
+                loader.get_event()
+                logger.info(f"Streaming YAML file: {yaml_file}")
+
+                if self.reconcile and self.parent_group:
+                    self.load_live_state([])
+                has_groups = False
+                while not loader.check_event(yaml.MappingEndEvent):
+                    key = self.read_node(loader)
+                    if key == 'users':
+                        users_data = self.read_node(loader)
+                        self.validate(users_data, self.sub_schema(schema, schema['properties']['users']))
+                        self.process_users(users_data)
+                        self.streamed_definitions.update(('user', user_data['id']) for user_data in users_data)
+                    elif key == 'groups' and loader.check_event(yaml.SequenceStartEvent):
+                        has_groups = True
+                        loader.get_event()
+                        while not loader.check_event(yaml.SequenceEndEvent):
+                            self.stream_group(loader, schema)
+                        loader.get_event()
+                    else:
+                        self.validate({key: self.read_node(loader)}, self.sub_schema(schema, {'properties': schema['properties']}))
+                if not has_groups:
+                    self.validate({}, schema)
+            finally:
+                loader.dispose()
+        self.log_unsupported()
+
+    def stream_group(self, loader: yaml.SafeLoader, schema: Dict[str, Any], parent: Optional[Operation] = None) -> None:
+        """
+        Read a group and inject it incrementally: its own content is injected when its projects or subgroups are
+        reached (or at its end), then its projects are injected by batches, and its subgroups one after the other.
+
+        Args:
+            loader: YAML loader, positioned on the group
+            schema: The schema of the YAML file
+            parent: Completed operation which created the parent group (None for top-level groups)
+        """
+        group_schema = self.sub_schema(schema, {'$ref': '#/definitions/group'})
+        if not loader.check_event(yaml.MappingStartEvent):
+            # Not a block of keys (e.g., an alias), the group is read at once
+            group_data = self.read_node(loader)
+            self.validate(group_data, group_schema)
+            self.check_streamed_users(group_data)
+            plan = InjectionPlan()
+            self.plan_group(plan, group_data, parent, None if parent else self.parent_group_id)
+            self.run_stream_plan(plan, [])
+            return
+        loader.get_event()
+
+        header: Dict[str, Any] = {}  # Part of the group definition read but not injected yet
+        group = None
+        while not loader.check_event(yaml.MappingEndEvent):
+            key = self.read_node(loader)
+            if key not in ('projects', 'subgroups') or not loader.check_event(yaml.SequenceStartEvent):
+                header[key] = self.read_node(loader)
+                continue
+            group = self.inject_group_header(header, group, parent, group_schema)
+            loader.get_event()
+            plan, projects = InjectionPlan(), []
+            while not loader.check_event(yaml.SequenceEndEvent):
+                if key == 'projects':
+                    project_data = self.read_node(loader)
+                    self.validate(project_data, self.sub_schema(schema, {'$ref': '#/definitions/project'}))
+                    self.check_streamed_users(project_data, 'project')
+                    projects.append(self.plan_project(plan, project_data, group))
+                    if len(plan.operations) >= STREAM_BATCH_OPERATIONS:
+                        self.run_stream_plan(plan, projects)
+                        plan, projects = InjectionPlan(), []
+                else:
+                    self.stream_group(loader, schema, group)
+            loader.get_event()
+            self.run_stream_plan(plan, projects)
+        loader.get_event()
+        group = self.inject_group_header(header, group, parent, group_schema)
+        self.run_stream_plan(InjectionPlan(), [group])
+
+    def run_stream_plan(self, plan: InjectionPlan, containers: List[Operation]) -> None:
+        """
+        Run a plan of a streamed YAML file, then forget the entities of the groups or projects it has completed,
+        and the ID mappings of its issues.
+        Exit without running it if it references entities which are not defined by it nor by the previous plans,
+        since they are defined further in the file: their references could not be created.
+
+        Args:
+            plan: The plan
+            containers: Operations which created the groups or projects completed by the plan
+        """
+        for (kind, yaml_id), description in plan.undefined:
+            if (kind, yaml_id) not in self.streamed_definitions:
+                logger.error(f"The {description} references {kind} id='{yaml_id}' before its definition: the labels, "
+                             f"iterations, milestones and epics of a group must precede its projects and subgroups "
+                             f"in the YAML file to stream it")
+                sys.exit(1)
+        # The issues are not referenced, so they are not kept
+        self.streamed_definitions.update(key for key in plan.definitions if key[0] != 'issue')
+        self.run_plan(plan)
+        # The projects of the plan are completed, so their issues will not be referenced any more
+        issue_ids = [yaml_id for kind, yaml_id in plan.definitions if kind == 'issue']
+        self.issue_id_map.forget(issue_ids)
+        self.issue_iid_map.forget(issue_ids)
+        for container in containers:
+            if container.result is not None:
+                self.live_state.release(container.result)
+                with self.member_index_lock:
+                    self.member_index.pop(container.result.members.path, None)
+
+    def check_streamed_users(self, data: Dict[str, Any], kind: str = 'group') -> None:
+        """
+        Check that the users referenced by the members of a streamed group or project, and by the assignees of its
+        issues, have been read, exiting otherwise: they are defined further in the YAML file.
+
+        Args:
+            data: Definition of the group or project (or part of it)
+            kind: 'group' or 'project'
+        """
+        user_ids = [member_data.get('user_id') for member_data in data.get('members', [])]
+        user_ids += [user_id for issue_data in data.get('issues', []) for user_id in issue_data.get('assignee_ids', [])]
+        for user_id in user_ids:
+            if ('user', user_id) not in self.streamed_definitions:
+                logger.error(f"The {kind} '{data.get('name')}' references user id='{user_id}' before its definition: "
+                             f"the users must precede the groups in the YAML file to stream it")
+                sys.exit(1)
+        for project_data in data.get('projects', []):
+            self.check_streamed_users(project_data, 'project')
+        for subgroup_data in data.get('subgroups', []):
+            self.check_streamed_users(subgroup_data)
+
+    def inject_group_header(self, header: Dict[str, Any], group: Optional[Operation], parent: Optional[Operation],
+                            group_schema: Dict[str, Any]) -> Operation:
+        """
+        Inject the part of a group definition read since the previous call: the group itself on the first call,
+        and its labels, iterations, milestones, epics and members.
+
+        Args:
+            header: Part of the group definition read but not injected yet, emptied except the name and description
+            group: Completed operation which created the group (None on the first call)
+            parent: Completed operation which created the parent group (None for top-level groups)
+            group_schema: Schema of a group
+
+        Returns:
+            The completed operation which created the group
+        """
+        if group and header.keys() <= {'name', 'description'}:
+            return group
+        self.validate(header, group_schema)
+        self.check_streamed_users(header)
+        plan = InjectionPlan()
+        if group:
+            self.plan_group_content(plan, header, group)
+        else:
+            if self.reconcile and not parent and not self.parent_group:
+                self.load_live_state([header])
+            group = self.plan_group(plan, header, parent, None if parent else self.parent_group_id)
+        self.run_stream_plan(plan, [])
+        for key in list(header):
+            if key not in ('name', 'description'):
+                del header[key]
+        return group
+
+    @staticmethod
+    def read_node(loader: yaml.SafeLoader) -> Any:
+        """
+        Read the next YAML node (a scalar, or a whole mapping or sequence) of a loader.
+
+        Args:
+            loader: YAML loader
+
+        Returns:
+            The value of the node
+        """
+        return loader.construct_document(loader.compose_node(None, None))
+
+    @staticmethod
+    def load_schema() -> Dict[str, Any]:
+        """
+        Returns:
+            The schema of the YAML file
+        """
+        schema_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schema.yaml')
+        with open(schema_path, 'r') as f:
+            return yaml.safe_load(f)
+
+    @staticmethod
+    def sub_schema(schema: Dict[str, Any], sub_schema: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Get the schema of a part of the YAML file, which may reference the definitions of the schema.
+
+        Args:
+            schema: The schema of the YAML file
+            sub_schema: The schema of the part
+
+        Returns:
+            The schema of the part, with the definitions
+        """
+        return {**sub_schema, 'definitions': schema['definitions']}
+
+    @staticmethod
+    def validate(data: Any, schema: Dict[str, Any]) -> None:
+        """
+        Validate YAML data against a schema, exiting if it is invalid.
+
+        Args:
+            data: The YAML data
+            schema: The schema
+        """
+        try:
+            jsonschema.validate(instance=data, schema=schema)
+        except jsonschema.ValidationError as e:
+            logger.error(f"YAML validation failed: {e}")
+            sys.exit(1)
+
+    def process_users(self, users_data: List[Dict[str, Any]]) -> None:
+        """
+        Map the YAML users to GitLab users, resolving their usernames at once.
+
+        Args:
+            users_data: List of dictionaries containing the user definitions
+        """
+        self.resolve_users(user_data['username'][1:] for user_data in users_data if user_data['username'] != '@me')
+        for user_data in users_data:
+            self.process_user(user_data)
 
     def process_user(self, user_data: Dict[str, Any]) -> Optional[str]:
         """
@@ -121,27 +1954,21 @@ class GitLabInjector:
         assert username.startswith('@'), f"Username '{username}' is not a valid GitLab username"
 
         # check if user ID is already used
-        if user_id in self.user_id_map:
-            logger.error(f"User id='{user_id}' is already mapped to '{self.user_id_map[user_id]}'")
-            return self.user_id_map[user_id]
-
-        # Handle special case for @me
-        if username == "@me":
-            self.user_id_map[user_id] = self.current_user
-            logger.info(f"Mapped user ID '{user_id}' to current user '{self.current_user}'")
-            return self.current_user
-
-        # Remove @ from username for GitLab API calls
-        gitlab_username = username[1:]
+        if not self.user_id_map.reserve(user_id):
+            logger.error(f"User id='{user_id}' is already mapped to '{self.user_id_map.get(user_id)}'")
+            return self.user_id_map.get(user_id)
 
         try:
-            # Try to find the user in GitLab
-            users_list = self.gl.users.list(username=gitlab_username)
-            users = list(users_list)  # Convert RESTObjectList to a regular list
-            if users and len(users) > 0:
-                assert len(users) == 1, f"Multiple users found for username '{username}'"
-                user = users[0]
-                self.user_id_map[user_id] = user.username
+            # Handle special case for @me
+            if username == "@me":
+                self.user_id_map.commit(user_id, self.user_cache[self.current_user.lower()])
+                logger.info(f"Mapped user ID '{user_id}' to current user '{self.current_user}'")
+                return self.current_user
+
+            # Remove @ from username for GitLab API calls
+            user = self.resolve_user(username[1:])
+            if user:
+                self.user_id_map.commit(user_id, user)
                 logger.info(f"Found GitLab user '{user.username}' for user ID '{user_id}'")
                 return user.username
             else:
@@ -150,10 +1977,12 @@ class GitLabInjector:
         except gitlab.GitlabError as e:
             logger.error(f"Error finding user '{username}': {e}")
             return None
+        finally:
+            self.user_id_map.release(user_id)
 
     def process_group(self, group_data: Dict[str, Any], parent_id: Optional[int] = None) -> Optional[int]:
         """
-        Process and create a group.
+        Process and create a group and its content.
 
         Args:
             group_data: Dictionary containing group definition
@@ -162,6 +1991,23 @@ class GitLabInjector:
         Returns:
             The ID of the created group
         """
+        plan = InjectionPlan()
+        group = self.plan_group(plan, group_data, parent_id=parent_id)
+        self.log_unsupported()
+        self.run_plan(plan)
+        return group.result.id if group.result else None
+
+    def create_group(self, group_data: Dict[str, Any], parent_id: Optional[int] = None) -> Any:
+        """
+        Create a group, without its content.
+
+        Args:
+            group_data: Dictionary containing group definition
+            parent_id: ID of parent group (None for top-level groups)
+
+        Returns:
+            The GitLab group object or None if the group already exists
+        """
         group_name = group_data.get('name')
         group_desc = group_data.get('description', '')
         assert group_name is not None, "Group name is missing"
@@ -171,72 +2017,127 @@ class GitLabInjector:
         group_path = group_name.lower().replace(' ', '-')
 
         try:
-            # Check if group exists
+            # Check if group exists, the path of a subgroup is computed from the one of its parent group
             if parent_id:
-                parent_group = self.gl.groups.get(parent_id)
+                parent_group = self.get_group(parent_id)
                 full_path = f"{parent_group.full_path}/{group_path}"
-                try:
-                    group = self.gl.groups.get(full_path)
-                    logger.error(f"Group already exists: {full_path} (GitLab ID: {group.id})")
-                    return None
-                except gitlab.GitlabGetError:
-                    # Create group
-                    group = self.gl.groups.create({
-                        'name': group_name,
-                        'path': group_path,
-                        'parent_id': parent_id,
-                        'description': group_desc,
-                        'visibility': 'private'  # Adjust as needed
-                    })
-                    logger.info(f"Created group: {full_path} (GitLab ID: {group.id})")
+                # The group is not fetched, but the subgroups of its parent group are listed if they are not known yet
+                if full_path in self.live_state.groups or self.live_state.is_indexed(parent_group, 'subgroups'):
+                    self.api_call_counter.avoid_get()
+                group = self.live_state.groups.get(full_path) or self.live_entity(parent_group, 'subgroups', group_path)
             else:
-                try:
-                    group = self.gl.groups.get(group_path)
-                    logger.error(f"Top-level group already exists: {group_path} (GitLab ID: {group.id})")
-                    return None
-                except gitlab.GitlabGetError:
-                    # Create top-level group
-                    group = self.gl.groups.create({
-                        'name': group_name,
-                        'path': group_path,
-                        'description': group_desc,
-                        'visibility': 'private'  # Adjust as needed
-                    })
-                    logger.info(f"Created top-level group: {group_path} (GitLab ID: {group.id})")
+                parent_group = None
+                full_path = group_path
+                group = self.live_state.groups.get(full_path) or self.find_group(full_path)
+            if group and self.reconcile:
+                self.live_state.add_group(group)
+                return self.reconcile_group(group_data, group)
+            if group and parent_id:
+                logger.error(f"Group already exists: {full_path} (GitLab ID: {group.id})")
+                return None
+            if group:
+                logger.error(f"Top-level group already exists: {group_path} (GitLab ID: {group.id})")
+                return None
+
+            if parent_id:
+                # Create group
+                group = self.call_with_retries(lambda: self.gl.groups.create({
+                    'name': group_name,
+                    'path': group_path,
+                    'parent_id': parent_id,
+                    'description': group_desc,
+                    'visibility': 'private'  # Adjust as needed
+                }), f"creating group {full_path}", lambda: self.find_group(full_path))
+                logger.info(f"Created group: {full_path} (GitLab ID: {group.id})")
+                self.live_state.add(parent_group, 'subgroups', group_path, group)
+            else:
+                # Create top-level group
+                group = self.call_with_retries(lambda: self.gl.groups.create({
+                    'name': group_name,
+                    'path': group_path,
+                    'description': group_desc,
+                    'visibility': 'private'  # Adjust as needed
+                }), f"creating top-level group {group_path}", lambda: self.find_group(group_path))
+                logger.info(f"Created top-level group: {group_path} (GitLab ID: {group.id})")
+
+            self.live_state.add_group(group)
+            self.live_state.add_created(group)
+            return group
+
+        except gitlab.GitlabCreateError as e:
+            logger.error(f"Error creating group {group_name}: {e}")
+            raise
+
+    def get_group(self, gitlab_id: int) -> Any:
+        """
+        Get a group, GitLab is queried only if the group is not in the group cache.
+
+        Args:
+            gitlab_id: GitLab ID of the group
+
+        Returns:
+            The GitLab group object
+        """
+        group = self.live_state.group_ids.get(gitlab_id)
+        if group is None:
+            # A lazy handle would not do since the full path of the group is needed
+            group = self.gl.groups.get(gitlab_id)
+            self.live_state.add_group(group)
+        else:
+            self.api_call_counter.avoid_get()
+        return group
 
-            # Process members at group level
-            for member_data in group_data.get('members', []):
-                self.process_member(member_data, group)
+    def find_group(self, full_path: str) -> Any:
+        """
+        Find a group by its full path.
 
-            # Process labels at group level
-            for label_data in group_data.get('labels', []):
-                self.process_label(label_data, group)
+        Args:
+            full_path: Full path of the group
 
-            # Process iterations at group level (only available with GitLab Premium/Ultimate)
-            for iteration_data in group_data.get('iterations', []):
-                self.process_iteration(iteration_data, group)
+        Returns:
+            The GitLab group object or None if not found
+        """
+        try:
+            return self.gl.groups.get(full_path)
+        except gitlab.GitlabGetError:
+            return None
 
-            # Process milestones at group level
-            for milestone_data in group_data.get('milestones', []):
-                self.process_milestone(milestone_data, group)
+    def reconcile_group(self, group_data: Dict[str, Any], group: Any) -> Any:
+        """
+        Update an existing group if it differs from its definition (without its content).
 
-            # Process epics at group level (only available with GitLab Premium/Ultimate)
-            for epic_data in group_data.get('epics', []):
-                self.process_epic(epic_data, group)
+        Args:
+            group_data: Dictionary containing group definition
+            group: Existing GitLab group object
 
-            # Process projects
-            for project_data in group_data.get('projects', []):
-                self.process_project(project_data, group)
+        Returns:
+            The GitLab group object
+        """
+        if differs(group, {'description': group_data.get('description', '')}):
+            return self.update_group(group_data, group.id)
+        logger.info(f"Group is up to date: {group.full_path} (GitLab ID: {group.id})")
+        return group
 
-            # Process subgroups (recursive)
-            for subgroup_data in group_data.get('subgroups', []):
-                self.process_group(subgroup_data, group.id)
+    def update_group(self, group_data: Dict[str, Any], gitlab_id: int) -> Any:
+        """
+        Update a group created by a previous run, so that it matches its definition (without its content).
 
-            return group.id
+        Args:
+            group_data: Dictionary containing group definition
+            gitlab_id: GitLab ID of the group
 
-        except gitlab.GitlabCreateError as e:
-            logger.error(f"Error creating group {group_name}: {e}")
-            raise
+        Returns:
+            The GitLab group object
+        """
+        attributes = self.gl.groups.update(gitlab_id, {
+            'description': group_data.get('description', '')
+        })
+        logger.info(f"Updated group: '{group_data.get('name')}' (GitLab ID: {gitlab_id})")
+        # The update returns the updated group, so it is not fetched
+        group = gitlab.v4.objects.Group(self.gl.groups, attributes)
+        self.live_state.add_group(group)
+        self.api_call_counter.avoid_get()
+        return group
 
     def process_label(self, label_data: Dict[str, Any], group_or_project: Any) -> Optional[int]:
         """
@@ -259,39 +2160,67 @@ class GitLabInjector:
         assert label_desc is not None, "Label description is missing"
 
         # check if label ID is already used
-        if label_id in self.label_name_map:
-            logger.error(f"Label id='{label_id}' is already mapped to '{self.label_name_map[label_id]}'")
-            return self.label_name_map[label_id]
+        if not self.label_name_map.reserve(label_id):
+            logger.error(f"Label id='{label_id}' is already mapped to '{self.label_name_map.get(label_id)}'")
+            return self.label_name_map.get(label_id)
 
         labels_manager = group_or_project.labels
 
         try:
             # Check if label exists
-            try:
-                # Using find instead of get as get may raise an error for multiple matches
-                existing_labels = list(labels_manager.list(search=label_name))
-                existing_label = next((l for l in existing_labels if l.name == label_name), None)
-
-                if existing_label:
-                    logger.error(f"Label already exists: '{label_name}'")
-                    return None
-            except (gitlab.GitlabGetError, StopIteration):
-                existing_label = None
+            existing_label = self.live_entity(group_or_project, 'labels', label_name)
+            if existing_label and self.reconcile:
+                # In reconcile mode, an existing label is updated if needed
+                if (existing_label.color.lower() != label_color.lower()
+                        or differs(existing_label, {'description': label_desc})):
+                    return self.update_label(label_data, group_or_project, existing_label.id)
+                logger.info(f"Label is up to date: '{label_name}'")
+                self.label_name_map.commit(label_id, label_name)
+                return existing_label.id
+            if existing_label:
+                logger.error(f"Label already exists: '{label_name}'")
+                return None
 
             # Create label if it doesn't exist
-            if not existing_label:
-                label = labels_manager.create({
-                    'name': label_name,
-                    'color': label_color,
-                    'description': label_desc
-                })
-                logger.info(f"Created label: '{label_name}'")
-                self.label_name_map[label_id] = label_name
-                return label.id
+            label = self.call_with_retries(lambda: labels_manager.create({
+                'name': label_name,
+                'color': label_color,
+                'description': label_desc
+            }), f"creating label '{label_name}'",
+                lambda: next((l for l in labels_manager.list(search=label_name) if l.name == label_name), None))
+            logger.info(f"Created label: '{label_name}'")
+            self.live_state.add(group_or_project, 'labels', label_name, label)
+            self.label_name_map.commit(label_id, label_name)
+            return label.id
+
+        except gitlab.GitlabCreateError as e:
+            logger.error(f"Error creating label '{label_name}': {e}")
+            raise
+        finally:
+            self.label_name_map.release(label_id)
+
+    def update_label(self, label_data: Dict[str, Any], group_or_project: Any, gitlab_id: int) -> int:
+        """
+        Update a label created by a previous run, so that it matches its definition.
+
+        Args:
+            label_data: Dictionary containing label definition
+            group_or_project: GitLab group or project object
+            gitlab_id: GitLab ID of the label
 
-        except gitlab.GitlabCreateError as e:
-            logger.error(f"Error creating label '{label_name}': {e}")
-            raise
+        Returns:
+            The ID of the label
+        """
+        label_name = label_data.get('name')
+        # The label manager of python-gitlab identifies the labels by name, so the API is called directly
+        self.gl.http_put(f"{group_or_project.labels.path}/{gitlab_id}", post_data={
+            'new_name': label_name,
+            'color': label_data.get('color'),
+            'description': label_data.get('description', '')
+        })
+        logger.info(f"Updated label: '{label_name}'")
+        self.label_name_map.commit(label_data.get('id'), label_name)
+        return gitlab_id
 
     def process_iteration(self, iteration_data: Dict[str, Any], group: Any) -> Optional[int]:
         """
@@ -304,92 +2233,252 @@ class GitLabInjector:
         Returns:
             The ID of the created iteration
         """
+        return self.process_iterations([iteration_data], group).get(iteration_data.get('id'))
 
-        iteration_id = iteration_data.get('id')
-        iteration_title = iteration_data.get('title')
-        iteration_desc = iteration_data.get('description', '')
-        iteration_start_date = iteration_data.get('start_date')
-        iteration_due_date = iteration_data.get('due_date')
-        iteration_state = iteration_data.get('state', 'active')
-        assert iteration_id is not None, "Iteration ID is missing"
-        assert iteration_title is not None, "Iteration title is missing"
-        assert iteration_desc is not None, "Iteration description is missing"
-        assert iteration_start_date is not None, "Iteration start date is missing"
-        assert iteration_due_date is not None, "Iteration due date is missing"
-        assert iteration_state is not None, "Iteration state is missing"
-
-        # check if iteration ID is already used
-        if iteration_id in self.iteration_id_map:
-            logger.error(f"Iteration id='{iteration_id}' is already mapped to '{self.iteration_id_map[iteration_id]}'")
-            return self.iteration_id_map[iteration_id]
-
-        try:
-            # Search for existing iteration by title
-            existing_iterations = list(group.iterations.list(search=iteration_title))
-            iteration = next((i for i in existing_iterations if i.title == iteration_title and i.group_id == group.id), None)
-
-            if iteration:
-                logger.error(f"Iteration with same name already exists: '{iteration_title}' (GitLab ID: {iteration.id})")
-                return None
+    def process_iterations(self, iterations_data: List[Dict[str, Any]], group: Any) -> Dict[str, int]:
+        """
+        Process and create the iterations of a group.
+        The iterations are created by GraphQL requests containing up to `iterations_per_request` mutations each.
 
-            # Create iteration using GraphQL API
-            # Define the GraphQL mutation for creating an iteration
-            create_iteration_mutation = """
-            mutation createIteration($input: CreateIterationInput!) {
-                createIteration(input: $input) {
-                iteration {
-                    id
-                }
-                errors
-                }
-            }
-            """
+        Args:
+            iterations_data: List of dictionaries containing iteration definitions
+            group: GitLab group object
 
-            # Prepare variables for the GraphQL mutation
-            variables = {
-                "input": {
-                    "groupPath": group.full_path,
-                    "title": iteration_title,
-                    "description": iteration_desc
-                }
+        Returns:
+            Dictionary mapping the YAML IDs of the created iterations to their GitLab IDs
+        """
+        reserved_ids = []
+        inputs = {}  # Maps YAML IDs to the inputs of the createIteration mutation
+        for iteration_data in iterations_data:
+            iteration_id = iteration_data.get('id')
+            iteration_title = iteration_data.get('title')
+            iteration_desc = iteration_data.get('description', '')
+            iteration_start_date = iteration_data.get('start_date')
+            iteration_due_date = iteration_data.get('due_date')
+            iteration_state = iteration_data.get('state', 'active')
+            assert iteration_id is not None, "Iteration ID is missing"
+            assert iteration_title is not None, "Iteration title is missing"
+            assert iteration_desc is not None, "Iteration description is missing"
+            assert iteration_start_date is not None, "Iteration start date is missing"
+            assert iteration_due_date is not None, "Iteration due date is missing"
+            assert iteration_state is not None, "Iteration state is missing"
+
+            # check if iteration ID is already used
+            if not self.iteration_id_map.reserve(iteration_id):
+                logger.error(f"Iteration id='{iteration_id}' is already mapped to '{self.iteration_id_map.get(iteration_id)}'")
+                continue
+            reserved_ids.append(iteration_id)
+
+            # Prepare the input of the GraphQL mutation
+            iteration_input = {
+                "groupPath": group.full_path,
+                "title": iteration_title,
+                "description": iteration_desc
             }
 
             # Add dates if provided
             if iteration_start_date:
-                variables["input"]["startDate"] = iteration_start_date
+                iteration_input["startDate"] = iteration_start_date
             if iteration_due_date:
-                variables["input"]["dueDate"] = iteration_due_date
+                iteration_input["dueDate"] = iteration_due_date
 
             # Set as closed if required
             if iteration_state == 'closed':
-                variables["input"]["stateEvent"] = "close"
+                iteration_input["stateEvent"] = "close"
+
+            inputs[iteration_id] = iteration_input
+
+        if not inputs:
+            return {}
+
+        try:
+            # Look for existing iterations with the same titles
+            try:
+                existing_iterations = {iteration_id: self.live_entity(group, 'iterations', iteration_input["title"])
+                                       for iteration_id, iteration_input in inputs.items()}
+            except gitlab.GitlabListError as e:
+                if "403" in str(e):
+                    logger.error(f"Error listing iterations (may be due to missing a premium/ultimate license): {e}")
+                    return {}
+                logger.error(f"Error listing iterations: {e}")
+                raise
+            changed_ids = {}  # Maps the YAML IDs of the existing iterations to update to their GitLab IDs
+            for iteration_id, iteration_input in list(inputs.items()):
+                existing_iteration = existing_iterations[iteration_id]
+                if existing_iteration and self.reconcile:
+                    # In reconcile mode, an existing iteration is updated if needed
+                    if differs(existing_iteration, {'description': iteration_input['description'],
+                                                    'start_date': iteration_input.get('startDate'),
+                                                    'due_date': iteration_input.get('dueDate')}):
+                        changed_ids[iteration_id] = existing_iteration.id
+                    else:
+                        logger.info(f"Iteration is up to date: '{iteration_input['title']}' (GitLab ID: {existing_iteration.id})")
+                        self.iteration_id_map.commit(iteration_id, existing_iteration.id)
+                    del inputs[iteration_id]
+                elif existing_iteration:
+                    logger.error(f"Iteration with same name already exists: '{iteration_input['title']}' (GitLab ID: {existing_iteration.id})")
+                    del inputs[iteration_id]
+
+            # Create iterations using GraphQL API
+            created = {}
+            batch = list(inputs.items())
+            for i in range(0, len(batch), self.iterations_per_request):
+                created.update(self.create_iterations(dict(batch[i:i + self.iterations_per_request]), group))
+            if changed_ids:
+                created.update(self.update_iterations([iteration_data for iteration_data in iterations_data
+                                                       if iteration_data.get('id') in changed_ids], group, changed_ids))
+            return created
+
+        finally:
+            for iteration_id in reserved_ids:
+                self.iteration_id_map.release(iteration_id)
+
+    def create_iterations(self, inputs: Dict[str, Dict[str, Any]], group: Any, attempt: int = 1) -> Dict[str, int]:
+        """
+        Create iterations with a single GraphQL request, each iteration being created by an aliased mutation.
+        If the request fails as a whole, the iterations are created one by one, so that errors are reported
+        per iteration. If the failure is transient, the iterations created despite it are looked for first,
+        so that they are not created twice.
+
+        Args:
+            inputs: Dictionary mapping the YAML IDs of the iterations to the inputs of the createIteration mutation
+            group: GitLab group object
+            attempt: Number of the attempt to create these iterations
 
-            # Execute the GraphQL mutation
-            result = self.gq.execute(create_iteration_mutation, variables)
+        Returns:
+            Dictionary mapping the YAML IDs of the created iterations to their GitLab IDs
+        """
+        iteration_ids = list(inputs)
+        variable_declarations = ", ".join(f"$input{n}: CreateIterationInput!" for n in range(len(iteration_ids)))
+        mutations = "\n".join(f"""
+                iteration{n}: createIteration(input: $input{n}) {{
+                    iteration {{
+                        id
+                    }}
+                    errors
+                }}""" for n in range(len(iteration_ids)))
+        create_iterations_mutation = f"""
+            mutation createIterations({variable_declarations}) {{{mutations}
+            }}
+            """
+        variables = {f"input{n}": inputs[iteration_id] for n, iteration_id in enumerate(iteration_ids)}
 
-            if result and 'createIteration' in result and 'iteration' in result['createIteration']:
-                iteration_data = result['createIteration']['iteration']
-                iteration_id_gitlab = iteration_data['id']
-                id = int(iteration_id_gitlab.split('/')[-1])
+        try:
+            # Execute the GraphQL mutations
+            result = self.execute_graphql(create_iterations_mutation, variables, idempotent=False)
+        except Exception as e:
+            created = self.find_created_iterations(inputs, group) if is_transient_error(e) else {}
+            remaining = [iteration_id for iteration_id in iteration_ids if iteration_id not in created]
+            if remaining and len(iteration_ids) > 1:
+                logger.warning(f"Error creating {len(iteration_ids)} iterations via GraphQL API, creating them one by one: {e}")
+                for iteration_id in remaining:
+                    created.update(self.create_iterations({iteration_id: inputs[iteration_id]}, group))
+            elif remaining and is_transient_error(e) and attempt <= self.max_retries:
+                delay = retry_delay(attempt)
+                logger.warning(f"Transient error creating iteration '{inputs[remaining[0]]['title']}' (attempt {attempt}): {e}, retrying in {delay:.1f}s")
+                time.sleep(delay)
+                created.update(self.create_iterations(inputs, group, attempt + 1))
+            elif remaining:
+                logger.error(f"Error processing iteration '{inputs[remaining[0]]['title']}': {e}")
+            return created
+
+        created = {}
+        for n, iteration_id in enumerate(iteration_ids):
+            iteration_title = inputs[iteration_id]["title"]
+            mutation_result = (result or {}).get(f"iteration{n}") or {}
+            if mutation_result.get('iteration'):
+                id = int(mutation_result['iteration']['id'].split('/')[-1])
                 logger.info(f"Created iteration: '{iteration_title}' (GitLab ID: {id})")
+                self.iteration_id_map.commit(iteration_id, id)
+                created[iteration_id] = id
             else:
-                errors = result.get('createIteration', {}).get('errors', [])
+                errors = mutation_result.get('errors', [])
                 logger.error(f"Error creating iteration '{iteration_title}' via GraphQL API: {errors}")
-                return None
+        return created
 
-            self.iteration_id_map[iteration_id] = id
+    def find_created_iterations(self, inputs: Dict[str, Dict[str, Any]], group: Any) -> Dict[str, int]:
+        """
+        Look for iterations which have been created although their creation request failed.
 
-            return id
+        Args:
+            inputs: Dictionary mapping the YAML IDs of the iterations to the inputs of the createIteration mutation
+            group: GitLab group object
 
-        except gitlab.GitlabListError as e:
-            if "403" in str(e):
-                logger.error(f"Error listing iterations (may be due to missing a premium/ultimate license): {e}")
-                return None
-            logger.error(f"Error listing iterations: {e}")
-            raise
-        except Exception as e:
-            logger.error(f"Error processing iteration '{iteration_title}': {e}")
-            return None
+        Returns:
+            Dictionary mapping the YAML IDs of the iterations found to their GitLab IDs
+        """
+        existing_iterations = group.iterations.list(get_all=True, per_page=100)
+        existing_ids = {i.title: i.id for i in existing_iterations if i.group_id == group.id}
+        found = {}
+        for iteration_id, iteration_input in inputs.items():
+            if iteration_input["title"] in existing_ids:
+                id = existing_ids[iteration_input["title"]]
+                logger.info(f"Created iteration: '{iteration_input['title']}' (GitLab ID: {id}) despite the error")
+                self.iteration_id_map.commit(iteration_id, id)
+                found[iteration_id] = id
+        return found
+
+    def update_iterations(self, iterations_data: List[Dict[str, Any]], group: Any, gitlab_ids: Dict[str, int]) -> Dict[str, int]:
+        """
+        Update the iterations of a group created by a previous run, so that they match their definitions.
+        The iterations created by the previous run are updated by a single GraphQL request, with an aliased
+        mutation per iteration, the new ones are created.
+
+        Args:
+            iterations_data: List of dictionaries containing iteration definitions
+            group: GitLab group object
+            gitlab_ids: Dictionary mapping the YAML IDs of the iterations created by the previous run to their GitLab IDs
+
+        Returns:
+            Dictionary mapping the YAML IDs of the iterations to their GitLab IDs
+        """
+        inputs = {}  # Maps YAML IDs to the inputs of the updateIteration mutation
+        new_iterations = []
+        for iteration_data in iterations_data:
+            iteration_id = iteration_data.get('id')
+            if iteration_id not in gitlab_ids:
+                new_iterations.append(iteration_data)
+                continue
+            inputs[iteration_id] = {
+                "groupPath": group.full_path,
+                "id": f"gid://gitlab/Iteration/{gitlab_ids[iteration_id]}",
+                "title": iteration_data.get('title'),
+                "description": iteration_data.get('description', ''),
+                "startDate": iteration_data.get('start_date'),
+                "dueDate": iteration_data.get('due_date')
+            }
+
+        updated = {}
+        iteration_ids = list(inputs)
+        for i in range(0, len(iteration_ids), self.iterations_per_request):
+            batch = iteration_ids[i:i + self.iterations_per_request]
+            variable_declarations = ", ".join(f"$input{n}: UpdateIterationInput!" for n in range(len(batch)))
+            mutations = "\n".join(f"""
+                iteration{n}: updateIteration(input: $input{n}) {{
+                    iteration {{
+                        id
+                    }}
+                    errors
+                }}""" for n in range(len(batch)))
+            update_iterations_mutation = f"""
+            mutation updateIterations({variable_declarations}) {{{mutations}
+            }}
+            """
+            variables = {f"input{n}": inputs[iteration_id] for n, iteration_id in enumerate(batch)}
+            result = self.execute_graphql(update_iterations_mutation, variables)
+            for n, iteration_id in enumerate(batch):
+                iteration_title = inputs[iteration_id]["title"]
+                mutation_result = (result or {}).get(f"iteration{n}") or {}
+                if mutation_result.get('iteration'):
+                    logger.info(f"Updated iteration: '{iteration_title}' (GitLab ID: {gitlab_ids[iteration_id]})")
+                else:
+                    logger.error(f"Error updating iteration '{iteration_title}' via GraphQL API: {mutation_result.get('errors', [])}")
+                self.iteration_id_map.commit(iteration_id, gitlab_ids[iteration_id])
+                updated[iteration_id] = gitlab_ids[iteration_id]
+
+        if new_iterations:
+            updated.update(self.process_iterations(new_iterations, group))
+        return updated
 
     def process_milestone(self, milestone_data: Dict[str, Any], group_or_project: Any) -> Optional[int]:
         """
@@ -416,15 +2505,21 @@ class GitLabInjector:
         assert milestone_state is not None, "Milestone state is missing"
 
         # check if milestone ID is already used
-        if milestone_id in self.milestone_id_map:
-            logger.error(f"Milestone id='{milestone_id}' is already mapped to '{self.milestone_id_map[milestone_id]}'")
-            return self.milestone_id_map[milestone_id]
+        if not self.milestone_id_map.reserve(milestone_id):
+            logger.error(f"Milestone id='{milestone_id}' is already mapped to '{self.milestone_id_map.get(milestone_id)}'")
+            return self.milestone_id_map.get(milestone_id)
 
         try:
-            # Search for existing milestone by title
-            existing_milestones = list(milestones_manager.list(search=milestone_title))
-            milestone = next((m for m in existing_milestones if m.title == milestone_title), None)
-
+            # Look for existing milestone by title
+            milestone = self.live_entity(group_or_project, 'milestones', milestone_title)
+            if milestone and self.reconcile:
+                # In reconcile mode, an existing milestone is updated if needed
+                if differs(milestone, {'description': milestone_desc, 'start_date': milestone_start_date,
+                                       'due_date': milestone_due_date, 'state': milestone_state}):
+                    return self.update_milestone(milestone_data, group_or_project, milestone.id)
+                logger.info(f"Milestone is up to date: '{milestone_title}' (GitLab ID: {milestone.id})")
+                self.milestone_id_map.commit(milestone_id, milestone.id)
+                return milestone.id
             if milestone:
                 logger.error(f"Milestone with same name already exists: '{milestone_title}' (GitLab ID: {milestone.id})")
                 return None
@@ -441,10 +2536,13 @@ class GitLabInjector:
             if milestone_due_date:
                 milestone_data['due_date'] = milestone_due_date
 
-            milestone = milestones_manager.create(milestone_data)
+            milestone = self.call_with_retries(
+                lambda: milestones_manager.create(milestone_data), f"creating milestone '{milestone_title}'",
+                lambda: next((m for m in milestones_manager.list(search=milestone_title) if m.title == milestone_title), None))
             logger.info(f"Created milestone: '{milestone_title}' (GitLab ID: {milestone.id})")
+            self.live_state.add(group_or_project, 'milestones', milestone_title, milestone)
 
-            self.milestone_id_map[milestone_id] = milestone.id
+            self.milestone_id_map.commit(milestone_id, milestone.id)
 
             # Update milestone state if needed
             if milestone_state == 'closed' and milestone.state != 'closed':
@@ -457,6 +2555,32 @@ class GitLabInjector:
         except gitlab.GitlabCreateError as e:
             logger.error(f"Error creating milestone '{milestone_title}': {e}")
             raise
+        finally:
+            self.milestone_id_map.release(milestone_id)
+
+    def update_milestone(self, milestone_data: Dict[str, Any], group_or_project: Any, gitlab_id: int) -> int:
+        """
+        Update a milestone created by a previous run, so that it matches its definition.
+
+        Args:
+            milestone_data: Dictionary containing milestone definition
+            group_or_project: GitLab group or project object
+            gitlab_id: GitLab ID of the milestone
+
+        Returns:
+            The ID of the milestone
+        """
+        milestone_title = milestone_data.get('title')
+        group_or_project.milestones.update(gitlab_id, {
+            'title': milestone_title,
+            'description': milestone_data.get('description', ''),
+            'start_date': milestone_data.get('start_date') or '',
+            'due_date': milestone_data.get('due_date') or '',
+            'state_event': 'close' if milestone_data.get('state', 'active') == 'closed' else 'activate'
+        })
+        logger.info(f"Updated milestone: '{milestone_title}' (GitLab ID: {gitlab_id})")
+        self.milestone_id_map.commit(milestone_data.get('id'), gitlab_id)
+        return gitlab_id
 
     def process_epic(self, epic_data: Dict[str, Any], group: Any) -> Optional[int]:
         """
@@ -482,25 +2606,45 @@ class GitLabInjector:
         assert epic_labels is not None, "Epic labels are missing"
 
         # check if epic ID is already used
-        if epic_id in self.epic_id_map:
-            logger.error(f"Epic id='{epic_id}' is already mapped to '{self.epic_id_map[epic_id]}'")
-            return self.epic_id_map[epic_id]
+        if not self.epic_id_map.reserve(epic_id):
+            logger.error(f"Epic id='{epic_id}' is already mapped to '{self.epic_id_map.get(epic_id)}'")
+            return self.epic_id_map.get(epic_id)
+
+        api_calls_before = self.api_call_counter.thread_count()
 
         try:
-            # Search for existing epic by title
-            existing_epics = list(group.epics.list(search=epic_title))
-            epic = next((e for e in existing_epics if e.title == epic_title), None)
+            # Look for existing epic by title
+            epic = self.live_entity(group, 'epics', epic_title)
+            if epic and self.reconcile:
+                # In reconcile mode, an existing epic is updated if needed
+                self.epic_iid_map.commit(epic_id, epic.iid)
+                label_names = {self.label_name_map[label_id] for label_id in epic_labels if label_id in self.label_name_map}
+                if (set(epic.labels) != label_names
+                        or differs(epic, {'description': epic_desc, 'state': epic_state,
+                                          'parent_id': self.epic_id_map.get(epic_epic_parent_id)})):
+                    return self.update_epic(epic_data, group, epic.id)
+                logger.info(f"Epic is up to date: '{epic_title}' (GitLab ID: {epic.id})")
+                self.epic_id_map.commit(epic_id, epic.id)
+                return epic.id
             if epic:
                 logger.warning(f"Epic with same title already exists: '{epic_title}' (GitLab ID: {epic.id})")
 
-            # Create epic
-            epic = group.epics.create({
-                'title': epic_title,
-                'description': epic_desc,
-                'state': epic_state
-            })
+            # All the attributes but the state are set by the creation request, the creation API does not accept a state
+            epic_attributes = self.build_epic_attributes(epic_data)
+
+            # Create epic, an epic created despite a transient error is recognized as not being the existing epic
+            existing_ids = {epic.id} if epic else set()
+            epic = self.call_with_retries(lambda: group.epics.create(epic_attributes), f"creating epic '{epic_title}'",
+                lambda: next((e for e in group.epics.list(search=epic_title)
+                              if e.title == epic_title and e.id not in existing_ids), None))
             logger.info(f"Created epic: '{epic_title}' (GitLab ID: {epic.id})")
-            self.epic_id_map[epic_id] = epic.id
+            self.live_state.add(group, 'epics', epic_title, epic)
+            self.epic_id_map.commit(epic_id, epic.id)
+            self.epic_iid_map.commit(epic_id, epic.iid)
+            for label_name in epic_attributes.get('labels', []):
+                logger.info(f"Added label '{label_name}' to epic '{epic_title}'")
+            if 'parent_id' in epic_attributes:
+                logger.info(f"Set parent epic (GitLab ID: {epic_attributes['parent_id']}) for epic '{epic_title}'")
 
             # Update epic state if needed
             if epic_state == 'closed' and epic.state != 'closed':
@@ -508,27 +2652,9 @@ class GitLabInjector:
                 epic.save()
                 logger.info(f"Closed epic: '{epic_title}' (GitLab ID: {epic.id})")
 
-            # Add labels to epic
-            for label_id in epic_labels:
-                if label_id in self.label_name_map:
-                    try:
-                        epic.labels.append(self.label_name_map[label_id])
-                        epic.save()
-                        logger.info(f"Added label '{self.label_name_map[label_id]}' to epic '{epic.title}'")
-                    except Exception as e:
-                        logger.error(f"Error adding label '{self.label_name_map[label_id]}' to epic: {e}")
-                else:
-                    logger.error(f"Label id='{label_id}' not found in label map")
-
-            # Set parent epic if provided
-            if epic_epic_parent_id:
-                parent_epic = self.epic_id_map.get(epic_epic_parent_id)
-                if parent_epic:
-                    epic.parent_id = parent_epic
-                    epic.save()
-                    logger.info(f"Set parent epic (GitLab ID: {parent_epic}) for epic '{epic.title}'")
-                else:
-                    logger.error(f"Parent epic id='{epic_epic_parent_id}' not found in epic map")
+            api_calls = self.api_call_counter.thread_count() - api_calls_before
+            self.api_call_counter.record('epic', api_calls)
+            logger.debug(f"Epic '{epic_title}' required {api_calls} API calls")
 
             return epic.id
 
@@ -541,10 +2667,78 @@ class GitLabInjector:
         except gitlab.GitlabCreateError as e:
             logger.error(f"Error creating epic '{epic_title}': {e}")
             raise
+        finally:
+            self.epic_id_map.release(epic_id)
+
+    def build_epic_attributes(self, epic_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the attributes of an epic for the creation or update API, the references to the other
+        entities are resolved to their GitLab IDs.
+
+        Args:
+            epic_data: Dictionary containing epic definition
+
+        Returns:
+            The attributes of the epic (without its state)
+        """
+        epic_attributes = {
+            'title': epic_data.get('title'),
+            'description': epic_data.get('description')
+        }
+
+        # Add labels to epic
+        label_names = []
+        for label_id in epic_data.get('label_ids', []):
+            if label_id in self.label_name_map:
+                label_names.append(self.label_name_map[label_id])
+            else:
+                logger.error(f"Label id='{label_id}' not found in label map")
+        if label_names:
+            epic_attributes['labels'] = label_names
+
+        # Set parent epic if provided
+        epic_parent_id = epic_data.get('parent_epic_id')
+        if epic_parent_id:
+            parent_epic = self.epic_id_map.get(epic_parent_id)
+            if parent_epic:
+                epic_attributes['parent_id'] = parent_epic
+            else:
+                logger.error(f"Parent epic id='{epic_parent_id}' not found in epic map")
+
+        return epic_attributes
+
+    def update_epic(self, epic_data: Dict[str, Any], group: Any, gitlab_id: int) -> int:
+        """
+        Update an epic created by a previous run, so that it matches its definition.
+
+        Args:
+            epic_data: Dictionary containing epic definition
+            group: GitLab group object
+            gitlab_id: GitLab ID of the epic
+
+        Returns:
+            The ID of the epic
+        """
+        epic_id = epic_data.get('id')
+        epic_title = epic_data.get('title')
+        epic_iid = self.epic_iid_map.get(epic_id)
+        if epic_iid is None:
+            logger.error(f"Epic '{epic_title}' (GitLab ID: {gitlab_id}) cannot be updated, its IID has not been recorded")
+            return gitlab_id
+
+        # The labels which are no longer defined are removed
+        epic_attributes = {'labels': ''}
+        epic_attributes.update(self.build_epic_attributes(epic_data))
+        epic_attributes['state_event'] = 'close' if epic_data.get('state', 'opened') == 'closed' else 'reopen'
+
+        group.epics.update(epic_iid, epic_attributes)
+        logger.info(f"Updated epic: '{epic_title}' (GitLab ID: {gitlab_id})")
+        self.epic_id_map.commit(epic_id, gitlab_id)
+        return gitlab_id
 
     def process_project(self, project_data: Dict[str, Any], group: Any) -> Optional[int]:
         """
-        Process and create a project.
+        Process and create a project and its content.
 
         Args:
             project_data: Dictionary containing project definition
@@ -553,6 +2747,23 @@ class GitLabInjector:
         Returns:
             The ID of the created project
         """
+        plan = InjectionPlan()
+        project = self.plan_project(plan, project_data, group_object=group)
+        self.log_unsupported()
+        self.run_plan(plan)
+        return project.result.id if project.result else None
+
+    def create_project(self, project_data: Dict[str, Any], group: Any) -> Any:
+        """
+        Create a project, without its content.
+
+        Args:
+            project_data: Dictionary containing project definition
+            group: GitLab group object
+
+        Returns:
+            The GitLab project object or None if the project already exists
+        """
         project_name = project_data.get('name')
         project_desc = project_data.get('description', '')
         assert project_name is not None, "Project name is missing"
@@ -560,45 +2771,129 @@ class GitLabInjector:
 
         try:
             # Check if project exists in group
-            existing_projects = list(group.projects.list(search=project_name))
-            existing_project = next((p for p in existing_projects if p.name == project_name), None)
-
+            existing_project = self.live_entity(group, 'projects', project_name)
+            if existing_project and self.reconcile:
+                # In reconcile mode, an existing project is updated if needed
+                if differs(existing_project, {'description': project_desc}):
+                    return self.update_project(project_data, existing_project.id)
+                logger.info(f"Project is up to date: '{project_name}' (GitLab ID: {existing_project.id})")
+                return existing_project
             if existing_project:
                 logger.error(f"Project with same name already exists: '{project_name}' (GitLab ID: {existing_project.id})")
                 return None
 
             # Create project
-            project = self.gl.projects.create({
+            project = self.call_with_retries(lambda: self.gl.projects.create({
                 'name': project_name,
                 'namespace_id': group.id,
                 'description': project_desc,
                 'visibility': 'private'  # Adjust as needed
-            })
+            }), f"creating project '{project_name}'",
+                lambda: next((p for p in group.projects.list(search=project_name) if p.name == project_name), None))
             logger.info(f"Created project: '{project_name}' (GitLab ID: {project.id})")
+            self.live_state.add(group, 'projects', project_name, project)
+            self.live_state.add_created(project)
 
-            # Give GitLab some time to initialize the project
-            time.sleep(1)
+            # Wait for GitLab to initialize the project
+            return self.wait_for_project(project)
 
-            # Reload project to ensure all attributes are available
-            project = self.gl.projects.get(project.id)
+        except gitlab.GitlabCreateError as e:
+            logger.error(f"Error creating project '{project_name}': {e}")
+            raise
+
+    def update_project(self, project_data: Dict[str, Any], gitlab_id: int) -> Any:
+        """
+        Update a project created by a previous run, so that it matches its definition (without its content).
+
+        Args:
+            project_data: Dictionary containing project definition
+            gitlab_id: GitLab ID of the project
+
+        Returns:
+            The GitLab project object
+        """
+        attributes = self.gl.projects.update(gitlab_id, {
+            'description': project_data.get('description', '')
+        })
+        logger.info(f"Updated project: '{project_data.get('name')}' (GitLab ID: {gitlab_id})")
+        # The update returns the updated project, so it is not fetched
+        self.api_call_counter.avoid_get()
+        return gitlab.v4.objects.Project(self.gl.projects, attributes)
+
+    def get_members(self, group_or_project: Any) -> Dict[int, int]:
+        """
+        Get the direct members of a group or project, they are listed only once and then kept in the member index.
 
-            # Process members in project
-            for member_data in project_data.get('members', []):
-                self.process_member(member_data, project)
+        Args:
+            group_or_project: GitLab group or project object
 
-            # Process milestones in project
-            for milestone_data in project_data.get('milestones', []):
-                self.process_milestone(milestone_data, project)
+        Returns:
+            Dictionary mapping the GitLab IDs of the members to their access levels
+        """
+        members_path = group_or_project.members.path
+        with self.member_index_lock:
+            if members_path in self.member_index:
+                return self.member_index[members_path]
+        members = group_or_project.members.list(get_all=True, per_page=100)
+        with self.member_index_lock:
+            return self.member_index.setdefault(members_path, {m.id: m.access_level for m in members})
+
+    @staticmethod
+    def is_project_ready(project: Any) -> bool:
+        """
+        Check if a project is initialized and can be populated.
 
-            # Process issues in project
-            for issue_data in project_data.get('issues', []):
-                self.process_issue(issue_data, project)
+        Args:
+            project: GitLab project object
 
-            return project.id
+        Returns:
+            True if the project is ready
+        """
+        attributes = project.attributes
+        return ('name' in attributes
+                and 'namespace' in attributes
+                and attributes.get('import_status', 'none') in ('none', 'finished'))
 
-        except gitlab.GitlabCreateError as e:
-            logger.error(f"Error creating project '{project_name}': {e}")
-            raise
+    def wait_for_project(self, project: Any) -> Any:
+        """
+        Wait until a newly created project is ready, polling it with an exponential backoff.
+        The project is not reloaded if the creation response shows that it is already ready.
+
+        Args:
+            project: GitLab project object returned by the creation
+
+        Returns:
+            The ready GitLab project object
+        """
+        delay = PROJECT_READINESS_INITIAL_DELAY
+        deadline = time.monotonic() + PROJECT_READINESS_TIMEOUT
+        if self.is_project_ready(project):
+            self.api_call_counter.avoid_get()
+        while not self.is_project_ready(project):
+            if time.monotonic() >= deadline:
+                logger.warning(f"Project (GitLab ID: {project.id}) is still not ready, continuing anyway")
+                break
+            time.sleep(delay)
+            delay = min(delay * 2, PROJECT_READINESS_MAX_DELAY)
+            project = self.gl.projects.get(project.id)
+        return project
+
+    @staticmethod
+    def find_added_members(group_or_project: Any, users: List[GitLabUser]) -> Optional[Dict[str, Any]]:
+        """
+        Check if users have been added as members of a group or project.
+
+        Args:
+            group_or_project: GitLab group or project object
+            users: The users
+
+        Returns:
+            A successful member creation result if all the users are members, None otherwise
+        """
+        member_ids = {m.id for m in group_or_project.members.list(get_all=True, per_page=100)}
+        if all(user.id in member_ids for user in users):
+            return {'status': 'success'}
+        return None
 
     def process_member(self, member_data: Dict[str, Any], group_or_project: Any) -> None:
         """
@@ -608,11 +2903,18 @@ class GitLabInjector:
             member_data: Dictionary containing member definition
             group_or_project: GitLab group or project object
         """
-        user_id = member_data.get('user_id')
-        role = member_data.get('role')
-        assert user_id is not None
-        assert role is not None
+        self.process_members([member_data], group_or_project)
+
+    def process_members(self, members_data: List[Dict[str, Any]], group_or_project: Any, update_roles: bool = False) -> None:
+        """
+        Process and add members to a group or project.
+        The users having the same role are added by a single API call.
 
+        Args:
+            members_data: List of dictionaries containing member definitions
+            group_or_project: GitLab group or project object
+            update_roles: True to change the role of the users who are already members with another role
+        """
         # Map role to GitLab access level
         access_level_map = {
             'guest': 10,
@@ -623,39 +2925,68 @@ class GitLabInjector:
             'owner': 50
         }
 
-        access_level = access_level_map.get(role)
-        assert access_level is not None, f"Invalid role '{role}'"
-
-        if user_id in self.user_id_map:
-            username = self.user_id_map[user_id]
-
-            try:
-                # Try to find the user in GitLab
-                users_list = self.gl.users.list(username=username)
-                users = list(users_list)  # Convert RESTObjectList to a regular list
-                assert users is not None, f"User '{username}' not found in GitLab"
-                assert len(users) == 1, f"Multiple users found for username '{username}'"
-                user = users[0]
+        existing_members = None
+        users_per_role: Dict[str, List[GitLabUser]] = {}
+        for member_data in members_data:
+            user_id = member_data.get('user_id')
+            role = member_data.get('role')
+            assert user_id is not None
+            assert role is not None
+            assert access_level_map.get(role) is not None, f"Invalid role '{role}'"
+
+            if user_id not in self.user_id_map:
+                logger.error(f"User ID '{user_id}' not found in user map")
+                continue
+            user = self.user_id_map[user_id]
+
+            # Check if user is already a member
+            if existing_members is None:
                 try:
-                    # Check if user is already a member
-                    existing_members = list(group_or_project.members.list())
-                    is_member = any(m.username == username for m in existing_members)
-
-                    if not is_member:
-                        # Add user as member
-                        group_or_project.members.create({
-                            'user_id': user.id,
-                            'access_level': access_level
-                        })
-                        logger.info(f"Added user '{username}' as {role} to {group_or_project.name}")
-                    else:
-                        logger.info(f"User '{username}' is already a member of {group_or_project.name}")
-                except gitlab.GitlabCreateError as e:
-                    logger.error(f"Error adding member '{username}': {e}")
+                    existing_members = self.get_members(group_or_project)
+                except gitlab.GitlabError as e:
+                    logger.error(f"Error listing members of {group_or_project.name}: {e}")
+                    return
+            if (update_roles and user.id in existing_members
+                    and existing_members[user.id] != access_level_map[role]):
+                try:
+                    group_or_project.members.update(user.id, {
+                        'access_level': access_level_map[role]
+                    })
+                    existing_members[user.id] = access_level_map[role]
+                    logger.info(f"Changed role of user '{user.username}' to {role} in {group_or_project.name}")
+                except gitlab.GitlabError as e:
+                    logger.error(f"Error updating member '{user.username}': {e}")
+                continue
+            if user.id in existing_members or any(user in users for users in users_per_role.values()):
+                logger.info(f"User '{user.username}' is already a member of {group_or_project.name}")
+                continue
+            users_per_role.setdefault(role, []).append(user)
+
+        for role, users in users_per_role.items():
+            access_level = access_level_map[role]
+            usernames = ', '.join(f"'{user.username}'" for user in users)
+            try:
+                # Add users as members, GitLab accepts a comma-separated list of user IDs
+                result = self.call_with_retries(lambda: self.gl.http_post(group_or_project.members.path, post_data={
+                    'user_id': ','.join(str(user.id) for user in users),
+                    'access_level': access_level
+                }), f"adding members {usernames}",
+                    lambda: self.find_added_members(group_or_project, users))
             except gitlab.GitlabError as e:
-                logger.error(f"Error finding user '{username}': {e}")
-        else:
-            logger.error(f"User ID '{user_id}' not found in user map")
+                logger.error(f"Error adding members {usernames}: {e}")
+                continue
+
+            # When several users are added, errors are reported per username
+            errors = result.get('message', {}) if result.get('status') == 'error' else {}
+            if not isinstance(errors, dict):
+                logger.error(f"Error adding members {usernames}: {errors}")
+                continue
+            for user in users:
+                if user.username in errors:
+                    logger.error(f"Error adding member '{user.username}': {errors[user.username]}")
+                else:
+                    existing_members[user.id] = access_level
+                    logger.info(f"Added user '{user.username}' as {role} to {group_or_project.name}")
 
     def process_issue(self, issue_data: Dict[str, Any], project: Any) -> int:
         """
@@ -670,128 +3001,261 @@ class GitLabInjector:
         """
         issue_id = issue_data.get('id')
         issue_title = issue_data.get('title')
-        issue_desc = issue_data.get('description')
         issue_state = issue_data.get('state', 'opened')
-        issue_labels = issue_data.get('label_ids', [])
-        issue_parent_epic_id = issue_data.get('parent_epic_id', None)
-        issue_milestone_id = issue_data.get('milestone_id', None)
-        issue_iteration_id = issue_data.get('iteration_id', None)
-        issue_weight = issue_data.get('weight', None)
-        issue_assignee_ids = issue_data.get('assignee_ids', [])
         assert issue_id is not None, "Issue ID is missing"
-        assert issue_title is not None, "Issue title is missing"
-        assert issue_desc is not None, "Issue description is missing"
         assert issue_state is not None, "Issue state is missing"
-        assert issue_labels is not None, "Issue labels are missing"
-        assert issue_assignee_ids is not None, "Issue assignee IDs are missing"
 
         # check if issue ID is already used
-        if issue_id in self.issue_id_map:
-            logger.error(f"Issue id='{issue_id}' is already mapped to '{self.issue_id_map[issue_id]}'")
-            return self.issue_id_map[issue_id]
+        if not self.issue_id_map.reserve(issue_id):
+            logger.error(f"Issue id='{issue_id}' is already mapped to '{self.issue_id_map.get(issue_id)}'")
+            return self.issue_id_map.get(issue_id)
 
-        try:
-            # Search for existing issue by title
-            existing_issues = list(project.issues.list(search=issue_title))
-            issue = next((i for i in existing_issues if i.title == issue_title), None)
+        api_calls_before = self.api_call_counter.thread_count()
 
+        try:
+            # Look for existing issue by title
+            issue = self.live_entity(project, 'issues', issue_title)
+            if issue and self.reconcile:
+                # In reconcile mode, an existing issue is updated if needed
+                self.issue_iid_map.commit(issue_id, issue.iid)
+                if self.issue_differs(issue, issue_data):
+                    return self.update_issue(issue_data, project, issue.id)
+                logger.info(f"Issue is up to date: '{issue_title}' (GitLab ID: {issue.id})")
+                self.issue_id_map.commit(issue_id, issue.id)
+                return issue.id
             if issue:
                 logger.warning(f"Issue already exists with same title: '{issue_title}' (GitLab ID: {issue.id})")
 
-            # Set iteration if provided
-            # There is currently no API to set the iteration of an issue
-            # See https://gitlab.com/gitlab-org/gitlab/-/issues/395790
-            # So we are obliged to use the "/iteration *iteration:<iteration ID>" quick action for the time being
-            if issue_iteration_id:
-                iteration_id = self.iteration_id_map.get(issue_iteration_id)
-                if iteration_id:
-                    issue_desc = f"{issue_desc}\n/iteration *iteration:{iteration_id}"
-                    logger.info(f"Set iteration (GitLab ID: {iteration_id}) will be set for issue '{issue_title}'")
-                else:
-                    logger.error(f"Iteration id='{issue_iteration_id}' not found in iteration map")
+            # All the attributes are set by the creation request
+            issue_attributes = self.build_issue_attributes(issue_data)
 
             # Create issue
-            issue = project.issues.create({
-                'title': issue_title,
-                'description': issue_desc
-            })
+            # An issue created despite a transient error is recognized as not being the existing issue
+            existing_ids = {issue.id} if issue else set()
+            started_at = datetime.now(timezone.utc)
+            issue = self.call_with_retries(
+                lambda: project.issues.create(issue_attributes), f"creating issue '{issue_title}'",
+                lambda: self.find_created_issue(project, issue_attributes, started_at, existing_ids))
             logger.info(f"Created issue: '{issue_title}' (GitLab ID: {issue.id})")
-            self.issue_id_map[issue_id] = issue.id
+            self.live_state.add(project, 'issues', issue_title, issue)
+            self.issue_id_map.commit(issue_id, issue.id)
+            self.issue_iid_map.commit(issue_id, issue.iid)
+            self.log_issue_attributes(issue_attributes, issue_title)
 
-            # Set weight if provided
-            if issue_weight is not None:
-                issue.weight = issue_weight
-                issue.save()
-                logger.info(f"Set weight ({issue_weight}) for issue '{issue.title}'")
-
-            # Update issue state if needed
+            # Update issue state if needed, the creation API does not accept a state
             if issue_state == 'closed' and issue.state != 'closed':
                 issue.state_event = 'close'
                 issue.save()
                 logger.info(f"Closed issue: '{issue_title}' (GitLab ID: {issue.id})")
 
-            # Add labels to issue
-            for label_id in issue_labels:
-                if label_id in self.label_name_map:
-                    try:
-                        issue.labels.append(self.label_name_map[label_id])
-                        issue.save()
-                        logger.info(f"Added label '{self.label_name_map[label_id]}' to issue '{issue.title}'")
-                    except Exception as e:
-                        logger.error(f"Error adding label '{self.label_name_map[label_id]}' to issue: {e}")
-                else:
-                    logger.error(f"Label id='{label_id}' not found in label map")
-
-            # Set parent epic if provided
-            if issue_parent_epic_id:
-                parent_epic = self.epic_id_map.get(issue_parent_epic_id)
-                if parent_epic:
-                    issue.epic_id = parent_epic
-                    issue.save()
-                    logger.info(f"Set parent epic (GitLab ID: {parent_epic}) for issue '{issue.title}'")
-                else:
-                    logger.error(f"Parent epic id='{issue_parent_epic_id}' not found in epic map")
-
-            # Set milestone if provided
-            if issue_milestone_id:
-                milestone_id = self.milestone_id_map.get(issue_milestone_id)
-                if milestone_id:
-                    issue.milestone_id = milestone_id
-                    issue.save()
-                    logger.info(f"Set milestone (GitLab ID: {milestone_id}) for issue '{issue.title}'")
-                else:
-                    logger.error(f"Milestone id='{issue_milestone_id}' not found in milestone map")
-
-            # Set assignees if provided
-            assignee_ids = []
-            for assignee_id in issue_assignee_ids:
-                if assignee_id in self.user_id_map:
-                    username = self.user_id_map[assignee_id]
-                    try:
-                        # Find user by username
-                        users_list = self.gl.users.list(username=username)
-                        users = list(users_list)  # Convert RESTObjectList to a regular list
-                        assert users is not None, f"User '{username}' not found in GitLab"
-                        assert len(users) == 1, f"Multiple users found for username '{username}'"
-                        user = users[0]
-                        assignee_ids.append(user.id)
-                        logger.info(f"User '{username}' is assigned to issue '{issue_title}'")
-                    except gitlab.GitlabError as e:
-                        logger.error(f"Error finding user '{username}': {e}")
-                        logger.warning(f"User '{username}' not found in GitLab. Cannot assign to issue.")
-                else:
-                    logger.error(f"User ID '{assignee_id}' not found in user map")
-
-            if assignee_ids:
-                issue.assignee_ids = assignee_ids
-                issue.save()
-                logger.info(f"Assigned users to issue '{issue_title}'")
+            api_calls = self.api_call_counter.thread_count() - api_calls_before
+            self.api_call_counter.record('issue', api_calls)
+            logger.debug(f"Issue '{issue_title}' required {api_calls} API calls")
 
             return issue.id
 
         except gitlab.GitlabCreateError as e:
             logger.error(f"Error creating issue '{issue_title}': {e}")
             raise
+        finally:
+            self.issue_id_map.release(issue_id)
+
+    @staticmethod
+    def find_created_issue(project: Any, issue_attributes: Dict[str, Any], started_at: datetime,
+                           existing_ids: Iterable[int]) -> Any:
+        """
+        Find an issue created by a request which failed, so that it is not created again.
+        Only an issue with the same title and description, created since the first attempt, can be the created one:
+        another issue with the same title (e.g., created by a previous run) is not taken for it. If the clock of
+        GitLab is behind the local one, the created issue is not recognized and it is created again.
+
+        Args:
+            project: GitLab project object
+            issue_attributes: Attributes of the creation request
+            started_at: Time of the first attempt
+            existing_ids: GitLab IDs of the issues known to exist before the first attempt
+
+        Returns:
+            The created issue, or None if it has not been created
+        """
+        title = issue_attributes['title']
+        # GitLab removes the quick action setting the iteration from the description
+        description = (issue_attributes.get('description') or '').split('\n/iteration ')[0]
+        # The creation time is given in milliseconds
+        created_after = started_at.replace(microsecond=started_at.microsecond // 1000 * 1000)
+        for issue in project.issues.list(search=title, created_after=created_after.isoformat(), get_all=True):
+            if issue.title == title and (issue.description or '') == description and issue.id not in existing_ids \
+                    and datetime.fromisoformat(issue.created_at.replace('Z', '+00:00')) >= created_after:
+                return issue
+        return None
+
+    def build_issue_attributes(self, issue_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the attributes of an issue for the creation or update API, the references to the other
+        entities are resolved to their GitLab IDs.
+
+        Args:
+            issue_data: Dictionary containing issue definition
+
+        Returns:
+            The attributes of the issue (without its state)
+        """
+        issue_title = issue_data.get('title')
+        issue_desc = issue_data.get('description')
+        issue_labels = issue_data.get('label_ids', [])
+        issue_parent_epic_id = issue_data.get('parent_epic_id', None) if self.capabilities.epics else None
+        issue_milestone_id = issue_data.get('milestone_id', None)
+        issue_iteration_id = issue_data.get('iteration_id', None) if self.capabilities.iterations else None
+        issue_weight = issue_data.get('weight', None) if self.capabilities.weights else None
+        issue_assignee_ids = issue_data.get('assignee_ids', [])
+        assert issue_title is not None, "Issue title is missing"
+        assert issue_desc is not None, "Issue description is missing"
+        assert issue_labels is not None, "Issue labels are missing"
+        assert issue_assignee_ids is not None, "Issue assignee IDs are missing"
+
+        # Set iteration if provided
+        # There is currently no API to set the iteration of an issue
+        # See https://gitlab.com/gitlab-org/gitlab/-/issues/395790
+        # So we are obliged to use the "/iteration *iteration:<iteration ID>" quick action for the time being
+        if issue_iteration_id:
+            iteration_id = self.iteration_id_map.get(issue_iteration_id)
+            if iteration_id:
+                issue_desc = f"{issue_desc}\n/iteration *iteration:{iteration_id}"
+                logger.info(f"Set iteration (GitLab ID: {iteration_id}) will be set for issue '{issue_title}'")
+            else:
+                logger.error(f"Iteration id='{issue_iteration_id}' not found in iteration map")
+
+        issue_attributes = {
+            'title': issue_title,
+            'description': issue_desc
+        }
+
+        # Set weight if provided
+        if issue_weight is not None:
+            issue_attributes['weight'] = issue_weight
+
+        # Add labels to issue
+        label_names = []
+        for label_id in issue_labels:
+            if label_id in self.label_name_map:
+                label_names.append(self.label_name_map[label_id])
+            else:
+                logger.error(f"Label id='{label_id}' not found in label map")
+        if label_names:
+            issue_attributes['labels'] = label_names
+
+        # Set parent epic if provided
+        if issue_parent_epic_id:
+            parent_epic = self.epic_id_map.get(issue_parent_epic_id)
+            if parent_epic:
+                issue_attributes['epic_id'] = parent_epic
+            else:
+                logger.error(f"Parent epic id='{issue_parent_epic_id}' not found in epic map")
+
+        # Set milestone if provided
+        if issue_milestone_id:
+            milestone_id = self.milestone_id_map.get(issue_milestone_id)
+            if milestone_id:
+                issue_attributes['milestone_id'] = milestone_id
+            else:
+                logger.error(f"Milestone id='{issue_milestone_id}' not found in milestone map")
+
+        # Set assignees if provided
+        assignee_ids = []
+        for assignee_id in issue_assignee_ids:
+            if assignee_id in self.user_id_map:
+                user = self.user_id_map[assignee_id]
+                assignee_ids.append(user.id)
+                logger.info(f"User '{user.username}' is assigned to issue '{issue_title}'")
+            else:
+                logger.error(f"User ID '{assignee_id}' not found in user map")
+        if assignee_ids:
+            issue_attributes['assignee_ids'] = assignee_ids
+
+        return issue_attributes
+
+    def issue_differs(self, issue: Any, issue_data: Dict[str, Any]) -> bool:
+        """
+        Check if an existing issue differs from its definition.
+
+        Args:
+            issue: Existing GitLab issue object
+            issue_data: Dictionary containing issue definition
+
+        Returns:
+            True if the issue differs
+        """
+        label_names = {self.label_name_map[label_id] for label_id in issue_data.get('label_ids', [])
+                       if label_id in self.label_name_map}
+        assignee_ids = {self.user_id_map[assignee_id].id for assignee_id in issue_data.get('assignee_ids', [])
+                        if assignee_id in self.user_id_map}
+        # The referenced entities are not returned if they are not set or not available with the license
+        milestone = issue.attributes.get('milestone') or {}
+        epic = issue.attributes.get('epic') or {}
+        iteration = issue.attributes.get('iteration') or {}
+        weight = issue_data.get('weight') if self.capabilities.weights else None
+        return (differs(issue, {'description': issue_data.get('description'), 'state': issue_data.get('state', 'opened'),
+                                'weight': weight})
+                or set(issue.labels) != label_names
+                or {assignee['id'] for assignee in issue.assignees} != assignee_ids
+                or milestone.get('id') != self.milestone_id_map.get(issue_data.get('milestone_id'))
+                or epic.get('id') != self.epic_id_map.get(issue_data.get('parent_epic_id'))
+                or iteration.get('id') != self.iteration_id_map.get(issue_data.get('iteration_id')))
+
+    @staticmethod
+    def log_issue_attributes(issue_attributes: Dict[str, Any], issue_title: str) -> None:
+        """
+        Log the attributes set on an issue.
+
+        Args:
+            issue_attributes: The attributes of the issue
+            issue_title: Title of the issue
+        """
+        if issue_attributes.get('weight') is not None:
+            logger.info(f"Set weight ({issue_attributes['weight']}) for issue '{issue_title}'")
+        for label_name in issue_attributes.get('labels') or []:
+            logger.info(f"Added label '{label_name}' to issue '{issue_title}'")
+        if issue_attributes.get('epic_id'):
+            logger.info(f"Set parent epic (GitLab ID: {issue_attributes['epic_id']}) for issue '{issue_title}'")
+        if issue_attributes.get('milestone_id'):
+            logger.info(f"Set milestone (GitLab ID: {issue_attributes['milestone_id']}) for issue '{issue_title}'")
+        if issue_attributes.get('assignee_ids'):
+            logger.info(f"Assigned users to issue '{issue_title}'")
+
+    def update_issue(self, issue_data: Dict[str, Any], project: Any, gitlab_id: int) -> int:
+        """
+        Update an issue created by a previous run, so that it matches its definition.
+
+        Args:
+            issue_data: Dictionary containing issue definition
+            project: GitLab project object
+            gitlab_id: GitLab ID of the issue
+
+        Returns:
+            The ID of the issue
+        """
+        issue_id = issue_data.get('id')
+        issue_title = issue_data.get('title')
+        issue_iid = self.issue_iid_map.get(issue_id)
+        if issue_iid is None:
+            logger.error(f"Issue '{issue_title}' (GitLab ID: {gitlab_id}) cannot be updated, its IID has not been recorded")
+            return gitlab_id
+
+        # The attributes which are no longer defined are reset
+        issue_attributes = {
+            'labels': '',
+            'milestone_id': 0,
+            'assignee_ids': []
+        }
+        if self.capabilities.epics:
+            issue_attributes['epic_id'] = 0
+        issue_attributes.update(self.build_issue_attributes(issue_data))
+        issue_attributes['state_event'] = 'close' if issue_data.get('state', 'opened') == 'closed' else 'reopen'
+        project.issues.update(issue_iid, issue_attributes)
+        logger.info(f"Updated issue: '{issue_title}' (GitLab ID: {gitlab_id})")
+        self.log_issue_attributes(issue_attributes, issue_title)
+        self.issue_id_map.commit(issue_id, gitlab_id)
+        return gitlab_id
 
 def main():
     """
@@ -802,10 +3266,45 @@ def main():
     parser.add_argument('--token', required=True, help='GitLab personal access token')
     parser.add_argument('--url', required=True, help='GitLab URL (e.g., https://gitlab.example.com)')
     parser.add_argument('--group', help='Parent group path where top-level groups should be created (e.g., "group/subgroup")')
+    parser.add_argument('--concurrency', type=int, default=1, help='Maximum number of entities processed in parallel (default: 1)')
+    parser.add_argument('--iterations-per-request', type=int, default=20,
+                        help='Maximum number of iterations created by a single GraphQL request (default: 20)')
+    parser.add_argument('--rate-limit', type=float,
+                        help='Maximum number of API calls per second (default: no limit other than the one reported by GitLab)')
+    parser.add_argument('--max-retries', type=int, default=5,
+                        help='Maximum number of retries of an API call failing because of a transient error (default: 5)')
+    parser.add_argument('--journal', help='Path of the journal recording the completed operations')
+    parser.add_argument('--store', help='Path of an SQLite database recording the completed operations (instead of a journal)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Resume the run recorded in the journal or store, skipping the operations it has completed')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only inject the changes since the run recorded in the journal or store: create the new entities and update the changed ones')
+    parser.add_argument('--reconcile', action='store_true',
+                        help='Converge the existing GitLab entities to the YAML file: update the existing entities which differ instead of reporting them as errors')
+    parser.add_argument('--stream', action='store_true',
+                        help='Read the YAML file incrementally, injecting each group and project as soon as it has been read')
 
     args = parser.parse_args()
-
-    creator = GitLabInjector(gitlab_url=args.url, private_token=args.token, parent_group_path=args.group)
+    if args.journal and args.store:
+        parser.error('--journal and --store are mutually exclusive')
+    if args.resume and not (args.journal or args.store):
+        parser.error('--resume requires --journal or --store')
+    if args.incremental and not (args.journal or args.store):
+        parser.error('--incremental requires --journal or --store')
+
+    creator = GitLabInjector(gitlab_url=args.url,
+                             private_token=args.token,
+                             parent_group_path=args.group,
+                             concurrency=args.concurrency,
+                             iterations_per_request=args.iterations_per_request,
+                             rate_limit=args.rate_limit,
+                             max_retries=args.max_retries,
+                             journal_path=args.journal,
+                             store_path=args.store,
+                             resume=args.resume,
+                             incremental=args.incremental,
+                             reconcile=args.reconcile,
+                             stream=args.stream)
     creator.process_yaml(args.config)
 
 if __name__ == '__main__':
@@ -0,0 +1,54 @@
+"""
+Fixtures running the injector against the fake GitLab.
+"""
+
+import copy
+import os
+from typing import Any, Callable, Dict, Optional
+
+import pytest
+import yaml
+
+import gitlab_injector
+from fake_gitlab import FakeGitLab
+
+EXAMPLE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'example.yaml')
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    """
+    Retry the failed calls without waiting, and probe the capabilities of each fake GitLab.
+    """
+    monkeypatch.setattr(gitlab_injector, 'RETRY_BASE_DELAY', 0.001)
+    gitlab_injector.CAPABILITIES_CACHE.clear()
+
+@pytest.fixture
+def fake():
+    """
+    Fake GitLab knowing the users of example.yaml.
+    """
+    with FakeGitLab(usernames=('__another_user__',)) as fake:
+        yield fake
+
+@pytest.fixture
+def example() -> Dict[str, Any]:
+    """
+    Configuration of example.yaml, which can be modified by the test.
+    """
+    with open(EXAMPLE_PATH, 'r') as f:
+        return yaml.safe_load(f)
+
+@pytest.fixture
+def inject(fake, tmp_path) -> Callable[..., gitlab_injector.GitLabInjector]:
+    """
+    Function injecting a configuration into the fake GitLab (or into another one), with the given options of the injector.
+    """
+    def inject(config: Dict[str, Any], gitlab: Optional[FakeGitLab] = None, **options: Any) -> gitlab_injector.GitLabInjector:
+        config_path = tmp_path / 'config.yaml'
+        with open(config_path, 'w') as f:
+            yaml.safe_dump(copy.deepcopy(config), f, sort_keys=False)
+        injector = gitlab_injector.GitLabInjector((gitlab or fake).url, 'token', **options)
+        injector.process_yaml(str(config_path))
+        return injector
+
+    return inject
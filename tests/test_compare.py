@@ -0,0 +1,46 @@
+"""
+Tests of the benchmark regression gate.
+"""
+
+import copy
+
+from benchmarks.compare import compare
+
+BASELINE = {
+    'options': {'concurrency': 8, 'latency': 0.0, 'seed': 0, 'repeat': 3},
+    'results': [{
+        'name': 'issues-100',
+        'entities_per_second': 200.0,
+        'calls_per_entity': {'issue': 1.17, 'epic': 1.0, 'project': 1.0, 'iteration': 0.25},
+        'errors': 0
+    }]
+}
+
+def test_throughput_drop_is_gated():
+    results = copy.deepcopy(BASELINE)
+    results['results'][0]['entities_per_second'] = 160.0
+    assert compare(results, BASELINE, 0.25, 0.0) == []
+
+    results['results'][0]['entities_per_second'] = 140.0
+    assert compare(results, BASELINE, 0.25, 0.0) == [
+        "issues-100: throughput dropped to 140.0 entities/s (baseline: 200.0, minimum: 150.0)"]
+
+def test_api_calls_are_gated():
+    results = copy.deepcopy(BASELINE)
+    results['results'][0]['calls_per_entity']['iteration'] = 0.5
+
+    assert compare(results, BASELINE, 0.25, 0.0) == ["issues-100: API calls per iteration rose to 0.5 (baseline: 0.25, maximum: 0.250)"]
+
+def test_other_options_fail():
+    results = copy.deepcopy(BASELINE)
+    results['options']['concurrency'] = 1
+
+    assert len(compare(results, BASELINE, 0.25, 0.0)) == 1
+
+def test_missing_results_fail():
+    results = copy.deepcopy(BASELINE)
+    del results['results'][0]['calls_per_entity']['epic']
+    assert compare(results, BASELINE, 0.25, 0.0) == ["issues-100: no epic injected"]
+
+    results['results'] = []
+    assert compare(results, BASELINE, 0.25, 0.0) == ["issues-100: not benchmarked"]
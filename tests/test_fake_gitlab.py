@@ -0,0 +1,64 @@
+"""
+Tests of the fake GitLab itself: pagination, request counts, injected failures and rate limit.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from fake_gitlab import FakeGitLab
+
+HEADERS = {'PRIVATE-TOKEN': 'token'}
+
+@pytest.fixture
+def session():
+    with requests.Session() as session:
+        session.headers.update(HEADERS)
+        yield session
+
+def test_listings_are_paginated(fake, session):
+    for n in range(3):
+        session.post(f"{fake.url}/api/v4/groups", json={'name': f"Group {n}", 'path': f"group-{n}"}).raise_for_status()
+
+    response = session.get(f"{fake.url}/api/v4/groups", params={'per_page': 2})
+    assert [group['path'] for group in response.json()] == ['group-0', 'group-1']
+    assert response.headers['X-Total'] == '3'
+    assert response.headers['X-Next-Page'] == '2'
+    assert 'rel="next"' in response.headers['Link']
+
+    response = session.get(response.links['next']['url'])
+    assert [group['path'] for group in response.json()] == ['group-2']
+    assert 'rel="next"' not in response.headers['Link']
+
+def test_requests_are_counted_under_concurrency(fake):
+    def get_user(_):
+        requests.get(f"{fake.url}/api/v4/user", headers=HEADERS).raise_for_status()
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        list(executor.map(get_user, range(400)))
+    assert fake.requests['GET /user'] == 400
+
+def test_injected_failures(fake, session):
+    fake.fail('GET /user', 503, count=2)
+    assert [session.get(f"{fake.url}/api/v4/user").status_code for _ in range(3)] == [503, 503, 200]
+
+    # A processed failure creates the group although the response is an error
+    fake.fail('POST /groups', 502, processed=True)
+    response = session.post(f"{fake.url}/api/v4/groups", json={'name': 'Group', 'path': 'group'})
+    assert response.status_code == 502
+    assert [group['path'] for group in session.get(f"{fake.url}/api/v4/groups").json()] == ['group']
+
+    fake.fail('POST /graphql', 500)
+    assert session.post(f"{fake.url}/api/graphql", json={'query': 'query { users { nodes { id } } }'}).status_code == 500
+    assert fake.requests['POST /graphql'] == 1
+
+def test_rate_limit():
+    with FakeGitLab(rate_limit=2) as fake, requests.Session() as session:
+        session.headers.update(HEADERS)
+        responses = [session.get(f"{fake.url}/api/v4/user") for _ in range(3)]
+    assert [response.status_code for response in responses] == [200, 200, 429]
+    assert [response.headers['RateLimit-Remaining'] for response in responses] == ['1', '0', '0']
+    assert all(response.headers['RateLimit-Limit'] == '2' for response in responses)
+    assert int(responses[2].headers['Retry-After']) > 0
+    assert responses[0].headers['RateLimit-Reset'] == responses[2].headers['RateLimit-Reset']
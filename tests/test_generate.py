@@ -0,0 +1,43 @@
+"""
+Tests of the generator of large configurations.
+"""
+
+import io
+import json
+import os
+
+import jsonschema
+import yaml
+
+from benchmarks.generate import Shape, generate, usernames
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'schema.yaml')
+
+SHAPE = Shape(groups=2, depth=2, fan_out=2, projects_per_group=2, issues_per_project=5)
+
+def generated(shape: Shape = SHAPE, format: str = 'yaml', seed: int = 0):
+    out = io.StringIO()
+    counts = generate(shape, out, format, seed)
+    return out.getvalue(), counts
+
+def test_same_seed_gives_the_same_configuration():
+    assert generated(seed=1) == generated(seed=1)
+    assert generated(seed=1)[0] != generated(seed=2)[0]
+
+def test_configuration_is_valid_against_the_schema():
+    with open(SCHEMA_PATH, 'r') as f:
+        schema = yaml.safe_load(f)
+    for format in ('yaml', 'json'):
+        text, _ = generated(format=format)
+        jsonschema.validate(yaml.safe_load(text) if format == 'yaml' else json.loads(text), schema)
+
+def test_configuration_has_the_requested_shape():
+    text, counts = generated()
+    config = yaml.safe_load(text)
+
+    # 2 top-level groups, each with 2 subgroups having 2 subgroups each
+    assert counts['group'] == 2 * (1 + 2 + 4)
+    assert counts['project'] == 2 * 4 * 2
+    assert counts['issue'] == 2 * 4 * 2 * 5
+    assert [user['username'] for user in config['users']] == ['@me'] + [f"@{username}" for username in usernames(SHAPE)]
+    assert yaml.safe_load(text) == json.loads(generated(format='json')[0])
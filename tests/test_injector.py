@@ -0,0 +1,414 @@
+"""
+Tests of the injector against the fake GitLab.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Any, Dict
+
+import gitlab
+import pytest
+
+import gitlab_injector
+from fake_gitlab import FakeGitLab
+from gitlab_injector import GitLabInjector, InjectionPlan, LiveState, SqliteStore
+
+def snapshot(fake: FakeGitLab) -> Dict[str, Any]:
+    """
+    Get the content of a fake GitLab, the entities being identified by their paths and titles instead of their IDs.
+    """
+    names = {}
+    for group in fake.groups.values():
+        names[('groups', group['id'])] = group['full_path']
+    for project in fake.projects.values():
+        names[('projects', project['id'])] = project['path_with_namespace']
+    users = {user['id']: user['username'] for user in fake.users.values()}
+    titles = {}
+    for entities in (*fake.milestones.values(), *fake.epics.values(), *fake.iterations.values()):
+        titles.update({entity['id']: entity['title'] for entity in entities})
+
+    issues = {}
+    for project_id, project_issues in fake.issues.items():
+        for issue in project_issues:
+            issues[f"{names[('projects', project_id)]}#{issue['title']}"] = {
+                'description': issue.get('description'),
+                'state': issue['state'],
+                'labels': sorted(issue['labels']),
+                'milestone': titles.get((issue.get('milestone') or {}).get('id')),
+                'epic': titles.get((issue.get('epic') or {}).get('id')),
+                'iteration': titles.get((issue.get('iteration') or {}).get('id')),
+                'assignees': sorted(assignee['username'] for assignee in issue['assignees']),
+                'weight': issue.get('weight')
+            }
+    return {
+        'groups': {group['full_path']: group['description'] for group in fake.groups.values()},
+        'projects': {project['path_with_namespace']: project['description'] for project in fake.projects.values()},
+        'labels': {f"{names[key]}~{label['name']}": (label['color'], label['description'])
+                   for key, labels in fake.labels.items() for label in labels},
+        'milestones': {f"{names[key]}%{milestone['title']}": (milestone['description'], milestone['state'])
+                       for key, milestones in fake.milestones.items() for milestone in milestones},
+        'iterations': {f"{names[('groups', group_id)]}*{iteration['title']}": iteration['description']
+                       for group_id, iterations in fake.iterations.items() for iteration in iterations},
+        'epics': {f"{names[('groups', group_id)]}&{epic['title']}": (epic['state'], sorted(epic['labels']), titles.get(epic['parent_id']))
+                  for group_id, epics in fake.epics.items() for epic in epics},
+        'members': {names[key]: {users[user_id]: access_level for user_id, access_level in members.items()}
+                    for key, members in fake.members.items()},
+        'issues': issues
+    }
+
+def errors(caplog) -> list:
+    """
+    Get the errors logged by the injector.
+    """
+    return [record.getMessage() for record in caplog.records if record.levelno >= logging.ERROR]
+
+def test_create(fake, example, inject, caplog):
+    inject(example, concurrency=4)
+
+    assert errors(caplog) == []
+    state = snapshot(fake)
+    assert sorted(state['groups']) == ['ygroup-1', 'ygroup-1/subgroup-11', 'ygroup-1/subgroup-11/subgroup-111',
+                                       'ygroup-1/subgroup-11/subgroup-112', 'ygroup-1/subgroup-12', 'ygroup-2']
+    assert sorted(state['projects']) == ['ygroup-1/project-1', 'ygroup-1/project-2', 'ygroup-1/subgroup-11/subgroup-112/deep-project']
+    assert len(state['labels']) == 6
+    assert state['epics'] == {'ygroup-1&Epic 1': ('opened', ['Bug', 'Feature'], None),
+                              'ygroup-1&Epic 2': ('closed', ['Feature'], 'Epic 1')}
+    assert sorted(state['iterations']) == ['ygroup-1*Sprint 1', 'ygroup-1*Sprint 2']
+    assert state['members']['ygroup-1/project-1'] == {'root': 50, '__another_user__': 40}
+    assert len(state['issues']) == 5
+    assert state['issues']['ygroup-1/project-1#Issue 1'] == {
+        'description': 'Description of Issue 1',
+        'state': 'opened',
+        'labels': ['Bug'],
+        'milestone': 'Project Milestone',
+        'epic': 'Epic 1',
+        'iteration': 'Sprint 1',
+        'assignees': ['root'],
+        'weight': 3
+    }
+    assert state['issues']['ygroup-1/project-1#Issue 2']['state'] == 'closed'
+
+def test_create_on_community_edition(example, inject, caplog):
+    with FakeGitLab(enterprise=False, usernames=('__another_user__',)) as community:
+        inject(example, gitlab=community)
+        state = snapshot(community)
+
+    assert errors(caplog) == []
+    assert state['epics'] == {} and state['iterations'] == {}
+    assert len(state['issues']) == 5
+    assert state['issues']['ygroup-1/project-1#Issue 1']['weight'] is None
+
+def test_incremental(fake, example, inject, tmp_path):
+    journal = str(tmp_path / 'journal.jsonl')
+    inject(example, journal_path=journal)
+    created_issues = fake.requests['POST /projects/:id/issues']
+    updated_issues = fake.requests['PUT /projects/:id/issues/:iid']
+
+    issues = example['groups'][0]['projects'][0]['issues']
+    issues[0]['description'] = 'Changed description'
+    issues.append({'id': 'issue5', 'title': 'Issue 5', 'description': 'New issue'})
+    inject(example, journal_path=journal, incremental=True)
+
+    assert fake.requests['POST /projects/:id/issues'] == created_issues + 1
+    assert fake.requests['PUT /projects/:id/issues/:iid'] == updated_issues + 1
+    assert fake.requests['POST /groups'] == 6
+    state = snapshot(fake)
+    assert state['issues']['ygroup-1/project-1#Issue 1']['description'] == 'Changed description'
+    assert state['issues']['ygroup-1/project-1#Issue 1']['iteration'] == 'Sprint 1'
+    assert len(state['issues']) == 6
+
+def test_reconcile(fake, example, inject, caplog):
+    inject(example)
+    expected = snapshot(fake)
+
+    # The entities changed in GitLab are converged back to the configuration
+    group = next(group for group in fake.groups.values() if group['full_path'] == 'ygroup-1')
+    group['description'] = 'Changed in GitLab'
+    next(label for label in fake.labels[('groups', group['id'])] if label['name'] == 'Bug')['color'] = '#123456'
+    created = sum(count for request, count in fake.requests.items() if request.startswith('POST /') and 'graphql' not in request)
+    inject(example, reconcile=True)
+
+    assert errors(caplog) == []
+    assert snapshot(fake) == expected
+    assert sum(count for request, count in fake.requests.items() if request.startswith('POST /') and 'graphql' not in request) == created
+
+@pytest.mark.parametrize('store', ['journal', 'store'])
+def test_resume(fake, example, inject, tmp_path, caplog, store):
+    options = {'journal_path': str(tmp_path / 'journal.jsonl')} if store == 'journal' else {'store_path': str(tmp_path / 'store.db')}
+    fake.fail('POST /projects/:id/issues', 400)
+    with pytest.raises(SystemExit):
+        inject(example, **options)
+    assert fake.requests['POST /projects/:id/issues'] == 1
+
+    caplog.clear()
+    inject(example, resume=True, **options)
+
+    # Each entity has been created once
+    assert errors(caplog) == []
+    assert fake.requests['POST /groups'] == 6
+    with FakeGitLab(usernames=('__another_user__',)) as uninterrupted:
+        inject(example, gitlab=uninterrupted)
+        assert snapshot(fake) == snapshot(uninterrupted)
+
+def test_stream(fake, example, inject, caplog):
+    injector = inject(example, stream=True, concurrency=4)
+    # The mappings of the issues are forgotten once their project has been injected
+    assert injector.issue_id_map == {} and injector.issue_iid_map == {}
+
+    with FakeGitLab(usernames=('__another_user__',)) as loaded:
+        inject(example, gitlab=loaded, concurrency=4)
+        expected = snapshot(loaded)
+    assert errors(caplog) == []
+    assert snapshot(fake) == expected
+
+def test_transient_errors_are_retried(fake, example, inject, caplog):
+    fake.fail('GET /groups/:id', 503)
+    fake.fail('POST /:kind/:id/labels', 503, count=2)
+    fake.fail('POST /:kind/:id/labels', 429)
+    fake.fail('POST /projects/:id/issues', 502, processed=True)
+    fake.fail('POST /graphql', 502)
+    inject(example, max_retries=3)
+
+    assert errors(caplog) == []
+    state = snapshot(fake)
+    assert len(state['labels']) == 6
+    assert len(state['issues']) == 5
+    assert state['members']['ygroup-1'] == {'root': 50, '__another_user__': 20}
+    assert fake.requests['POST /:kind/:id/labels'] == 6 + 3
+
+def test_users_are_resolved_with_graphql(fake, example, inject, caplog):
+    injector = inject(example)
+
+    assert [record.getMessage() for record in caplog.records if record.levelno >= logging.WARNING] == []
+    assert fake.requests['POST /graphql'] >= 1
+    assert fake.requests['GET /users'] == 0
+    assert injector.user_cache['__another_user__'].username == '__another_user__'
+
+def test_iterations_are_created_and_updated(fake, example, inject, tmp_path, caplog):
+    journal = str(tmp_path / 'journal.jsonl')
+    inject(example, journal_path=journal)
+    assert snapshot(fake)['iterations'] == {'ygroup-1*Sprint 1': 'First sprint', 'ygroup-1*Sprint 2': 'Second sprint'}
+
+    iterations = example['groups'][0]['iterations']
+    iterations[1]['description'] = 'Changed description'
+    iterations.append({'id': 'iteration3', 'title': 'Sprint 3', 'start_date': '2025-04-01', 'due_date': '2025-04-15'})
+    inject(example, journal_path=journal, incremental=True)
+
+    assert errors(caplog) == []
+    assert snapshot(fake)['iterations'] == {'ygroup-1*Sprint 1': 'First sprint', 'ygroup-1*Sprint 2': 'Changed description',
+                                            'ygroup-1*Sprint 3': ''}
+    assert fake.graphql_requests['createIterations'] == 2
+    assert fake.graphql_requests['updateIterations'] == 1
+
+def test_failed_requests_are_retried_max_retries_times(fake, example, inject, tmp_path, caplog):
+    journal = str(tmp_path / 'journal.jsonl')
+    inject(example, journal_path=journal)
+    updated_issues = fake.requests['PUT /projects/:id/issues/:iid']
+    queries = fake.requests['POST /graphql']
+
+    # Each request is sent once, then retried max_retries times, by a single retry layer
+    example['groups'][0]['projects'][0]['issues'][0]['description'] = 'Changed description'
+    fake.fail('PUT /projects/:id/issues/:iid', 503, count=10)
+    fake.fail('POST /graphql', 429, count=10)
+    with pytest.raises(SystemExit):
+        inject(example, journal_path=journal, incremental=True, max_retries=2)
+
+    assert fake.requests['PUT /projects/:id/issues/:iid'] == updated_issues + 3
+    assert fake.requests['POST /graphql'] == queries + 3
+
+def test_graphql_responses_update_the_rate_limiter():
+    with FakeGitLab(rate_limit=600, usernames=('__another_user__',)) as limited:
+        injector = GitLabInjector(limited.url, 'token')
+        injector.rate_limiter.rate = None
+        injector.resolve_users(['__another_user__', '__unknown_user__'])
+
+    assert limited.requests['POST /graphql'] >= 1
+    assert injector.rate_limiter.rate is not None
+
+def test_store_records_are_committed_immediately(tmp_path):
+    path = str(tmp_path / 'store.db')
+    store = SqliteStore(path, 'https://gitlab.example.com', None)
+    store.record_operation('group', 'group1', 42, 'fingerprint')
+    store.record_mapping('label', 'label1', 'Bug')
+
+    # The records can be read by another connection before the store is closed, as after a crash
+    resumed = SqliteStore(path, 'https://gitlab.example.com', None, resume=True)
+    assert resumed.operations == {('group', 'group1'): 42}
+    assert resumed.mappings == {'label': {'label1': 'Bug'}}
+    resumed.close()
+    store.close()
+
+def test_store_records_of_an_operation_are_committed_together(tmp_path):
+    path = str(tmp_path / 'store.db')
+    store = SqliteStore(path, 'https://gitlab.example.com', None)
+    with store.transaction():
+        store.record_mapping('issue', 'issue1', 7)
+        store.record_mapping('issue_iid', 'issue1', 1)
+        store.record_operation('issue', 'issue1', 7, 'fingerprint')
+        # Nothing is committed before the operation ends
+        reader = SqliteStore(path, 'https://gitlab.example.com', None, resume=True)
+        assert reader.operations == {}
+        reader.close()
+        assert store.operations == {('issue', 'issue1'): 7}
+
+    resumed = SqliteStore(path, 'https://gitlab.example.com', None, resume=True)
+    assert resumed.operations == {('issue', 'issue1'): 7}
+    assert resumed.mappings == {'issue': {'issue1': 7}, 'issue_iid': {'issue1': 1}}
+    resumed.close()
+    store.close()
+
+def test_running_operations_are_journaled_on_failure(fake, tmp_path):
+    journal = str(tmp_path / 'journal.jsonl')
+    injector = GitLabInjector(fake.url, 'token', concurrency=2, journal_path=journal)
+    failed = threading.Event()
+
+    def slow():
+        failed.wait()
+        time.sleep(0.1)
+        return 42
+
+    def failing():
+        failed.set()
+        raise RuntimeError('failure')
+
+    plan = InjectionPlan()
+    plan.add(('label', 'slow'), 'slow label', slow)
+    plan.add(('label', 'failing'), 'failing label', failing)
+    plan.add(('label', 'next'), 'next label', lambda: 43)
+    with pytest.raises(RuntimeError):
+        injector.run_plan(plan)
+
+    # The operation running when the other one failed has been waited for and journaled, the next one not run
+    assert injector.journal.operations == {('label', 'slow'): 42}
+    injector.journal.close()
+
+def test_avoided_gets_are_counted_without_requests(fake):
+    injector = GitLabInjector(fake.url, 'token')
+    parent = injector.get_group(injector.gl.groups.create({'name': 'Parent', 'path': 'parent'}).id)
+
+    # The parent group is in the cache, but its subgroups are listed to create the first subgroup
+    avoided_gets = injector.api_call_counter.avoided_gets
+    injector.create_group({'name': 'Subgroup 1', 'description': ''}, parent.id)
+    assert injector.api_call_counter.avoided_gets == avoided_gets + 1
+    assert fake.requests['GET /groups/:id/subgroups'] == 1
+    injector.create_group({'name': 'Subgroup 2', 'description': ''}, parent.id)
+    assert injector.api_call_counter.avoided_gets == avoided_gets + 1 + 2
+    assert fake.requests['GET /groups/:id/subgroups'] == 1
+
+def test_stream_on_community_edition(example, inject, caplog):
+    with FakeGitLab(enterprise=False, usernames=('__another_user__',)) as community:
+        inject(example, gitlab=community, stream=True)
+        assert len(snapshot(community)['issues']) == 5
+    assert errors(caplog) == []
+
+def test_stream_fails_on_references_to_entities_further_in_the_file(fake, example, inject, caplog):
+    # The labels of the group follow its projects
+    group = example['groups'][0]
+    group['labels'] = group.pop('labels')
+    with pytest.raises(SystemExit):
+        inject(example, stream=True)
+
+    assert any("references label id='label1' before its definition" in error for error in errors(caplog))
+    assert fake.requests['POST /projects/:id/issues'] == 0
+
+def test_stream_fails_on_users_after_the_groups(fake, example, inject, caplog):
+    example['users'] = example.pop('users')
+    with pytest.raises(SystemExit):
+        inject(example, stream=True)
+
+    assert errors(caplog) == ["The group 'YGroup 1' references user id='user1' before its definition: "
+                              "the users must precede the groups in the YAML file to stream it"]
+    assert fake.requests['POST /groups'] == 0
+
+def test_issues_are_created_once_their_assignees_are_members(inject, caplog):
+    config = {
+        'users': [{'id': 'user1', 'username': '@__another_user__'}, {'id': 'user2', 'username': '@__third_user__'}],
+        'groups': [{
+            'name': 'Group', 'description': '',
+            'members': [{'user_id': 'user1', 'role': 'developer'}],
+            'subgroups': [{
+                'name': 'Subgroup', 'description': '',
+                'projects': [{
+                    'name': 'Project', 'description': '',
+                    'members': [{'user_id': 'user2', 'role': 'developer'}],
+                    'issues': [{'id': f"issue{n}", 'title': f"Issue {n}", 'description': '', 'assignee_ids': ['user1', 'user2']}
+                               for n in range(8)]
+                }]
+            }]
+        }]
+    }
+    with FakeGitLab(latency=0.02, usernames=('__another_user__', '__third_user__')) as slow:
+        inject(config, gitlab=slow, concurrency=8)
+        state = snapshot(slow)
+
+    # The fake GitLab drops the assignees who are not members yet, as GitLab does with a private project
+    assert errors(caplog) == []
+    assert {title: issue['assignees'] for title, issue in state['issues'].items()} == {
+        f"group/subgroup/project#Issue {n}": ['__another_user__', '__third_user__'] for n in range(8)}
+
+def test_containers_are_listed_once_by_concurrent_workers():
+    live_state = LiveState()
+    container = SimpleNamespace(id=1, manager=SimpleNamespace(path='/projects'), issues=SimpleNamespace(path='/projects/1/issues'))
+    listings = []
+
+    def list_issues():
+        listings.append(threading.current_thread().name)
+        time.sleep(0.1)
+        return [SimpleNamespace(title=f"Issue {n}") for n in range(3)]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        indexes = list(executor.map(lambda _: live_state.index(container, 'issues', 'title', list_issues), range(8)))
+
+    assert len(listings) == 1
+    assert all(index is indexes[0] for index in indexes) and len(indexes[0]) == 3
+
+def test_users_are_looked_up_once_without_blocking_other_usernames(fake):
+    injector = GitLabInjector(fake.url, 'token')
+    other_resolved = threading.Event()
+    lookups = []
+
+    def list_users(username):
+        lookups.append(username)
+        if username == 'slow':
+            # Waits for the lookup of another username, which would be blocked if the lookups were serialized
+            assert other_resolved.wait(timeout=5)
+        else:
+            other_resolved.set()
+        return [SimpleNamespace(username=username, id=len(username))]
+
+    injector.gl.users.list = list_users
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        users = list(executor.map(injector.resolve_user, ['slow', 'slow', 'other', 'slow']))
+
+    assert sorted(lookups) == ['other', 'slow']
+    assert [user.username for user in users] == ['slow', 'slow', 'other', 'slow']
+
+def test_capabilities_are_probed_once_per_parent_group(fake):
+    gl = gitlab.Gitlab(fake.url, private_token='token')
+    for path in ('parent-a', 'parent-b'):
+        gl.groups.create({'name': path, 'path': path})
+    for path in ('parent-a', 'parent-b', 'parent-a'):
+        GitLabInjector(fake.url, 'token', parent_group_path=path)
+
+    assert set(gitlab_injector.CAPABILITIES_CACHE) == {(gl.url, 'parent-a'), (gl.url, 'parent-b')}
+    assert fake.requests['GET /groups/:id/epics'] == 2
+
+def test_created_issue_is_not_taken_for_an_older_one(fake, example, inject, tmp_path):
+    journal = str(tmp_path / 'journal.jsonl')
+    issues = example['groups'][0]['projects'][0]['issues']
+    issues.append({'id': 'older', 'title': 'Duplicate', 'description': 'Same', 'labels': [], 'assignee_ids': []})
+    issues.append({'id': 'other', 'title': 'Duplicate', 'description': 'Other', 'labels': [], 'assignee_ids': []})
+    inject(example, journal_path=journal)
+
+    # The creation of the new issue is processed but its response is lost
+    issues.append({'id': 'new', 'title': 'Duplicate', 'description': 'Same', 'labels': [], 'assignee_ids': []})
+    fake.fail('POST /projects/:id/issues', 502, processed=True)
+    injector = inject(example, journal_path=journal, incremental=True)
+
+    duplicates = [issue for project_issues in fake.issues.values() for issue in project_issues if issue['title'] == 'Duplicate']
+    assert len(duplicates) == 3
+    assert injector.issue_id_map['new'] == duplicates[2]['id']
+
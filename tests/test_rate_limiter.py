@@ -0,0 +1,73 @@
+"""
+Tests of the client-side rate limiter and of the adapter applying it to the requests.
+"""
+
+import time
+
+import pytest
+import requests
+
+from fake_gitlab import FakeGitLab
+from gitlab_injector import RateLimitedAdapter, RateLimiter, RetryAdapter
+
+HEADERS = {'PRIVATE-TOKEN': 'token'}
+
+def elapsed(function, *args) -> float:
+    start = time.monotonic()
+    function(*args)
+    return time.monotonic() - start
+
+def test_tokens_are_refilled_at_the_configured_rate():
+    limiter = RateLimiter(20)
+    # The bucket starts with a single token, then the calls are spread at 20 calls/s
+    assert elapsed(lambda: [limiter.acquire() for _ in range(5)]) == pytest.approx(4 / 20, abs=0.05)
+
+    # Idle time refills the bucket, up to one second of calls
+    time.sleep(0.5)
+    assert elapsed(lambda: [limiter.acquire() for _ in range(10)]) < 0.05
+
+def test_unlimited_calls_are_not_delayed():
+    limiter = RateLimiter()
+    assert elapsed(lambda: [limiter.acquire() for _ in range(1000)]) < 0.1
+
+def test_rate_follows_the_rate_limit_headers():
+    limiter = RateLimiter()
+    limiter.update({'RateLimit-Remaining': '100', 'RateLimit-Reset': str(time.time() + 50)})
+    assert limiter.rate == pytest.approx(2.0, rel=0.05)
+
+    # The configured rate is kept when the server allows more
+    limiter = RateLimiter(1)
+    limiter.update({'RateLimit-Remaining': '100', 'RateLimit-Reset': str(time.time() + 50)})
+    assert limiter.rate == 1
+
+    # Missing or invalid headers are ignored
+    limiter.update({})
+    limiter.update({'RateLimit-Remaining': 'many', 'RateLimit-Reset': '0'})
+    assert limiter.rate == 1
+
+def test_exhausted_rate_limit_delays_the_next_call():
+    limiter = RateLimiter()
+    limiter.update({'RateLimit-Remaining': '0', 'RateLimit-Reset': str(time.time() + 1)})
+    assert elapsed(limiter.acquire) >= 0.9
+
+def test_retry_after_pauses_the_calls():
+    limiter = RateLimiter()
+    limiter.update({'Retry-After': '0.3'})
+    assert elapsed(limiter.acquire) >= 0.29
+    assert elapsed(limiter.acquire) < 0.05
+
+def test_rejected_request_is_retried_after_the_rate_limit_window():
+    with FakeGitLab(rate_limit=3, rate_limit_window=1.0) as limited, requests.Session() as session:
+        session.headers.update(HEADERS)
+        limiter = RateLimiter()
+        adapter = RetryAdapter(RateLimitedAdapter(requests.adapters.HTTPAdapter(), limiter), max_retries=2)
+        session.mount('http://', adapter)
+
+        # Another client uses the whole rate limit
+        for _ in range(3):
+            requests.get(f"{limited.url}/api/v4/user", headers=HEADERS).raise_for_status()
+        response = session.get(f"{limited.url}/api/v4/user")
+
+    # The request is rejected with HTTP 429, then sent again after the Retry-After delay, once the window has been reset
+    assert response.status_code == 200
+    assert limited.requests['GET /user'] == 3 + 2